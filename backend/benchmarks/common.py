@@ -0,0 +1,99 @@
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Sequence
+
+
+def percentiles(
+    values: Sequence[float], points: Sequence[int] = (50, 95, 99)
+) -> Dict[str, float | None]:
+    """
+    - Returns nearest-rank percentiles (i.e. p50/p95/p99) of `values`,
+      along with min, max and mean. Empty inputs yield None for each field.
+    """
+    if not values:
+        summary: Dict[str, float | None] = {f"p{p}": None for p in points}
+        summary.update({"min": None, "max": None, "mean": None})
+        return summary
+    ordered = sorted(values)
+    summary = {
+        f"p{p}": ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+        for p in points
+    }
+    summary.update(
+        {
+            "min": ordered[0],
+            "max": ordered[-1],
+            "mean": sum(ordered) / len(ordered),
+        }
+    )
+    return summary
+
+
+def git_revision() -> str | None:
+    """
+    - Returns the current git commit, so reports can be compared across commits.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def environment_info() -> Dict[str, Any]:
+    return {
+        "git_revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def rss_bytes(pid: int) -> int | None:
+    """
+    - Reads the resident set size of `pid` from /proc (Linux only).
+    """
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+def child_pids(pid: int) -> List[int]:
+    """
+    - Lists the direct children of `pid` (i.e. uvicorn's worker processes).
+    """
+    children: List[int] = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children.extend(int(child) for child in f.read().split())
+    except OSError:
+        pass
+    return children
+
+
+def write_report(report: Dict[str, Any], output: str | None) -> None:
+    """
+    - Writes the report as JSON to `output`, or to stdout when not given.
+    """
+    payload = json.dumps(report, indent=2, default=str)
+    if output:
+        with open(output, "w") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
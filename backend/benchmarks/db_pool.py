@@ -0,0 +1,184 @@
+"""
+Database connection pool benchmark.
+
+Simulates uvicorn workers as separate processes, each with its own engine
+and pool (configured like pikoshi/database.py), sharing a fixed number of
+concurrent requests that each run one short query. Sweeps worker counts and
+pool settings (pool_size, max_overflow), reporting throughput, request
+latency and pool checkout wait (p50/p95/p99), checkout timeouts, and how
+many connections each setting may open against Postgres' max_connections.
+Postgres must be running, run from the `backend` directory:
+
+    python -m benchmarks.db_pool --workers 1,2,4 --pool-size 5,10 --max-overflow 0,10
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import time
+from typing import Any, Callable, Dict, List
+
+from .common import environment_info, percentiles, write_report
+
+
+def _csv(cast: Callable[[str], Any]) -> Callable[[str], List[Any]]:
+    return lambda value: [cast(v.strip()) for v in value.split(",") if v.strip()]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=_csv(int), default=[1, 2, 4])
+    parser.add_argument("--pool-size", type=_csv(int), default=[5, 10])
+    parser.add_argument("--max-overflow", type=_csv(int), default=[0, 10])
+    parser.add_argument(
+        "--concurrency", type=int, default=64, help="in-flight requests, all workers"
+    )
+    parser.add_argument(
+        "--requests", type=int, default=2000, help="requests per case, all workers"
+    )
+    parser.add_argument(
+        "--query-ms", type=float, default=5, help="pg_sleep() per request"
+    )
+    parser.add_argument("--pool-timeout", type=float, default=30)
+    parser.add_argument("--output", help="write JSON report here instead of stdout")
+    return parser.parse_args()
+
+
+async def run_worker(
+    settings: Dict[str, Any], concurrency: int, requests: int, query_ms: float, start
+) -> Dict[str, List[Any]]:
+    from sqlalchemy import text
+
+    from pikoshi.database import (SQLALCHEMY_DATABASE_URL,
+                                  DatabaseSessionManager, engine_settings)
+
+    manager = DatabaseSessionManager(
+        SQLALCHEMY_DATABASE_URL, engine_settings(**settings)
+    )
+    samples: Dict[str, List[Any]] = {"latency": [], "checkout_wait": [], "errors": []}
+    remaining = requests
+
+    async def client() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            before = time.perf_counter()
+            try:
+                async with manager.session() as session:
+                    checkout = time.perf_counter()
+                    await session.connection()
+                    samples["checkout_wait"].append(time.perf_counter() - checkout)
+                    await session.execute(
+                        text("SELECT pg_sleep(:seconds)"), {"seconds": query_ms / 1000}
+                    )
+                samples["latency"].append(time.perf_counter() - before)
+            except Exception as e:
+                samples["errors"].append(type(e).__name__)
+
+    # Every worker starts its load at the same time
+    await asyncio.to_thread(start.wait)
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    await manager.close()
+    return samples
+
+
+def worker_main(settings, concurrency, requests, query_ms, start, results) -> None:
+    results.put(
+        asyncio.run(run_worker(settings, concurrency, requests, query_ms, start))
+    )
+
+
+async def max_connections() -> int | None:
+    from sqlalchemy import text
+
+    from pikoshi.database import sessionmanager
+
+    try:
+        async with sessionmanager.session() as session:
+            result = await session.execute(text("SHOW max_connections"))
+            return int(result.scalar_one())
+    finally:
+        await sessionmanager.close()
+
+
+def run_case(args: argparse.Namespace, workers: int, settings: Dict[str, Any]):
+    context = multiprocessing.get_context("spawn")
+    start = context.Barrier(workers + 1)
+    results = context.Queue()
+    processes = [
+        context.Process(
+            target=worker_main,
+            args=(
+                settings,
+                max(1, args.concurrency // workers),
+                args.requests // workers,
+                args.query_ms,
+                start,
+                results,
+            ),
+        )
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    start.wait()
+    started = time.perf_counter()
+    samples = [results.get() for _ in processes]
+    duration = time.perf_counter() - started
+    for process in processes:
+        process.join()
+
+    latency = [s for worker in samples for s in worker["latency"]]
+    checkout_wait = [s for worker in samples for s in worker["checkout_wait"]]
+    errors = [e for worker in samples for e in worker["errors"]]
+    return {
+        "duration_seconds": duration,
+        "throughput_rps": len(latency) / duration if duration else None,
+        "requests": len(latency) + len(errors),
+        "errors": len(errors),
+        "checkout_timeouts": errors.count("TimeoutError"),
+        "latency_seconds": percentiles(latency),
+        "checkout_wait_seconds": percentiles(checkout_wait),
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    postgres_max_connections = asyncio.run(max_connections())
+    cases = []
+    for workers in args.workers:
+        for pool_size in args.pool_size:
+            for max_overflow in args.max_overflow:
+                settings = {
+                    "pool_size": pool_size,
+                    "max_overflow": max_overflow,
+                    "pool_timeout": args.pool_timeout,
+                }
+                max_open = workers * (pool_size + max_overflow)
+                cases.append(
+                    {
+                        "workers": workers,
+                        **settings,
+                        "max_open_connections": max_open,
+                        "exceeds_max_connections": (
+                            postgres_max_connections is not None
+                            and max_open > postgres_max_connections
+                        ),
+                        **run_case(args, workers, settings),
+                    }
+                )
+    return {
+        "benchmark": "db_pool",
+        "environment": environment_info(),
+        "parameters": {k: v for k, v in vars(args).items() if k != "output"},
+        "postgres_max_connections": postgres_max_connections,
+        "cases": cases,
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    write_report(run(args), args.output)
+
+
+if __name__ == "__main__":
+    main()
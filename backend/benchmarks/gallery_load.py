@@ -0,0 +1,409 @@
+"""
+End-to-end gallery load benchmark.
+
+Seeds N users x M photos, then drives the gallery routes with concurrent
+virtual clients and reports time-to-first-byte, time-to-last-image,
+p50/p95/p99 latencies and worker RSS as JSON.
+
+By default a uvicorn server is spawned against the in-process S3 stand-in
+(see backends/storage.py), Postgres must be running as users are seeded
+directly into the DB. Run from the `backend` directory:
+
+    python -m benchmarks.gallery_load --users 10 --photos 30 --clients 20
+
+Pass `--base-url` (and optionally `--pid`) to drive an already running server.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+from uuid import uuid4
+
+import httpx
+
+from .common import (child_pids, environment_info, percentiles, rss_bytes,
+                     write_report)
+from .synthetic_images import make_image_bytes
+
+GALLERY = "/gallery/default-gallery/"
+LOAD_MORE = "/gallery/default-load-more/"
+SINGLE = "/gallery/default-single/"
+UPLOAD = "/gallery/upload/"
+SCENARIOS = {
+    "gallery": GALLERY,
+    "load-more": LOAD_MORE,
+    "single": SINGLE,
+    "upload": UPLOAD,
+}
+BENCH_PASSWORD = "Bench_Password_1!"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--photos", type=int, default=30, help="photos per user")
+    parser.add_argument("--clients", type=int, default=20, help="virtual clients")
+    parser.add_argument(
+        "--iterations", type=int, default=5, help="scenario runs per client"
+    )
+    parser.add_argument(
+        "--scenario",
+        default="gallery,load-more,single,upload",
+        help=f"comma separated steps out of: {', '.join(SCENARIOS)}",
+    )
+    parser.add_argument("--max-keys", type=int, default=30)
+    parser.add_argument("--image-size", default="1920x1280")
+    parser.add_argument("--base-url", help="drive an already running server")
+    parser.add_argument("--pid", type=int, help="PID of --base-url server, for RSS")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--storage", choices=["memory", "filesystem", "s3"], default="filesystem"
+    )
+    parser.add_argument("--s3-latency-ms", type=float, default=0)
+    parser.add_argument("--s3-bandwidth-bps", type=int, default=0)
+    parser.add_argument("--skip-seed-photos", action="store_true")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--output", help="write JSON report here instead of stdout")
+    return parser.parse_args()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(args: argparse.Namespace) -> tuple[subprocess.Popen, str]:
+    """
+    - Spawns uvicorn with the requested storage stand-in and worker count.
+    - NOTE: The filesystem stand-in is shared between workers,
+      whereas the memory stand-in is private to each worker.
+    """
+    port = _free_port()
+    env = dict(os.environ)
+    env["STORAGE_BACKEND"] = args.storage
+    env["FAKE_S3_LATENCY_MS"] = str(args.s3_latency_ms)
+    env["FAKE_S3_BANDWIDTH_BPS"] = str(args.s3_bandwidth_bps)
+    # Virtual clients share one user and IP, measure the app, not the limiter
+    env["RATE_LIMIT_ENABLED"] = "false"
+    if args.storage == "filesystem":
+        env["FAKE_S3_ROOT"] = tempfile.mkdtemp(prefix="pikoshi_bench_s3_")
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "pikoshi.main:app",
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(port),
+        "--workers",
+        str(args.workers),
+        "--log-level",
+        "warning",
+    ]
+    return subprocess.Popen(command, env=env), f"http://127.0.0.1:{port}"
+
+
+async def wait_for_server(base_url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get("/docs")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not start within {timeout}s")
+
+
+async def seed_users(num_users: int) -> List[str]:
+    """
+    - Creates (or reuses) `bench_user_<i>` users directly in the DB,
+      and returns a JWT access_token for each.
+    """
+    from pikoshi.database import sessionmanager
+    from pikoshi.services import jwt_service as JWTAuthService
+    from pikoshi.services import security_service as SecurityService
+    from pikoshi.services import user_service as UserService
+
+    access_tokens = []
+    async with sessionmanager.session() as db_session:
+        for i in range(num_users):
+            email = f"bench_user_{i}@pikoshi.bench"
+            user = await UserService.get_user_by_email(db_session, email)
+            if not user:
+                salt = SecurityService.generate_salt()
+                profile = UserService.generate_user_profile(
+                    f"bench_user_{i}",
+                    await SecurityService.hash_value(BENCH_PASSWORD, salt),
+                    email,
+                    salt,
+                    str(uuid4()),
+                )
+                user = await UserService.create_user(db_session, profile)
+            access_tokens.append(
+                JWTAuthService.get_user_tokens(str(user.uuid))["access_token"]
+            )
+    await sessionmanager.close()
+    return access_tokens
+
+
+def _cookie_header(cookies: Dict[str, str]) -> Dict[str, str]:
+    return {"Cookie": "; ".join(f"{k}={v}" for k, v in cookies.items())}
+
+
+def _update_cookies(response: httpx.Response, cookies: Dict[str, str]) -> None:
+    """
+    - Keeps cookies by hand, as the server marks them `secure`
+      and httpx would therefore never send them back over plain http.
+    """
+    for set_cookie in response.headers.get_list("set-cookie"):
+        name, _, value = set_cookie.split(";")[0].partition("=")
+        value = value.strip('"')
+        if value:
+            cookies[name] = value
+        else:
+            cookies.pop(name, None)
+
+
+class Recorder:
+    def __init__(self):
+        self.samples: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+
+    def add(self, route: str, **sample: Any) -> None:
+        self.samples[route].append(sample)
+
+    def summary(self) -> Dict[str, Any]:
+        routes = {}
+        for route, samples in self.samples.items():
+            ok = [s for s in samples if s["error"] is None and s["status"] < 400]
+            status_codes: Dict[str, int] = defaultdict(int)
+            for s in samples:
+                status_codes[str(s["status"])] += 1
+            routes[route] = {
+                "requests": len(samples),
+                "errors": len(samples) - len(ok),
+                "status_codes": dict(status_codes),
+                "bytes": sum(s["bytes"] for s in ok),
+                "ttfb_seconds": percentiles([s["ttfb"] for s in ok]),
+                "time_to_last_image_seconds": percentiles(
+                    [s["ttli"] for s in ok if s["images"]]
+                ),
+                "latency_seconds": percentiles([s["latency"] for s in ok]),
+                "images_per_response": percentiles([s["images"] for s in ok]),
+            }
+        return routes
+
+
+async def timed_request(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    route: str,
+    cookies: Dict[str, str],
+    **kwargs: Any,
+) -> bytes:
+    """
+    - Streams a POST to `route`, noting time-to-first-byte (headers received),
+      time-to-last-image (last multipart part received) and total latency.
+    """
+    start = time.perf_counter()
+    body = bytearray()
+    status, ttfb, ttli, images, error = 0, None, None, 0, None
+    try:
+        async with client.stream(
+            "POST", route, headers=_cookie_header(cookies), **kwargs
+        ) as response:
+            ttfb = time.perf_counter() - start
+            status = response.status_code
+            boundary = response.headers.get("x-boundary")
+            marker = f"--{boundary}".encode() if boundary else None
+            position = 0
+            async for chunk in response.aiter_raw():
+                body.extend(chunk)
+                while marker is not None:
+                    index = body.find(marker, position)
+                    if index == -1:
+                        break
+                    images, position = images + 1, index + len(marker)
+            # NOTE: The last image part ends with the stream itself.
+            if images:
+                ttli = time.perf_counter() - start
+            _update_cookies(response, cookies)
+    except Exception as e:
+        error = repr(e)
+    recorder.add(
+        route,
+        status=status,
+        error=error,
+        ttfb=ttfb,
+        ttli=ttli,
+        latency=time.perf_counter() - start,
+        images=images,
+        bytes=len(body),
+    )
+    return bytes(body)
+
+
+async def upload_photo(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    cookies: Dict[str, str],
+    file_name: str,
+    image: bytes,
+) -> None:
+    await timed_request(
+        client,
+        recorder,
+        UPLOAD,
+        cookies,
+        files={"file": (file_name, image, "image/jpeg")},
+    )
+
+
+async def virtual_client(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    access_token: str,
+    client_id: int,
+    args: argparse.Namespace,
+    image: bytes,
+) -> None:
+    cookies = {"access_token": access_token}
+    steps = [SCENARIOS[step.strip()] for step in args.scenario.split(",")]
+    params = {"max_keys": args.max_keys}
+    for iteration in range(args.iterations):
+        file_name = None
+        for route in steps:
+            if route == GALLERY:
+                cookies.pop("s3_continuation_token", None)
+                body = await timed_request(
+                    client, recorder, GALLERY, cookies, params=params
+                )
+                match = re.search(rb'filename="([^"]+)"', body)
+                file_name = match.group(1).decode() if match else None
+            elif route == LOAD_MORE:
+                await timed_request(client, recorder, LOAD_MORE, cookies, params=params)
+            elif route == SINGLE:
+                await timed_request(
+                    client,
+                    recorder,
+                    SINGLE,
+                    cookies,
+                    json={"width": 1024, "file_name": file_name or "default"},
+                )
+            elif route == UPLOAD:
+                await upload_photo(
+                    client,
+                    recorder,
+                    cookies,
+                    f"bench_load_{client_id}_{iteration}.jpg",
+                    image,
+                )
+
+
+async def sample_rss(pid: int | None, peaks: Dict[int, Dict[str, int]]) -> None:
+    if pid is None:
+        return
+    while True:
+        for p in [pid, *child_pids(pid)]:
+            rss = rss_bytes(p)
+            if rss is None:
+                continue
+            stats = peaks.setdefault(p, {"peak": rss, "final": rss})
+            stats["peak"] = max(stats["peak"], rss)
+            stats["final"] = rss
+        await asyncio.sleep(0.25)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    width, height = (int(v) for v in args.image_size.split("x"))
+    server = None
+    base_url, pid = args.base_url, args.pid
+    if base_url is None:
+        server, base_url = start_server(args)
+        pid = server.pid
+    try:
+        await wait_for_server(base_url)
+        access_tokens = await seed_users(args.users)
+        limits = httpx.Limits(max_connections=args.clients)
+        async with httpx.AsyncClient(
+            base_url=base_url, timeout=args.timeout, limits=limits
+        ) as client:
+            if not args.skip_seed_photos:
+                seed_recorder = Recorder()
+                semaphore = asyncio.Semaphore(args.clients)
+
+                async def seed(user: int, photo: int) -> None:
+                    async with semaphore:
+                        await upload_photo(
+                            client,
+                            seed_recorder,
+                            {"access_token": access_tokens[user]},
+                            f"bench_seed_{user}_{photo}.jpg",
+                            make_image_bytes(width, height, seed=photo),
+                        )
+
+                await asyncio.gather(
+                    *(
+                        seed(user, photo)
+                        for user in range(args.users)
+                        for photo in range(args.photos)
+                    )
+                )
+
+            rss: Dict[int, Dict[str, int]] = {}
+            sampler = asyncio.create_task(sample_rss(pid, rss))
+            recorder = Recorder()
+            image = make_image_bytes(width, height, seed=args.photos)
+            started = time.perf_counter()
+            await asyncio.gather(
+                *(
+                    virtual_client(
+                        client,
+                        recorder,
+                        access_tokens[i % len(access_tokens)],
+                        i,
+                        args,
+                        image,
+                    )
+                    for i in range(args.clients)
+                )
+            )
+            duration = time.perf_counter() - started
+            sampler.cancel()
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    routes = recorder.summary()
+    total_requests = sum(r["requests"] for r in routes.values())
+    return {
+        "benchmark": "gallery_load",
+        "environment": environment_info(),
+        "parameters": {k: v for k, v in vars(args).items() if k != "output"},
+        "duration_seconds": duration,
+        "throughput_rps": total_requests / duration if duration else None,
+        "routes": routes,
+        "rss_bytes": {str(p): stats for p, stats in rss.items()},
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    write_report(asyncio.run(run(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""
+Image pipeline micro-benchmark.
+
+Sweeps source sizes (megapixels), source formats, target sizes, codecs,
+qualities and codec effort settings through the same decode/shrink/encode
+helpers used by GalleryService (see pikoshi/utils/images.py), recording
+decode, resize and encode times, output decode time, peak memory and
+output bytes. Inputs come from benchmarks/synthetic_images.py, so runs are
+offline and deterministic. Run from the `backend` directory:
+
+    python -m benchmarks.image_pipeline --megapixels 1,12 --repeat 3
+"""
+
+import argparse
+import ctypes
+import gc
+import io
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List
+
+from PIL import Image, features
+
+from pikoshi.utils.images import (RESIZED_IMAGE_FORMAT, RESIZED_IMAGE_OPTIONS,
+                                  RESIZED_IMAGE_QUALITY, decode_image,
+                                  encode_image, shrink_image)
+
+from .common import environment_info, write_report
+from .synthetic_images import dimensions_for_megapixels, make_image_bytes
+
+# NOTE: "Effort" is codec specific, each entry is one set of save() options.
+DEFAULT_EFFORTS: Dict[str, List[Dict[str, Any]]] = {
+    "WEBP": [{"method": 0}, {"method": 4}, {"method": 6}],
+    "JPEG": [{"optimize": False}, {"optimize": True}],
+    "AVIF": [{"speed": 8}, {"speed": 6}],
+}
+CODEC_FEATURES = {"WEBP": "webp", "JPEG": "jpg", "AVIF": "avif"}
+
+
+def _csv(cast: Callable[[str], Any]) -> Callable[[str], List[Any]]:
+    return lambda value: [cast(v.strip()) for v in value.split(",") if v.strip()]
+
+
+def _target(value: str) -> tuple[str, tuple[int, int]]:
+    name, _, size = value.partition("=")
+    width, height = size.split("x")
+    return name, (int(width), int(height))
+
+
+def _effort(value: str) -> tuple[str, Dict[str, Any]]:
+    """
+    - Parses CODEC:key=value[;key=value] (i.e. WEBP:method=6, JPEG:optimize=1).
+    """
+    codec, _, raw_options = value.partition(":")
+    options: Dict[str, Any] = {}
+    for option in filter(None, raw_options.split(";")):
+        key, _, raw = option.partition("=")
+        options[key] = int(raw) if raw.lstrip("-").isdigit() else raw
+    return codec.upper(), options
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--megapixels", type=_csv(float), default=[1, 2, 4, 8, 12, 24, 48]
+    )
+    parser.add_argument(
+        "--source-formats", type=_csv(str.upper), default=["JPEG", "PNG", "WEBP"]
+    )
+    parser.add_argument(
+        "--targets",
+        type=_csv(_target),
+        default=[("mobile", (480, 320)), ("thumbnail", (300, 200))],
+        help="comma separated name=WIDTHxHEIGHT",
+    )
+    parser.add_argument(
+        "--codecs", type=_csv(str.upper), default=["WEBP", "JPEG", "AVIF"]
+    )
+    parser.add_argument("--qualities", type=_csv(int), default=[60, 75, 85, 95])
+    parser.add_argument(
+        "--effort",
+        type=_effort,
+        action="append",
+        help="CODEC:key=value[;key=value], repeatable, replaces that codec's defaults",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write JSON report here instead of stdout")
+    return parser.parse_args()
+
+
+try:
+    _libc = ctypes.CDLL("libc.so.6")
+except OSError:
+    _libc = None
+
+
+class PeakMemory:
+    """
+    - Measures peak memory growth over a block of code.
+    - On Linux, resets the process' RSS high water mark through
+      /proc/self/clear_refs and reads VmHWM afterwards, which includes
+      Pillow's native allocations. Elsewhere, falls back to tracemalloc,
+      which only sees Python allocations.
+    - NOTE: Freed memory is handed back to the OS first (malloc_trim, no
+      Pillow block cache), otherwise reused arenas would hide the growth.
+    """
+
+    def __init__(self):
+        self.peak_bytes: int | None = None
+        self.method = "vmhwm"
+
+    @staticmethod
+    def _status(field: str) -> int:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1]) * 1024
+        raise OSError(field)
+
+    def __enter__(self) -> "PeakMemory":
+        gc.collect()
+        if _libc is not None:
+            _libc.malloc_trim(0)
+        try:
+            with open("/proc/self/clear_refs", "w") as f:
+                f.write("5")
+            self._baseline = self._status("VmRSS:")
+        except OSError:
+            self.method = "tracemalloc"
+            tracemalloc.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self.method == "vmhwm":
+            self.peak_bytes = self._status("VmHWM:") - self._baseline
+        else:
+            self.peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+
+def _timed(fn: Callable[[], Any]) -> tuple[Any, float]:
+    before = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - before
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    return {"median": statistics.median(values), "min": min(values)}
+
+
+def _decode_output(data: bytes) -> None:
+    with Image.open(io.BytesIO(data)) as img:
+        img.load()
+
+
+def run_case_group(
+    source: bytes,
+    size: tuple[int, int],
+    encoders: List[tuple[str, int, Dict[str, Any]]],
+    repeat: int,
+) -> tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    - Decodes and shrinks `source` once per repeat (shared by every encoder),
+      then encodes the shrunk image with each (codec, quality, options).
+    """
+    decode_times, resize_times = [], []
+    encode_times: List[List[float]] = [[] for _ in encoders]
+    output_decode_times: List[List[float]] = [[] for _ in encoders]
+    output_bytes: List[int] = [0 for _ in encoders]
+    encode_peaks: List[int | None] = [None for _ in encoders]
+    decode_peak = PeakMemory()
+
+    for attempt in range(repeat):
+        with decode_peak if attempt == 0 else nullcontext():
+            img, decode_time = _timed(lambda: decode_image(io.BytesIO(source)))
+            img, resize_time = _timed(lambda: shrink_image(img, size))
+        decode_times.append(decode_time)
+        resize_times.append(resize_time)
+
+        for i, (codec, quality, options) in enumerate(encoders):
+            encode_peak = PeakMemory()
+            with encode_peak if attempt == 0 else nullcontext():
+                encoded, encode_time = _timed(
+                    lambda: encode_image(img, codec, quality, **options).getvalue()
+                )
+            if attempt == 0:
+                encode_peaks[i] = encode_peak.peak_bytes
+            _, output_decode_time = _timed(lambda: _decode_output(encoded))
+            encode_times[i].append(encode_time)
+            output_decode_times[i].append(output_decode_time)
+            output_bytes[i] = len(encoded)
+
+    group = {
+        "decode_seconds": _summary(decode_times),
+        "resize_seconds": _summary(resize_times),
+        "decode_peak_memory_bytes": decode_peak.peak_bytes,
+        "memory_method": decode_peak.method,
+    }
+    results = [
+        {
+            "encode_seconds": _summary(encode_times[i]),
+            "output_decode_seconds": _summary(output_decode_times[i]),
+            "encode_peak_memory_bytes": encode_peaks[i],
+            "output_bytes": output_bytes[i],
+        }
+        for i in range(len(encoders))
+    ]
+    return group, results
+
+
+def build_encoders(args: argparse.Namespace) -> List[tuple[str, int, Dict[str, Any]]]:
+    efforts = {codec: list(options) for codec, options in DEFAULT_EFFORTS.items()}
+    overridden: set[str] = set()
+    for codec, options in args.effort or []:
+        if codec not in overridden:
+            efforts[codec] = []
+            overridden.add(codec)
+        efforts[codec].append(options)
+
+    encoders = []
+    for codec in args.codecs:
+        if not features.check(CODEC_FEATURES.get(codec, codec.lower())):
+            print(f"Skipping {codec}: not supported by this Pillow build", file=sys.stderr)
+            continue
+        for quality in args.qualities:
+            for options in efforts.get(codec, [{}]):
+                encoders.append((codec, quality, options))
+    return encoders
+
+
+def is_production_setting(codec: str, quality: int, options: Dict[str, Any]) -> bool:
+    """
+    - Flags the settings GalleryService currently ships with.
+    - NOTE: Pillow's WEBP encoder ignores `optimize`, and defaults `method` to 4.
+    """
+    if codec != RESIZED_IMAGE_FORMAT or quality != RESIZED_IMAGE_QUALITY:
+        return False
+    effective = {"method": 4, **RESIZED_IMAGE_OPTIONS}
+    effective.pop("optimize", None)
+    return {"method": 4, **options} == effective
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    Image.core.set_blocks_max(0)
+    encoders = build_encoders(args)
+    cases = []
+    for megapixels in args.megapixels:
+        width, height = dimensions_for_megapixels(megapixels)
+        for source_format in args.source_formats:
+            source = make_image_bytes(width, height, args.seed, source_format)
+            for target_name, target_size in args.targets:
+                group, results = run_case_group(
+                    source, target_size, encoders, args.repeat
+                )
+                for (codec, quality, options), result in zip(encoders, results):
+                    cases.append(
+                        {
+                            "megapixels": megapixels,
+                            "width": width,
+                            "height": height,
+                            "source_format": source_format,
+                            "source_bytes": len(source),
+                            "target": target_name,
+                            "target_size": list(target_size),
+                            "codec": codec,
+                            "quality": quality,
+                            "options": options,
+                            "production_setting": is_production_setting(
+                                codec, quality, options
+                            ),
+                            **group,
+                            **result,
+                        }
+                    )
+            del source
+    return {
+        "benchmark": "image_pipeline",
+        "environment": {**environment_info(), "pillow": Image.__version__},
+        "parameters": {
+            k: v for k, v in vars(args).items() if k not in ("output", "effort")
+        },
+        "cases": cases,
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    write_report(run(args), args.output)
+
+
+if __name__ == "__main__":
+    main()
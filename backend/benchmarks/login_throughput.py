@@ -0,0 +1,197 @@
+"""
+Login throughput benchmark.
+
+Seeds N users with a known password, then has concurrent virtual clients
+log in over and over through `/auth/email-login/`, reporting throughput,
+p50/p95/p99 latency and the DB statements and round trips of each login
+(from the X-Debug-* resource headers, see REQUEST_STATS_HEADERS) as JSON.
+
+Run it on two commits and compare the reports to see how a change to the
+login path affects round trips and tail latency. Postgres must be running,
+run from the `backend` directory:
+
+    python -m benchmarks.login_throughput --users 20 --clients 20 --logins 50
+
+Pass `--base-url` (and optionally `--pid`) to drive an already running server
+(started with REQUEST_STATS_HEADERS=true for the round trip counts).
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+from uuid import uuid4
+
+import httpx
+
+from .common import environment_info, percentiles, rss_bytes, write_report
+from .gallery_load import _free_port, wait_for_server
+
+LOGIN = "/auth/email-login/"
+BENCH_PASSWORD = "Bench_Password_1!"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--clients", type=int, default=20, help="virtual clients")
+    parser.add_argument("--logins", type=int, default=50, help="logins per client")
+    parser.add_argument("--base-url", help="drive an already running server")
+    parser.add_argument("--pid", type=int, help="PID of --base-url server, for RSS")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--output", help="write JSON report here instead of stdout")
+    return parser.parse_args()
+
+
+def start_server(args: argparse.Namespace) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = dict(os.environ)
+    env["REQUEST_STATS_HEADERS"] = "true"
+    # Virtual clients share one IP, measure the app, not the limiter
+    env["RATE_LIMIT_ENABLED"] = "false"
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "pikoshi.main:app",
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(port),
+        "--workers",
+        str(args.workers),
+        "--log-level",
+        "warning",
+    ]
+    return subprocess.Popen(command, env=env), f"http://127.0.0.1:{port}"
+
+
+async def seed_users(num_users: int) -> List[str]:
+    """
+    - Creates (or reuses) `bench_login_<i>` users directly in the DB,
+      all sharing BENCH_PASSWORD, and returns their emails.
+    """
+    from pikoshi.database import sessionmanager
+    from pikoshi.services import security_service as SecurityService
+    from pikoshi.services import user_service as UserService
+
+    emails = []
+    async with sessionmanager.session() as db_session:
+        for i in range(num_users):
+            email = f"bench_login_{i}@pikoshi.dev"
+            if not await UserService.get_user_by_email(db_session, email):
+                salt = SecurityService.generate_salt()
+                profile = UserService.generate_user_profile(
+                    f"bench_login_{i}",
+                    await SecurityService.hash_value(BENCH_PASSWORD, salt),
+                    email,
+                    salt,
+                    str(uuid4()),
+                )
+                await UserService.create_user(db_session, profile)
+            emails.append(email)
+    await sessionmanager.close()
+    return emails
+
+
+async def virtual_client(
+    client: httpx.AsyncClient,
+    email: str,
+    logins: int,
+    samples: List[Dict[str, Any]],
+) -> None:
+    for _ in range(logins):
+        start = time.perf_counter()
+        status, error, headers = 0, None, httpx.Headers()
+        try:
+            response = await client.post(
+                LOGIN, json={"email": email, "password": BENCH_PASSWORD}
+            )
+            status, headers = response.status_code, response.headers
+        except Exception as e:
+            error = repr(e)
+        samples.append(
+            {
+                "status": status,
+                "error": error,
+                "latency": time.perf_counter() - start,
+                "sql_statements": headers.get("x-debug-sql-statements"),
+                "db_round_trips": headers.get("x-debug-db-round-trips"),
+            }
+        )
+
+
+def summarize(samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    ok = [s for s in samples if s["error"] is None and s["status"] < 400]
+    status_codes: Dict[str, int] = defaultdict(int)
+    for s in samples:
+        status_codes[str(s["status"])] += 1
+    return {
+        "requests": len(samples),
+        "errors": len(samples) - len(ok),
+        "status_codes": dict(status_codes),
+        "latency_seconds": percentiles([s["latency"] for s in ok]),
+        "sql_statements_per_login": percentiles(
+            [int(s["sql_statements"]) for s in ok if s["sql_statements"]]
+        ),
+        "db_round_trips_per_login": percentiles(
+            [int(s["db_round_trips"]) for s in ok if s["db_round_trips"]]
+        ),
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    server = None
+    base_url, pid = args.base_url, args.pid
+    if base_url is None:
+        server, base_url = start_server(args)
+        pid = server.pid
+    try:
+        await wait_for_server(base_url)
+        emails = await seed_users(args.users)
+        samples: List[Dict[str, Any]] = []
+        limits = httpx.Limits(max_connections=args.clients)
+        async with httpx.AsyncClient(
+            base_url=base_url, timeout=args.timeout, limits=limits
+        ) as client:
+            started = time.perf_counter()
+            await asyncio.gather(
+                *(
+                    virtual_client(
+                        client, emails[i % len(emails)], args.logins, samples
+                    )
+                    for i in range(args.clients)
+                )
+            )
+            duration = time.perf_counter() - started
+        final_rss = rss_bytes(pid) if pid is not None else None
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    return {
+        "benchmark": "login_throughput",
+        "environment": environment_info(),
+        "parameters": {k: v for k, v in vars(args).items() if k != "output"},
+        "duration_seconds": duration,
+        "throughput_rps": len(samples) / duration if duration else None,
+        "login": summarize(samples),
+        "rss_bytes": final_rss,
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    write_report(asyncio.run(run(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
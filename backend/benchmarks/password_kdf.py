@@ -0,0 +1,127 @@
+"""
+Password KDF micro-benchmark.
+
+Runs the scrypt hash used for logins and signups (see
+pikoshi/services/security_service.py) at a sweep of cost settings (N, r, p)
+and thread pool sizes, reporting per hash latency (p50/p95/p99), hashes per
+second and hashes per second per core, i.e. the login throughput ceiling
+each setting leaves a worker with, along with the memory each hash needs.
+The setting currently configured is flagged with `"production_setting": true`.
+Run from the `backend` directory:
+
+    python -m benchmarks.password_kdf --n 14,15,16 --workers 1,2,4
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+from pikoshi.services import security_service as SecurityService
+
+from .common import environment_info, percentiles, write_report
+
+PASSWORD = "Bench_Password_1!"
+
+
+def _csv(cast: Callable[[str], Any]) -> Callable[[str], List[Any]]:
+    return lambda value: [cast(v.strip()) for v in value.split(",") if v.strip()]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--n",
+        type=_csv(int),
+        default=[12, 13, 14, 15, 16, 17],
+        help="comma separated log2(N) values",
+    )
+    parser.add_argument("--r", type=_csv(int), default=[8])
+    parser.add_argument("--p", type=_csv(int), default=[1])
+    parser.add_argument(
+        "--workers",
+        type=_csv(int),
+        default=sorted({1, SecurityService.PASSWORD_HASH_WORKERS, os.cpu_count() or 1}),
+        help="comma separated thread pool sizes",
+    )
+    parser.add_argument(
+        "--hashes", type=int, default=64, help="hashes per case (per worker)"
+    )
+    parser.add_argument("--output", help="write JSON report here instead of stdout")
+    return parser.parse_args()
+
+
+def run_case(n: int, r: int, p: int, workers: int, hashes: int) -> Dict[str, Any]:
+    """
+    - Hashes `hashes * workers` passwords (each with its own salt) on a pool
+      of `workers` threads, the way SecurityService does.
+    """
+    salts = [SecurityService.generate_salt() for _ in range(hashes * workers)]
+    latencies: List[float] = []
+
+    def timed_hash(salt: str) -> None:
+        before = time.perf_counter()
+        SecurityService.scrypt_hash(PASSWORD, salt, n, r, p)
+        latencies.append(time.perf_counter() - before)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Warm up every thread (and the allocator) before timing
+        list(executor.map(timed_hash, salts[:workers]))
+        latencies.clear()
+        cpu_before = time.process_time()
+        started = time.perf_counter()
+        list(executor.map(timed_hash, salts))
+        duration = time.perf_counter() - started
+        cpu_seconds = time.process_time() - cpu_before
+
+    hashes_per_second = len(salts) / duration
+    return {
+        "hashes": len(salts),
+        "duration_seconds": duration,
+        "hashes_per_second": hashes_per_second,
+        "hashes_per_second_per_core": hashes_per_second
+        / min(workers, os.cpu_count() or 1),
+        "cpu_seconds_per_hash": cpu_seconds / len(salts),
+        "latency_seconds": percentiles(latencies),
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    cases = []
+    for log_n in args.n:
+        n = 2**log_n
+        for r in args.r:
+            for p in args.p:
+                for workers in args.workers:
+                    cases.append(
+                        {
+                            "n": n,
+                            "r": r,
+                            "p": p,
+                            "workers": workers,
+                            "memory_bytes_per_hash": 128 * n * r,
+                            "production_setting": (
+                                n == SecurityService.PASSWORD_KDF_N
+                                and r == SecurityService.PASSWORD_KDF_R
+                                and p == SecurityService.PASSWORD_KDF_P
+                                and workers == SecurityService.PASSWORD_HASH_WORKERS
+                            ),
+                            **run_case(n, r, p, workers, args.hashes),
+                        }
+                    )
+    return {
+        "benchmark": "password_kdf",
+        "environment": environment_info(),
+        "parameters": {k: v for k, v in vars(args).items() if k != "output"},
+        "cases": cases,
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    write_report(run(args), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Deterministic synthetic test images, so benchmarks run offline and produce
+byte-identical inputs on every run (for a given Pillow version).
+"""
+
+import io
+import math
+import random
+
+from PIL import Image, ImageDraw
+
+# NOTE: Aspect ratio of most phone/DSLR sensors.
+DEFAULT_ASPECT = 3 / 2
+
+
+def dimensions_for_megapixels(
+    megapixels: float, aspect: float = DEFAULT_ASPECT
+) -> tuple[int, int]:
+    """
+    - Returns (width, height) with the given aspect and roughly `megapixels` MP.
+    """
+    height = int(math.sqrt(megapixels * 1_000_000 / aspect))
+    return int(height * aspect), height
+
+
+def make_image(width: int, height: int, seed: int = 0) -> Image.Image:
+    """
+    - Deterministically draws an RGB test image: a gradient background
+      overlaid with seeded random shapes and a seeded grain texture, so
+      that it neither compresses trivially (like a flat fill) nor behaves
+      like pure noise.
+    """
+    rng = random.Random(seed)
+    gradient = Image.linear_gradient("L").resize((width, height))
+    img = Image.merge(
+        "RGB",
+        (
+            gradient,
+            gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT),
+            gradient.transpose(Image.Transpose.FLIP_TOP_BOTTOM),
+        ),
+    )
+    draw = ImageDraw.Draw(img)
+    for _ in range(24):
+        x0, y0 = rng.randrange(width), rng.randrange(height)
+        x1 = min(width, x0 + rng.randrange(1, max(2, width // 3)))
+        y1 = min(height, y0 + rng.randrange(1, max(2, height // 3)))
+        colour = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+        if rng.random() < 0.5:
+            draw.ellipse((x0, y0, x1, y1), fill=colour)
+        else:
+            draw.rectangle((x0, y0, x1, y1), fill=colour)
+
+    # NOTE: Image.effect_noise() is not seedable, so grain is built from a
+    # seeded 256x256 tile and stretched over the image instead.
+    tile = Image.frombytes("L", (256, 256), rng.randbytes(256 * 256))
+    grain = tile.resize((width, height), Image.Resampling.NEAREST)
+    return Image.blend(img, Image.merge("RGB", (grain, grain, grain)), 0.08)
+
+
+def make_image_bytes(
+    width: int, height: int, seed: int = 0, format: str = "JPEG"
+) -> bytes:
+    """
+    - Encodes `make_image()` in the given source format (i.e. JPEG, PNG, WEBP).
+    """
+    buffer = io.BytesIO()
+    make_image(width, height, seed).save(buffer, format=format)
+    return buffer.getvalue()
@@ -0,0 +1,404 @@
+import asyncio
+import fnmatch
+import hashlib
+import time
+from typing import (Any, AsyncIterator, Awaitable, Callable, Dict, List, Set,
+                    Tuple)
+
+from redis.exceptions import NoScriptError
+
+ScriptFallback = Callable[["MemoryRedis", List[str], List[Any]], Awaitable[Any]]
+
+
+class MemoryRedis:
+    """
+    An in-process stand-in for `redis.asyncio.StrictRedis(decode_responses=True)`.
+
+    Implements the subset of redis commands used throughout Pikoshi on top of
+    a plain dict. Values are stored as strings (mirroring `decode_responses`),
+    and expiry is evaluated lazily whenever a key is touched.
+    NOTE: Data is local to the process, so multiple uvicorn workers will NOT
+    share state. Use for tests, benchmarks and single worker development only.
+    """
+
+    # NOTE: Lua can't run here, so every script used through EVAL/EVALSHA
+    # registers an equivalent Python coroutine under its SHA1 instead
+    # (see `register_script_fallback` and backends/redis_scripts.py).
+    script_fallbacks: Dict[str, ScriptFallback] = {}
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[Any, float | None]] = {}
+        self._subscribers: Set["MemoryPubSub"] = set()
+
+    def _expired(self, key: str) -> bool:
+        entry = self._data.get(key)
+        if entry is None:
+            return True
+        expires_at = entry[1]
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return True
+        return False
+
+    def _lookup(self, key: str) -> Any:
+        if self._expired(key):
+            return None
+        return self._data[key][0]
+
+    @staticmethod
+    def _encode(value: Any) -> str:
+        if isinstance(value, bytes):
+            return value.decode("utf-8")
+        return str(value)
+
+    async def ping(self) -> bool:
+        return True
+
+    async def get(self, name: str) -> str | None:
+        return self._lookup(name)
+
+    async def set(
+        self,
+        name: str,
+        value: Any,
+        ex: int | None = None,
+        px: int | None = None,
+        nx: bool = False,
+        xx: bool = False,
+    ) -> bool | None:
+        exists = self._lookup(name) is not None
+        if (nx and exists) or (xx and not exists):
+            return None
+        expires_at = None
+        if ex is not None:
+            expires_at = time.monotonic() + ex
+        elif px is not None:
+            expires_at = time.monotonic() + px / 1000
+        self._data[name] = (self._encode(value), expires_at)
+        return True
+
+    async def mget(self, *names: str) -> List[str | None]:
+        return [self._lookup(name) for name in names]
+
+    async def getdel(self, name: str) -> str | None:
+        value = self._lookup(name)
+        if value is not None:
+            del self._data[name]
+        return value
+
+    async def delete(self, *names: str) -> int:
+        deleted = 0
+        for name in names:
+            if not self._expired(name):
+                del self._data[name]
+                deleted += 1
+        return deleted
+
+    async def exists(self, *names: str) -> int:
+        return sum(1 for name in names if not self._expired(name))
+
+    async def expire(self, name: str, time_seconds: int) -> bool:
+        if self._expired(name):
+            return False
+        value, _ = self._data[name]
+        self._data[name] = (value, time.monotonic() + time_seconds)
+        return True
+
+    async def ttl(self, name: str) -> int:
+        if self._expired(name):
+            return -2
+        expires_at = self._data[name][1]
+        if expires_at is None:
+            return -1
+        return max(0, round(expires_at - time.monotonic()))
+
+    async def incr(self, name: str, amount: int = 1) -> int:
+        current = self._lookup(name)
+        expires_at = None if current is None else self._data[name][1]
+        value = int(current or 0) + amount
+        self._data[name] = (str(value), expires_at)
+        return value
+
+    def _hash(self, name: str) -> Dict[str, str]:
+        current = self._lookup(name)
+        if current is None:
+            current = {}
+            self._data[name] = (current, None)
+        return current
+
+    async def hset(
+        self,
+        name: str,
+        key: str | None = None,
+        value: Any = None,
+        mapping: Dict[str, Any] | None = None,
+    ) -> int:
+        fields = dict(mapping or {})
+        if key is not None:
+            fields[key] = value
+        items = self._hash(name)
+        added = sum(1 for field in fields if field not in items)
+        items.update({field: self._encode(v) for field, v in fields.items()})
+        return added
+
+    async def hmget(self, name: str, keys: List[str], *args: str) -> List[str | None]:
+        items = self._lookup(name) or {}
+        return [items.get(key) for key in [*keys, *args]]
+
+    async def hgetall(self, name: str) -> Dict[str, str]:
+        return dict(self._lookup(name) or {})
+
+    def _list(self, name: str) -> List[str]:
+        current = self._lookup(name)
+        if current is None:
+            current = []
+            self._data[name] = (current, None)
+        return current
+
+    async def lpush(self, name: str, *values: Any) -> int:
+        items = self._list(name)
+        for value in values:
+            items.insert(0, self._encode(value))
+        return len(items)
+
+    async def rpoplpush(self, src: str, dst: str) -> str | None:
+        items = self._lookup(src)
+        if not items:
+            return None
+        value = items.pop()
+        self._list(dst).insert(0, value)
+        return value
+
+    async def lrem(self, name: str, count: int, value: Any) -> int:
+        items = self._lookup(name) or []
+        value = self._encode(value)
+        matches = [i for i, item in enumerate(items) if item == value]
+        if count > 0:
+            matches = matches[:count]
+        elif count < 0:
+            matches = matches[count:]
+        for i in reversed(matches):
+            del items[i]
+        return len(matches)
+
+    async def llen(self, name: str) -> int:
+        return len(self._lookup(name) or [])
+
+    async def lrange(self, name: str, start: int, end: int) -> List[str]:
+        items = self._lookup(name) or []
+        return items[start : None if end == -1 else end + 1]
+
+    async def zadd(self, name: str, mapping: Dict[str, float]) -> int:
+        scores = self._lookup(name)
+        if scores is None:
+            scores = {}
+            self._data[name] = (scores, None)
+        added = sum(1 for member in mapping if member not in scores)
+        scores.update({self._encode(m): float(s) for m, s in mapping.items()})
+        return added
+
+    @staticmethod
+    def _score_bound(value: float | str) -> Tuple[float, bool]:
+        # "(<score>" excludes the score itself, as in Redis
+        text = str(value)
+        return float(text.lstrip("(")), text.startswith("(")
+
+    def _in_range(self, score: float, low: float | str, high: float | str) -> bool:
+        low_score, low_exclusive = self._score_bound(low)
+        high_score, high_exclusive = self._score_bound(high)
+        above = score > low_score if low_exclusive else score >= low_score
+        below = score < high_score if high_exclusive else score <= high_score
+        return above and below
+
+    def _zrange(
+        self,
+        name: str,
+        min: float | str,
+        max: float | str,
+        start: int | None,
+        num: int | None,
+        reverse: bool,
+    ) -> List[str]:
+        scores = self._lookup(name) or {}
+        members = sorted(
+            (
+                (score, member)
+                for member, score in scores.items()
+                if self._in_range(score, min, max)
+            ),
+            reverse=reverse,
+        )
+        members = members[start or 0 :]
+        if num is not None:
+            members = members[:num]
+        return [member for _, member in members]
+
+    async def zrangebyscore(
+        self,
+        name: str,
+        min: float | str,
+        max: float | str,
+        start: int | None = None,
+        num: int | None = None,
+    ) -> List[str]:
+        return self._zrange(name, min, max, start, num, reverse=False)
+
+    async def zrevrangebyscore(
+        self,
+        name: str,
+        max: float | str,
+        min: float | str,
+        start: int | None = None,
+        num: int | None = None,
+    ) -> List[str]:
+        return self._zrange(name, min, max, start, num, reverse=True)
+
+    async def zremrangebyrank(self, name: str, min: int, max: int) -> int:
+        scores = self._lookup(name) or {}
+        ranked = [member for _, member in sorted((s, m) for m, s in scores.items())]
+        start = len(ranked) + min if min < 0 else min
+        stop = len(ranked) + max + 1 if max < 0 else max + 1
+        if start < 0:
+            start = 0
+        removed = ranked[start:stop] if start < stop else []
+        for member in removed:
+            del scores[member]
+        return len(removed)
+
+    async def zrem(self, name: str, *members: Any) -> int:
+        scores = self._lookup(name) or {}
+        return sum(
+            1
+            for member in members
+            if scores.pop(self._encode(member), None) is not None
+        )
+
+    async def zcard(self, name: str) -> int:
+        return len(self._lookup(name) or {})
+
+    @classmethod
+    def register_script_fallback(cls, script: str, fallback: ScriptFallback) -> None:
+        cls.script_fallbacks[hashlib.sha1(script.encode()).hexdigest()] = fallback
+
+    async def eval(self, script: str, numkeys: int, *keys_and_args: Any) -> Any:
+        sha = hashlib.sha1(script.encode()).hexdigest()
+        return await self.evalsha(sha, numkeys, *keys_and_args)
+
+    async def evalsha(self, sha: str, numkeys: int, *keys_and_args: Any) -> Any:
+        fallback = self.script_fallbacks.get(sha)
+        if fallback is None:
+            raise NoScriptError("No matching script.")
+        return await fallback(
+            self, list(keys_and_args[:numkeys]), list(keys_and_args[numkeys:])
+        )
+
+    async def scan_iter(
+        self, match: str | None = None, count: int | None = None
+    ) -> AsyncIterator[str]:
+        for key in list(self._data):
+            if not self._expired(key) and (
+                match is None or fnmatch.fnmatch(key, match)
+            ):
+                yield key
+
+    async def publish(self, channel: str, message: Any) -> int:
+        receivers = [s for s in self._subscribers if channel in s.channels]
+        for subscriber in receivers:
+            subscriber.deliver("message", channel, self._encode(message))
+        return len(receivers)
+
+    def pubsub(self) -> "MemoryPubSub":
+        return MemoryPubSub(self)
+
+    async def flushdb(self) -> bool:
+        self._data.clear()
+        return True
+
+    def pipeline(self, transaction: bool = True) -> "MemoryPipeline":
+        return MemoryPipeline(self)
+
+    async def aclose(self, close_connection_pool: bool | None = None) -> None:
+        return None
+
+
+class MemoryPipeline:
+    """
+    - Stand-in for `redis.asyncio.client.Pipeline`, queueing MemoryRedis
+      commands and running them back to back on `execute()`.
+    - NOTE: Nothing else runs on the event loop in between, so every
+      pipeline is effectively a transaction.
+    """
+
+    def __init__(self, redis: MemoryRedis):
+        self._redis = redis
+        self._commands: List[Tuple[str, Tuple[Any, ...], Dict[str, Any]]] = []
+
+    def __getattr__(self, name: str) -> Callable[..., "MemoryPipeline"]:
+        if name.startswith("_") or not hasattr(self._redis, name):
+            raise AttributeError(name)
+
+        def queue(*args: Any, **kwargs: Any) -> "MemoryPipeline":
+            self._commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self) -> List[Any]:
+        commands, self._commands = self._commands, []
+        return [
+            await getattr(self._redis, name)(*args, **kwargs)
+            for name, args, kwargs in commands
+        ]
+
+    async def __aenter__(self) -> "MemoryPipeline":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self._commands = []
+
+
+class MemoryPubSub:
+    """
+    - Stand-in for `redis.asyncio.client.PubSub`, delivering MemoryRedis
+      publish() calls to subscribers of the same MemoryRedis instance.
+    """
+
+    def __init__(self, redis: MemoryRedis):
+        self._redis = redis
+        self._queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue()
+        self.channels: Set[str] = set()
+
+    def deliver(self, kind: str, channel: str, data: Any) -> None:
+        self._queue.put_nowait({"type": kind, "channel": channel, "data": data})
+
+    async def subscribe(self, *channels: str) -> None:
+        for channel in channels:
+            self.channels.add(channel)
+            self.deliver("subscribe", channel, len(self.channels))
+        self._redis._subscribers.add(self)
+
+    async def unsubscribe(self, *channels: str) -> None:
+        for channel in channels or tuple(self.channels):
+            self.channels.discard(channel)
+            self.deliver("unsubscribe", channel, len(self.channels))
+        if not self.channels:
+            self._redis._subscribers.discard(self)
+
+    async def get_message(
+        self, ignore_subscribe_messages: bool = False, timeout: float | None = 0.0
+    ) -> Dict[str, Any] | None:
+        try:
+            message = await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if ignore_subscribe_messages and message["type"] != "message":
+            return None
+        return message
+
+    async def listen(self) -> AsyncIterator[Dict[str, Any]]:
+        while True:
+            yield await self._queue.get()
+
+    async def aclose(self) -> None:
+        self.channels.clear()
+        self._redis._subscribers.discard(self)
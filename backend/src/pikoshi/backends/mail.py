@@ -0,0 +1,43 @@
+from typing import Any, Dict, List
+
+import resend
+
+
+class ResendMailBackend:
+    """
+    Sends mail through the Resend Email API.
+    """
+
+    # NOTE: Resend accepts up to 100 messages per batch request, and limits
+    # each API key to 2 requests per second by default.
+    max_batch_size = 100
+    rate_limit_per_second = 2.0
+
+    def __init__(self, api_key: str | None):
+        resend.api_key = api_key
+
+    def send(self, params: Dict[str, Any]) -> Any:
+        return resend.Emails.send(params)  # type:ignore
+
+    def send_batch(self, messages: List[Dict[str, Any]]) -> Any:
+        return resend.Batch.send(messages)  # type:ignore
+
+
+class MemoryMailBackend:
+    """
+    A fake mail sink that records every message instead of sending it.
+    Inspect `outbox` in tests/benchmarks to see what would have been sent.
+    """
+
+    max_batch_size = 100
+    rate_limit_per_second = 0.0
+
+    def __init__(self):
+        self.outbox: List[Dict[str, Any]] = []
+
+    def send(self, params: Dict[str, Any]) -> Dict[str, str]:
+        self.outbox.append(params)
+        return {"id": f"memory-{len(self.outbox)}"}
+
+    def send_batch(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {"data": [self.send(params) for params in messages]}
@@ -0,0 +1,71 @@
+import hashlib
+import math
+import time
+from typing import Any, List, Tuple
+
+from .cache import MemoryRedis, ScriptFallback
+
+# NOTE: Lua scripts run atomically in Redis through EVAL/EVALSHA, each next
+# to the Python coroutine standing in for it on MemoryRedis (registered by
+# config/redis_config.py for CACHE_BACKEND="memory"). Keep both in step,
+# tests/test_rate_limit.py runs the Lua against a real Redis when it can.
+
+# NOTE: Reads the clock with TIME inside the script, so every worker shares
+# Redis' clock (needs Redis >= 5, where scripts replicate their effects).
+# KEYS[1]: bucket, ARGV: capacity, refill rate (tokens/second), lease size.
+# Returns {tokens granted (0, 1 or 1 + lease), milliseconds until 1 token}.
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local lease = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local granted = 0
+if lease > 0 and tokens >= 1 + lease and tokens >= capacity / 2 then
+  granted = 1 + lease
+elseif tokens >= 1 then
+  granted = 1
+end
+tokens = tokens - granted
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+local retry_after = 0
+if granted == 0 then
+  retry_after = math.ceil((1 - tokens) / rate * 1000)
+end
+return {granted, retry_after}
+"""
+TOKEN_BUCKET_SHA = hashlib.sha1(TOKEN_BUCKET_LUA.encode()).hexdigest()
+
+
+async def token_bucket(
+    client: MemoryRedis, keys: List[str], args: List[Any]
+) -> List[int]:
+    """
+    - TOKEN_BUCKET_LUA for MemoryRedis, keeping the bucket in the same hash.
+    """
+    capacity, rate, lease = float(args[0]), float(args[1]), int(args[2])
+    now = time.time()
+    stored, ts = await client.hmget(keys[0], ["tokens", "ts"])
+    tokens = capacity if stored is None else float(stored)
+    last = now if ts is None else float(ts)
+    tokens = min(capacity, tokens + max(0, now - last) * rate)
+    granted = 0
+    if lease > 0 and tokens >= 1 + lease and tokens >= capacity / 2:
+        granted = 1 + lease
+    elif tokens >= 1:
+        granted = 1
+    tokens -= granted
+    await client.hset(keys[0], mapping={"tokens": str(tokens), "ts": str(now)})
+    await client.expire(keys[0], math.ceil(capacity / rate) + 1)
+    retry_after = 0 if granted else math.ceil((1 - tokens) / rate * 1000)
+    return [granted, retry_after]
+
+
+SCRIPT_FALLBACKS: List[Tuple[str, ScriptFallback]] = [
+    (TOKEN_BUCKET_LUA, token_bucket),
+]
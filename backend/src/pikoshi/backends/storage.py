@@ -0,0 +1,312 @@
+import asyncio
+import hashlib
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+from urllib.parse import quote, unquote
+
+from botocore.exceptions import ClientError
+
+
+def _client_error(code: str, message: str, operation_name: str) -> ClientError:
+    """
+    - Builds a botocore ClientError shaped like the ones raised by aiobotocore,
+      so that callers inspecting `e.response["Error"]["Code"]` behave the same
+      against the stand-in as against S3.
+    """
+    return ClientError({"Error": {"Code": code, "Message": message}}, operation_name)
+
+
+class MemoryObjectStore:
+    """
+    A dict backed object store, keyed by bucket and then by object key.
+    Contents are lost when the process exits.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[str, Dict[str, Tuple[bytes, datetime]]] = {}
+
+    def bucket_exists(self, bucket: str) -> bool:
+        return bucket in self._buckets
+
+    def list_buckets(self) -> List[str]:
+        return sorted(self._buckets)
+
+    def create_bucket(self, bucket: str) -> None:
+        self._buckets.setdefault(bucket, {})
+
+    def delete_bucket(self, bucket: str) -> None:
+        self._buckets.pop(bucket, None)
+
+    def put(self, bucket: str, key: str, body: bytes) -> datetime:
+        last_modified = datetime.now(timezone.utc)
+        self._buckets[bucket][key] = (body, last_modified)
+        return last_modified
+
+    def get(self, bucket: str, key: str) -> Tuple[bytes, datetime] | None:
+        return self._buckets[bucket].get(key)
+
+    def delete(self, bucket: str, key: str) -> None:
+        self._buckets[bucket].pop(key, None)
+
+    def keys(self, bucket: str) -> List[str]:
+        return sorted(self._buckets[bucket])
+
+    def stat(self, bucket: str, key: str) -> Tuple[int, datetime]:
+        body, last_modified = self._buckets[bucket][key]
+        return len(body), last_modified
+
+
+class FilesystemObjectStore:
+    """
+    An object store that keeps every bucket as a directory under `root`,
+    and every object as a single file named after its (url quoted) key.
+    Contents survive restarts, which is handy for seeding benchmarks once.
+    """
+
+    def __init__(self, root: str):
+        self._root = root
+        os.makedirs(self._root, exist_ok=True)
+
+    def _bucket_path(self, bucket: str) -> str:
+        return os.path.join(self._root, quote(bucket, safe=""))
+
+    def _object_path(self, bucket: str, key: str) -> str:
+        return os.path.join(self._bucket_path(bucket), quote(key, safe=""))
+
+    def bucket_exists(self, bucket: str) -> bool:
+        return os.path.isdir(self._bucket_path(bucket))
+
+    def list_buckets(self) -> List[str]:
+        return sorted(unquote(name) for name in os.listdir(self._root))
+
+    def create_bucket(self, bucket: str) -> None:
+        os.makedirs(self._bucket_path(bucket), exist_ok=True)
+
+    def delete_bucket(self, bucket: str) -> None:
+        bucket_path = self._bucket_path(bucket)
+        if os.path.isdir(bucket_path):
+            for name in os.listdir(bucket_path):
+                os.remove(os.path.join(bucket_path, name))
+            os.rmdir(bucket_path)
+
+    def put(self, bucket: str, key: str, body: bytes) -> datetime:
+        with open(self._object_path(bucket, key), "wb") as f:
+            f.write(body)
+        return self.stat(bucket, key)[1]
+
+    def get(self, bucket: str, key: str) -> Tuple[bytes, datetime] | None:
+        object_path = self._object_path(bucket, key)
+        if not os.path.isfile(object_path):
+            return None
+        with open(object_path, "rb") as f:
+            body = f.read()
+        return body, self.stat(bucket, key)[1]
+
+    def delete(self, bucket: str, key: str) -> None:
+        object_path = self._object_path(bucket, key)
+        if os.path.isfile(object_path):
+            os.remove(object_path)
+
+    def keys(self, bucket: str) -> List[str]:
+        return sorted(unquote(name) for name in os.listdir(self._bucket_path(bucket)))
+
+    def stat(self, bucket: str, key: str) -> Tuple[int, datetime]:
+        st = os.stat(self._object_path(bucket, key))
+        return st.st_size, datetime.fromtimestamp(st.st_mtime, tz=timezone.utc)
+
+
+class _StreamingBody:
+    """
+    - Mimics aiobotocore's StreamingBody: `await body.read()` returns bytes,
+      paced by the client's configured bandwidth.
+    """
+
+    def __init__(self, client: "FakeS3Client", data: bytes):
+        self._client = client
+        self._data = data
+
+    async def read(self) -> bytes:
+        await self._client._transfer(len(self._data))
+        return self._data
+
+    def close(self) -> None:
+        pass
+
+
+class FakeS3Client:
+    """
+    An in-process stand-in for the aiobotocore S3 client.
+
+    Implements the subset of the S3 API used by S3Service/GalleryService
+    on top of either a MemoryObjectStore or a FilesystemObjectStore.
+    Every call sleeps for `latency` seconds, and object bodies are additionally
+    paced at `bandwidth` bytes per second (0 disables pacing), so that local
+    benchmark runs see realistic, reproducible storage costs.
+    """
+
+    def __init__(
+        self,
+        store: MemoryObjectStore | FilesystemObjectStore,
+        latency: float = 0.0,
+        bandwidth: int = 0,
+    ):
+        self._store = store
+        self._latency = latency
+        self._bandwidth = bandwidth
+
+    async def __aenter__(self) -> "FakeS3Client":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+    async def _round_trip(self) -> None:
+        if self._latency > 0:
+            await asyncio.sleep(self._latency)
+
+    async def _transfer(self, num_bytes: int) -> None:
+        if self._bandwidth > 0 and num_bytes > 0:
+            await asyncio.sleep(num_bytes / self._bandwidth)
+
+    def _require_bucket(self, bucket: str, operation_name: str) -> None:
+        if not self._store.bucket_exists(bucket):
+            raise _client_error(
+                "NoSuchBucket", "The specified bucket does not exist", operation_name
+            )
+
+    async def list_buckets(self) -> Dict[str, Any]:
+        await self._round_trip()
+        return {"Buckets": [{"Name": name} for name in self._store.list_buckets()]}
+
+    async def head_bucket(self, Bucket: str) -> Dict[str, Any]:
+        await self._round_trip()
+        if not self._store.bucket_exists(Bucket):
+            raise _client_error("404", "Not Found", "HeadBucket")
+        return {}
+
+    async def create_bucket(self, Bucket: str, **kwargs) -> Dict[str, Any]:
+        await self._round_trip()
+        if self._store.bucket_exists(Bucket):
+            raise _client_error(
+                "BucketAlreadyOwnedByYou",
+                "Your previous request to create the named bucket succeeded",
+                "CreateBucket",
+            )
+        self._store.create_bucket(Bucket)
+        return {"Location": f"/{Bucket}"}
+
+    async def delete_bucket(self, Bucket: str) -> Dict[str, Any]:
+        await self._round_trip()
+        self._require_bucket(Bucket, "DeleteBucket")
+        self._store.delete_bucket(Bucket)
+        return {}
+
+    async def put_object(
+        self, Bucket: str, Key: str, Body: bytes | str = b"", **kwargs
+    ) -> Dict[str, Any]:
+        await self._round_trip()
+        self._require_bucket(Bucket, "PutObject")
+        body = Body.encode() if isinstance(Body, str) else bytes(Body)
+        await self._transfer(len(body))
+        self._store.put(Bucket, Key, body)
+        return {"ETag": f'"{hashlib.md5(body).hexdigest()}"'}
+
+    async def get_object(self, Bucket: str, Key: str, **kwargs) -> Dict[str, Any]:
+        await self._round_trip()
+        self._require_bucket(Bucket, "GetObject")
+        stored = self._store.get(Bucket, Key)
+        if stored is None:
+            raise _client_error(
+                "NoSuchKey", "The specified key does not exist.", "GetObject"
+            )
+        body, last_modified = stored
+        return {
+            "Body": _StreamingBody(self, body),
+            "ContentLength": len(body),
+            "LastModified": last_modified,
+        }
+
+    async def delete_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        await self._round_trip()
+        self._require_bucket(Bucket, "DeleteObject")
+        self._store.delete(Bucket, Key)
+        return {}
+
+    def _list(
+        self, bucket: str, prefix: str, delimiter: str | None, start_after: str | None
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        contents = []
+        common_prefixes: List[str] = []
+        for key in self._store.keys(bucket):
+            if not key.startswith(prefix):
+                continue
+            if start_after is not None and key <= start_after:
+                continue
+            if delimiter:
+                index = key.find(delimiter, len(prefix))
+                if index != -1:
+                    common_prefix = key[: index + len(delimiter)]
+                    if common_prefix not in common_prefixes:
+                        common_prefixes.append(common_prefix)
+                    continue
+            size, last_modified = self._store.stat(bucket, key)
+            contents.append({"Key": key, "LastModified": last_modified, "Size": size})
+        return contents, common_prefixes
+
+    async def list_objects_v2(
+        self,
+        Bucket: str,
+        Prefix: str = "",
+        MaxKeys: int = 1000,
+        ContinuationToken: str | None = None,
+        Delimiter: str | None = None,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """
+        - NOTE: Continuation tokens are simply the last key returned,
+          which is sufficient as keys are listed in lexicographical order.
+        """
+        await self._round_trip()
+        self._require_bucket(Bucket, "ListObjectsV2")
+        contents, common_prefixes = self._list(
+            Bucket, Prefix, Delimiter, ContinuationToken
+        )
+        response: Dict[str, Any] = {
+            "Name": Bucket,
+            "Prefix": Prefix,
+            "MaxKeys": MaxKeys,
+            "KeyCount": min(len(contents), MaxKeys),
+            "IsTruncated": len(contents) > MaxKeys,
+        }
+        if contents:
+            response["Contents"] = contents[:MaxKeys]
+        if common_prefixes:
+            response["CommonPrefixes"] = [{"Prefix": p} for p in common_prefixes]
+        if response["IsTruncated"]:
+            response["NextContinuationToken"] = contents[MaxKeys - 1]["Key"]
+        return response
+
+    async def list_objects(
+        self,
+        Bucket: str,
+        Prefix: str = "",
+        Delimiter: str | None = None,
+        Marker: str | None = None,
+        MaxKeys: int = 1000,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        await self._round_trip()
+        self._require_bucket(Bucket, "ListObjects")
+        contents, common_prefixes = self._list(Bucket, Prefix, Delimiter, Marker)
+        response: Dict[str, Any] = {
+            "Name": Bucket,
+            "Prefix": Prefix,
+            "MaxKeys": MaxKeys,
+            "IsTruncated": len(contents) > MaxKeys,
+        }
+        if contents:
+            response["Contents"] = contents[:MaxKeys]
+        if common_prefixes:
+            response["CommonPrefixes"] = [{"Prefix": p} for p in common_prefixes]
+        return response
@@ -0,0 +1,55 @@
+import importlib.util
+import os
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+HTTP_CLIENT_TIMEOUT = float(os.environ.get("HTTP_CLIENT_TIMEOUT") or 10)
+HTTP_CLIENT_MAX_CONNECTIONS = int(os.environ.get("HTTP_CLIENT_MAX_CONNECTIONS") or 100)
+HTTP_CLIENT_KEEPALIVE_SECONDS = float(
+    os.environ.get("HTTP_CLIENT_KEEPALIVE_SECONDS") or 60
+)
+# NOTE: HTTP/2 is used whenever the optional `h2` package is installed
+# (i.e. `httpx[http2]`), otherwise connections fall back to HTTP/1.1.
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class SharedHttpClient:
+    """
+    One keep-alive `httpx.AsyncClient` shared by every outbound API call
+    (i.e. Google OAuth2), so DNS, TCP and TLS setup are paid once per
+    connection rather than once per call.
+
+    Opened on app startup and closed on shutdown (see main.py), or lazily
+    on first use (scripts, tests).
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport | None = None):
+        self.transport = transport
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self.start()
+        return self._client  # type:ignore
+
+    def start(self) -> None:
+        self._client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=HTTP_CLIENT_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=HTTP_CLIENT_MAX_CONNECTIONS,
+                keepalive_expiry=HTTP_CLIENT_KEEPALIVE_SECONDS,
+            ),
+            transport=self.transport,
+        )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+http_client = SharedHttpClient()
@@ -0,0 +1,15 @@
+import os
+
+from dotenv import load_dotenv
+
+from ..backends.mail import MemoryMailBackend, ResendMailBackend
+
+load_dotenv()
+# NOTE: Set MAIL_BACKEND="memory" to record outgoing mail instead of
+# sending it through Resend.
+MAIL_BACKEND = os.environ.get("MAIL_BACKEND") or "resend"
+
+if MAIL_BACKEND == "memory":
+    mail_backend = MemoryMailBackend()
+else:
+    mail_backend = ResendMailBackend(os.environ.get("RESEND_API_KEY"))
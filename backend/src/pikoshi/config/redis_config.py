@@ -1,13 +1,109 @@
 import os
+from typing import Any, List
 
 from dotenv import load_dotenv
 from redis import asyncio as aioredis
 
+from ..backends.cache import MemoryRedis
+from ..backends.redis_scripts import SCRIPT_FALLBACKS
+from ..utils.accounting import account_redis_command
+from ..utils.metrics import (REDIS_COMMAND_DURATION, REDIS_COMMAND_ERRORS,
+                             InstrumentedClient)
+
 load_dotenv()
-redis_instance = aioredis.StrictRedis(
-    host=str(os.environ.get("REDIS_HOST")),
-    port=int(str(os.environ.get("REDIS_PORT"))),
-    password=str(os.environ.get("REDIS_PASS")),
-    db=0,
-    decode_responses=True,
+# NOTE: Set CACHE_BACKEND="memory" to run without a Redis server
+# (tests, benchmarks, single worker development).
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND") or "redis"
+# NOTE: Each uvicorn worker opens at most REDIS_MAX_CONNECTIONS connections,
+# further commands wait up to REDIS_POOL_TIMEOUT seconds for one to free up.
+# Idle connections are PINGed before reuse after REDIS_HEALTH_CHECK_INTERVAL.
+REDIS_MAX_CONNECTIONS = int(os.environ.get("REDIS_MAX_CONNECTIONS") or 50)
+REDIS_POOL_TIMEOUT = float(os.environ.get("REDIS_POOL_TIMEOUT") or 5)
+REDIS_SOCKET_TIMEOUT = float(os.environ.get("REDIS_SOCKET_TIMEOUT") or 5)
+REDIS_SOCKET_CONNECT_TIMEOUT = float(
+    os.environ.get("REDIS_SOCKET_CONNECT_TIMEOUT") or 2
 )
+REDIS_HEALTH_CHECK_INTERVAL = int(os.environ.get("REDIS_HEALTH_CHECK_INTERVAL") or 30)
+
+if CACHE_BACKEND == "memory":
+    for script, fallback in SCRIPT_FALLBACKS:
+        MemoryRedis.register_script_fallback(script, fallback)
+    redis_client = MemoryRedis()
+else:
+    redis_client = aioredis.StrictRedis(
+        connection_pool=aioredis.BlockingConnectionPool(
+            host=str(os.environ.get("REDIS_HOST")),
+            port=int(str(os.environ.get("REDIS_PORT"))),
+            password=str(os.environ.get("REDIS_PASS")),
+            db=0,
+            decode_responses=True,
+            max_connections=REDIS_MAX_CONNECTIONS,
+            timeout=REDIS_POOL_TIMEOUT,
+            socket_timeout=REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=REDIS_SOCKET_CONNECT_TIMEOUT,
+            socket_keepalive=True,
+            health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+        )
+    )
+
+
+def _instrument(client: Any) -> Any:
+    # NOTE: Commands are timed and traced per command name (see utils/metrics.py)
+    # and counted against the current request (see utils/accounting.py).
+    return InstrumentedClient(
+        client,
+        REDIS_COMMAND_DURATION,
+        REDIS_COMMAND_ERRORS,
+        remote="redis",
+        on_call=account_redis_command,
+    )
+
+
+redis_instance = _instrument(redis_client)
+
+
+class _Pipelines:
+    async def pipeline(self, pipe: Any) -> List[Any]:
+        return await pipe.execute()
+
+
+_pipelines = _instrument(_Pipelines())
+
+
+def redis_pipeline(transaction: bool = False) -> Any:
+    """
+    - Queues commands to send to Redis in a single round trip with
+      `execute_pipeline`, wrapped in MULTI/EXEC when `transaction` is set.
+    """
+    return redis_client.pipeline(transaction=transaction)
+
+
+async def execute_pipeline(pipe: Any) -> List[Any]:
+    """
+    - Sends a pipeline's queued commands, timed and counted as a single
+      `pipeline` command, and returns their results in order.
+    """
+    return await _pipelines.pipeline(pipe)
+
+
+async def consume(name: str) -> str | None:
+    """
+    - Atomically reads and deletes a key (GETDEL), i.e. a one time token:
+      of any number of concurrent callers, exactly one gets its value.
+    """
+    return await redis_instance.getdel(name)
+
+
+async def set_once(name: str, value: Any, ex: int) -> bool:
+    """
+    - Sets a key expiring in `ex` seconds, unless it already exists
+      (SET NX EX). Returns whether it was set.
+    """
+    return bool(await redis_instance.set(name, value, ex=ex, nx=True))
+
+
+async def close_redis() -> None:
+    """
+    - Closes the client and every pooled connection (see main.py lifespan).
+    """
+    await redis_client.aclose(close_connection_pool=True)
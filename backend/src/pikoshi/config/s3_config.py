@@ -0,0 +1,57 @@
+import os
+
+from aiobotocore.session import get_session
+from dotenv import load_dotenv
+
+from ..backends.storage import (FakeS3Client, FilesystemObjectStore,
+                                MemoryObjectStore)
+from ..utils.accounting import account_s3_call
+from ..utils.metrics import (S3_REQUEST_DURATION, S3_REQUEST_ERRORS,
+                             InstrumentedClientContext)
+
+load_dotenv()
+AWS_REGION = str(os.environ.get("AWS_REGION"))
+# NOTE: STORAGE_BACKEND is one of "s3", "memory" or "filesystem".
+# The latter two are in-process stand-ins for S3, see backends/storage.py.
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND") or "s3"
+FAKE_S3_ROOT = os.environ.get("FAKE_S3_ROOT") or "./fake_s3"
+FAKE_S3_LATENCY_MS = float(os.environ.get("FAKE_S3_LATENCY_MS") or 0)
+FAKE_S3_BANDWIDTH_BPS = int(os.environ.get("FAKE_S3_BANDWIDTH_BPS") or 0)
+
+session = get_session()
+
+if STORAGE_BACKEND == "memory":
+    object_store = MemoryObjectStore()
+elif STORAGE_BACKEND == "filesystem":
+    object_store = FilesystemObjectStore(FAKE_S3_ROOT)
+else:
+    object_store = None
+
+
+def create_s3_client(region_name: str | None = AWS_REGION):
+    """
+    - Returns an async context manager yielding an S3 client.
+    - Uses aiobotocore against AWS by default, or a FakeS3Client
+      (with injected latency/bandwidth) when STORAGE_BACKEND is
+      "memory" or "filesystem".
+    - Either way, calls are timed and traced per operation
+      (see utils/metrics.py), and counted against the current request
+      (see utils/accounting.py).
+    """
+    if object_store is not None:
+        client_context = FakeS3Client(
+            object_store,
+            latency=FAKE_S3_LATENCY_MS / 1000,
+            bandwidth=FAKE_S3_BANDWIDTH_BPS,
+        )
+    elif region_name is None:
+        client_context = session.create_client("s3")
+    else:
+        client_context = session.create_client("s3", region_name=region_name)
+    return InstrumentedClientContext(
+        client_context,
+        S3_REQUEST_DURATION,
+        S3_REQUEST_ERRORS,
+        remote="s3",
+        on_call=account_s3_call,
+    )
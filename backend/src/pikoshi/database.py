@@ -1,24 +1,241 @@
+import asyncio
 import contextlib
+import logging
 import os
+import time
+from contextvars import ContextVar, Token
 from typing import Any, AsyncIterator
 
 from dotenv import load_dotenv
-from sqlalchemy.ext.asyncio import (AsyncConnection, AsyncSession,
+from sqlalchemy import event, make_url, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import (AsyncConnection, AsyncEngine, AsyncSession,
                                     async_sessionmaker, create_async_engine)
-from sqlalchemy.orm import declarative_base
+from sqlalchemy.orm import Session, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from .utils import accounting, tracing
+from .utils.logger import logger
+from .utils.metrics import (DB_POOL_CHECKOUT_TIMEOUTS, DB_POOL_CHECKOUT_WAIT,
+                            DB_POOL_OVERFLOW, instrument_pool)
 
 Base = declarative_base()
 
 
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    The default asyncio engine pool, additionally recording how long every
+    checkout waited for a free (or newly opened) connection, and how many
+    overflow connections are open, so requests queueing on the pool show up
+    in /metrics, labelled with the pool's name (see `set_name`).
+    """
+
+    name = "primary"
+
+    def set_name(self, name: str) -> None:
+        self.name = name
+
+    def recreate(self) -> "TimedQueuePool":
+        # NOTE: Engine.dispose() replaces the pool with a recreated one
+        pool = super().recreate()
+        pool.set_name(self.name)
+        return pool
+
+    def _do_get(self) -> Any:
+        before = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            DB_POOL_CHECKOUT_TIMEOUTS.labels(self.name).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(self.name).observe(
+                time.perf_counter() - before
+            )
+            DB_POOL_OVERFLOW.labels(self.name).set(max(0, self.overflow()))
+
+    def _do_return_conn(self, record: Any) -> None:
+        try:
+            super()._do_return_conn(record)
+        finally:
+            DB_POOL_OVERFLOW.labels(self.name).set(max(0, self.overflow()))
+
+
+# NOTE: SQLAlchemy logs pools under their class' module, i.e. here rather
+# than under "sqlalchemy" (which it keeps at WARNING unless echo_pool is set).
+logging.getLogger(f"{__name__}.{TimedQueuePool.__name__}").setLevel(logging.WARNING)
+
+
+class _RequestRouting:
+    """
+    - Whether the current request (or task) wrote through the primary yet,
+      after which its reads stay on the primary too (read-your-writes).
+    - When the client last wrote in an earlier request (LAST_WRITE_COOKIE),
+      its reads stay on the primary until replicas caught up with that too.
+    """
+
+    wrote = False
+    last_write = 0.0
+
+
+_request_routing: ContextVar[_RequestRouting | None] = ContextVar(
+    "request_db_routing", default=None
+)
+
+
+def _routing() -> _RequestRouting:
+    routing = _request_routing.get()
+    if routing is None:
+        routing = _RequestRouting()
+        _request_routing.set(routing)
+    return routing
+
+
+# NOTE: Set (to the time.time() of the write) on responses to requests that
+# wrote through the primary, see dependencies.ReadYourWritesMiddleware.
+LAST_WRITE_COOKIE = "last_db_write"
+
+
+def start_request_routing(last_write: str | None) -> Token:
+    """
+    - Starts routing the current request's sessions, `last_write` being
+      the LAST_WRITE_COOKIE sent by the client, if any.
+    - Returns the token to pass to `finish_request_routing`.
+    """
+    routing = _RequestRouting()
+    try:
+        routing.last_write = float(last_write or 0)
+    except ValueError:
+        pass
+    return _request_routing.set(routing)
+
+
+def finish_request_routing(token: Token) -> None:
+    _request_routing.reset(token)
+
+
+def request_wrote() -> bool:
+    routing = _request_routing.get()
+    return routing is not None and routing.wrote
+
+
+class PrimarySession(Session):
+    """
+    - Sessions on the primary, noting writes (see _RequestRouting).
+    """
+
+
+@event.listens_for(PrimarySession, "do_orm_execute")
+def _note_orm_write(orm_execute_state: Any) -> None:
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        _note_write()
+
+
+@event.listens_for(PrimarySession, "after_flush")
+def _note_flush_write(session: Any, flush_context: Any) -> None:
+    _note_write()
+
+
+def _note_write() -> None:
+    routing = _request_routing.get()
+    if routing is not None:
+        routing.wrote = True
+
+
+class ReplicaSession(Session):
+    """
+    - Sessions on a read replica, connecting on their first statement and
+      failing over to the primary when that connection can't be opened.
+    """
+
+
+@event.listens_for(ReplicaSession, "do_orm_execute")
+def _fail_over_to_primary(orm_execute_state: Any) -> Any:
+    session = orm_execute_state.session
+    fail_over = session.info.get("fail_over")
+    # NOTE: Only the first statement opens the replica connection, later
+    # ones already hold it (or the primary's).
+    if fail_over is None or session.in_transaction():
+        return None
+    try:
+        return orm_execute_state.invoke_statement()
+    except (OSError, DBAPIError) as e:
+        if isinstance(e, DBAPIError) and not e.connection_invalidated:
+            raise
+        session.info.update(replica=False, fail_over=None)
+        session.bind = fail_over(e)
+        return orm_execute_state.invoke_statement()
+
+
+def _host(url: str) -> str:
+    parsed = make_url(url)
+    return f"{parsed.host}:{parsed.port or 5432}"
+
+
 class DatabaseSessionManager:
-    def __init__(self, host: str, engine_kwargs: dict[str, Any] = {}):
-        self._engine = create_async_engine(host, **engine_kwargs)
-        self._sessionmaker = async_sessionmaker(autocommit=False, bind=self._engine)
+    def __init__(
+        self,
+        host: str,
+        engine_kwargs: dict[str, Any] = {},
+        replica_hosts: list[str] = [],
+        max_replica_lag: float = 5,
+        replica_check_seconds: float = 5,
+    ):
+        self._engine = self._create_engine(host, engine_kwargs, "primary")
+        # NOTE: expire_on_commit=False keeps loaded (and RETURNING) rows usable
+        # after a commit, instead of lazily re-SELECTing them, which would
+        # cost a round trip (and isn't possible implicitly with asyncio).
+        self._sessionmaker = async_sessionmaker(
+            autocommit=False,
+            expire_on_commit=False,
+            bind=self._engine,
+            sync_session_class=PrimarySession,
+        )
+        self._replicas = [
+            self._create_engine(replica, engine_kwargs, f"replica:{_host(replica)}")
+            for replica in replica_hosts
+        ]
+        self._replica_sessionmaker = async_sessionmaker(
+            autocommit=False,
+            expire_on_commit=False,
+            sync_session_class=ReplicaSession,
+            info={"replica": True},
+        )
+        self.max_replica_lag = max_replica_lag
+        self.replica_check_seconds = replica_check_seconds
+        self._replica_down_until: dict[AsyncEngine, float] = {}
+        self._next_replica = 0
+        self._replica_task: asyncio.Task | None = None
+
+    @staticmethod
+    def _create_engine(
+        host: str, engine_kwargs: dict[str, Any], pool_name: str
+    ) -> AsyncEngine:
+        """
+        - Creates an instrumented engine, its pool metrics labelled
+          `pool_name` ("primary", or "replica:<host>:<port>").
+        """
+        engine = create_async_engine(host, **engine_kwargs)
+        if isinstance(engine.pool, TimedQueuePool):
+            engine.pool.set_name(pool_name)
+        instrument_pool(engine.sync_engine, pool_name)
+        tracing.instrument_engine(engine.sync_engine)
+        accounting.instrument_engine(engine.sync_engine)
+        return engine
 
     async def close(self):
         if self._engine is None:
             raise Exception("DatabaseSessionManager is not initialized")
+        await self.stop_replica_checks()
         await self._engine.dispose()
+        for replica in self._replicas:
+            await replica.dispose()
 
         self._engine = None
         self._sessionmaker = None
@@ -40,6 +257,7 @@ class DatabaseSessionManager:
         if self._sessionmaker is None:
             raise Exception("DatabaseSessionManager is not initialized")
 
+        _routing()
         session = self._sessionmaker()
         try:
             yield session
@@ -49,6 +267,112 @@ class DatabaseSessionManager:
         finally:
             await session.close()
 
+    @contextlib.asynccontextmanager
+    async def read_session(self) -> AsyncIterator[AsyncSession]:
+        """
+        - A session for pure reads, on a healthy read replica (round robin)
+          when there is one.
+        - Falls back to the primary when every replica is down or lagging
+          more than `max_replica_lag` seconds behind, once the current
+          request has written anything, and for `max_replica_lag` seconds
+          after the client's last write (read-your-writes).
+        - NOTE: Replicas may be up to `max_replica_lag` seconds stale, use
+          `session()` for reads that must see the latest writes, or check
+          `is_replica(session)` and re-read misses from the primary.
+        """
+        session = None
+        routing = _routing()
+        if (
+            not routing.wrote
+            and time.time() - routing.last_write >= self.max_replica_lag
+        ):
+            session = self._replica_session()
+        if session is None:
+            async with self.session() as session:
+                yield session
+            return
+
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+    def _replica_session(self) -> AsyncSession | None:
+        now = time.monotonic()
+        healthy = [
+            replica
+            for replica in self._replicas
+            if self._replica_down_until.get(replica, 0) <= now
+        ]
+        if not healthy:
+            return None
+        self._next_replica += 1
+        replica = healthy[self._next_replica % len(healthy)]
+        # NOTE: No connection is checked out until the session's first
+        # statement, which fails over to the primary (see ReplicaSession),
+        # so requests answered from caches don't touch the pool at all.
+        return self._replica_sessionmaker(
+            bind=replica,
+            info={
+                "replica": True,
+                "fail_over": lambda e: self._fail_over(replica, e),
+            },
+        )
+
+    def _fail_over(self, replica: AsyncEngine, e: Exception) -> Engine:
+        logger.error(f"Read replica unavailable, using the primary: {e}")
+        self._replica_down_until[replica] = (
+            time.monotonic() + self.replica_check_seconds
+        )
+        return self._engine.sync_engine
+
+    async def check_replicas(self) -> None:
+        """
+        - Measures every replica's replication lag, taking those that are
+          unreachable or lagging more than `max_replica_lag` seconds out of
+          rotation until the next check.
+        """
+        for replica in self._replicas:
+            try:
+                async with replica.connect() as connection:
+                    lag = (await connection.execute(text(REPLICA_LAG_SQL))).scalar()
+                healthy = float(lag or 0) <= self.max_replica_lag
+                if not healthy:
+                    logger.error(f"Read replica lagging {lag:.1f}s, using the primary")
+            except Exception as e:
+                logger.error(f"Read replica check failed: {e}")
+                healthy = False
+            self._replica_down_until[replica] = (
+                0 if healthy else time.monotonic() + self.replica_check_seconds
+            )
+
+    def start_replica_checks(self) -> None:
+        if self._replicas and self._replica_task is None:
+            self._replica_task = asyncio.create_task(
+                self._run_replica_checks(), name="replica-checks"
+            )
+
+    async def stop_replica_checks(self) -> None:
+        if self._replica_task is not None:
+            self._replica_task.cancel()
+            try:
+                await self._replica_task
+            except asyncio.CancelledError:
+                pass
+            self._replica_task = None
+
+    async def _run_replica_checks(self) -> None:
+        while True:
+            await self.check_replicas()
+            await asyncio.sleep(self.replica_check_seconds)
+
+
+def is_replica(session: AsyncSession) -> bool:
+    return bool(session.info.get("replica"))
+
 
 load_dotenv()
 PG_HOST = os.environ.get("PG_HOST") or "localhost"
@@ -57,9 +381,80 @@ PG_USER = os.environ.get("PG_USER") or "admin"
 PG_PASS = os.environ.get("PG_PASS") or "postgres"
 PG_DB = os.environ.get("PG_DB") or "pikoshi_db"
 
+# NOTE: Each uvicorn worker holds up to DB_POOL_SIZE + DB_MAX_OVERFLOW
+# connections, keep workers * that below Postgres' max_connections, see
+# benchmarks/db_pool.py. Checkouts wait up to DB_POOL_TIMEOUT seconds for
+# a free connection (db_pool_checkout_wait_seconds in /metrics).
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE") or 5)
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW") or 10)
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT") or 30)
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE") or 1800)
+# NOTE: Pre-ping costs a round trip per checkout, enable it when idle
+# connections get dropped (i.e. by a firewall or pgbouncer).
+DB_POOL_PRE_PING = (os.environ.get("DB_POOL_PRE_PING") or "false").lower() == "true"
+DB_CONNECT_TIMEOUT = float(os.environ.get("DB_CONNECT_TIMEOUT") or 10)
+DB_COMMAND_TIMEOUT = os.environ.get("DB_COMMAND_TIMEOUT")
+# NOTE: Prepared statements cached per connection. Set it to 0 behind
+# pgbouncer in transaction mode, which can't keep them.
+DB_STATEMENT_CACHE_SIZE = int(os.environ.get("DB_STATEMENT_CACHE_SIZE") or 100)
+
 # PostgreSQL Configuration
 SQLALCHEMY_DATABASE_URL = (
     f"postgresql+asyncpg://{PG_USER}:{PG_PASS}@{PG_HOST}:{PG_PORT}/{PG_DB}"
 )
 
-sessionmanager = DatabaseSessionManager(SQLALCHEMY_DATABASE_URL)
+# NOTE: Comma separated "host[:port]" read replicas (same credentials and
+# database as the primary), used by read_session() / get_read_db_session.
+# Each is checked every REPLICA_CHECK_SECONDS, and skipped while down or
+# more than REPLICA_MAX_LAG_SECONDS behind the primary.
+PG_REPLICA_HOSTS = [
+    host.strip()
+    for host in (os.environ.get("PG_REPLICA_HOSTS") or "").split(",")
+    if host.strip()
+]
+REPLICA_MAX_LAG_SECONDS = float(os.environ.get("REPLICA_MAX_LAG_SECONDS") or 5)
+REPLICA_CHECK_SECONDS = float(os.environ.get("REPLICA_CHECK_SECONDS") or 5)
+REPLICA_DATABASE_URLS = [
+    f"postgresql+asyncpg://{PG_USER}:{PG_PASS}@{host}/{PG_DB}"
+    for host in PG_REPLICA_HOSTS
+]
+REPLICA_LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+END
+"""
+
+
+def engine_settings(**overrides: Any) -> dict[str, Any]:
+    """
+    - The create_async_engine() keyword arguments configured through the
+      DB_* environment variables, with `overrides` applied on top.
+    """
+    connect_args: dict[str, Any] = {
+        "timeout": DB_CONNECT_TIMEOUT,
+        "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+    }
+    if DB_COMMAND_TIMEOUT:
+        connect_args["command_timeout"] = float(DB_COMMAND_TIMEOUT)
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+        **overrides,
+    }
+
+
+sessionmanager = DatabaseSessionManager(
+    SQLALCHEMY_DATABASE_URL,
+    engine_settings(),
+    replica_hosts=REPLICA_DATABASE_URLS,
+    max_replica_lag=REPLICA_MAX_LAG_SECONDS,
+    replica_check_seconds=REPLICA_CHECK_SECONDS,
+)
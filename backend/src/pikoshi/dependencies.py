@@ -1,9 +1,13 @@
 from typing import Annotated
 
-from fastapi import Depends
+from fastapi import Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from .database import sessionmanager
+from .database import (LAST_WRITE_COOKIE, finish_request_routing,
+                       request_wrote, sessionmanager, start_request_routing)
+from .utils.auth_cookies import set_last_write_cookie
 
 
 async def get_db_session():
@@ -11,4 +15,50 @@ async def get_db_session():
         yield session
 
 
+async def get_read_db_session():
+    """
+    - A session for routes (and dependencies) that only read, served by a
+      read replica when one is configured and healthy (see
+      DatabaseSessionManager.read_session).
+    """
+    async with sessionmanager.read_session() as session:
+        yield session
+
+
 DBSessionDep = Annotated[AsyncSession, Depends(get_db_session)]
+ReadDBSessionDep = Annotated[AsyncSession, Depends(get_read_db_session)]
+
+
+class ReadYourWritesMiddleware:
+    """
+    Keeps a client's reads on the primary database right after its writes
+    (see DatabaseSessionManager.read_session).
+
+    Each request's session routing starts from the LAST_WRITE_COOKIE sent
+    by the client, and responses to requests that wrote through the primary
+    set it to the time of the write, expiring after `max_replica_lag`.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and request_wrote():
+                cookie = set_last_write_cookie(
+                    Response(), LAST_WRITE_COOKIE, sessionmanager.max_replica_lag
+                )
+                MutableHeaders(scope=message).append(
+                    "set-cookie", cookie.headers["set-cookie"]
+                )
+            await send(message)
+
+        token = start_request_routing(Request(scope).cookies.get(LAST_WRITE_COOKIE))
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            finish_request_routing(token)
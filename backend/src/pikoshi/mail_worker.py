@@ -0,0 +1,20 @@
+import asyncio
+
+from .services.mail_outbox_service import mail_outbox_worker
+from .utils.logger import logger
+
+
+def main():
+    """
+    - Runs the mail outbox worker (see services/mail_outbox_service.py),
+      sending the mail queued by the web workers until interrupted.
+    """
+    logger.info("Mail outbox worker started")
+    try:
+        asyncio.run(mail_outbox_worker.run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,27 @@
 import os
 from contextlib import asynccontextmanager
+from pathlib import Path
 
 import uvicorn
 from dotenv import load_dotenv
-from fastapi import Depends, FastAPI
+from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
+from .config.http_config import http_client
+from .config.redis_config import close_redis
 from .database import sessionmanager
-from .dependencies import get_db_session
+from .dependencies import ReadYourWritesMiddleware
 from .meta import meta
 from .middlewares import cors
-from .routers import auth_context, gallery, google_auth, jwt_auth
+from .middlewares.logger import access_log_sink
+from .routers import (albums, auth_context, feed, gallery, google_auth,
+                      jwt_auth, metrics, profiler)
+from .services.mail_outbox_service import (MAIL_WORKER_IN_PROCESS,
+                                           mail_outbox_worker)
+from .services.revocation_service import revocation_sync
+from .utils.loop_monitor import loop_monitor
+from .utils.metrics import mark_process_dead
+from .utils.tracing import trace_sink
 
 
 @asynccontextmanager
@@ -20,19 +31,42 @@ async def lifespan(app: FastAPI):
     To understand more, read:
     https://fastapi.tiangolo.com/advanced/events/
     """
+    access_log_sink.start()
+    trace_sink.start()
+    loop_monitor.start()
+    revocation_sync.start()
+    http_client.start()
+    sessionmanager.start_replica_checks()
+    if MAIL_WORKER_IN_PROCESS:
+        mail_outbox_worker.start()
     yield
+    await mail_outbox_worker.stop()
+    await http_client.close()
+    await revocation_sync.stop()
+    await loop_monitor.stop()
+    await close_redis()
     if sessionmanager._engine is not None:
         # Close the DB connection
         await sessionmanager.close()
+    # Flush any queued access log entries and trace spans
+    access_log_sink.close()
+    trace_sink.close()
+    mark_process_dead()
 
 
-app = FastAPI(
-    lifespan=lifespan, **meta.meta_info, dependencies=[Depends(get_db_session)]
-)
+# NOTE: No app-wide DB session dependency, routes (and dependencies such as
+# AuthService.get_current_principal) ask for one only when they need it,
+# and a session only checks out a pool connection once it runs a query.
+app = FastAPI(lifespan=lifespan, **meta.meta_info)
 
 cors.add_cors_middleware(app)
+app.add_middleware(ReadYourWritesMiddleware)
 
-app.mount("/public", StaticFiles(directory="src/pikoshi/public"), name="static")
+app.mount(
+    "/public",
+    StaticFiles(directory=Path(__file__).resolve().parent / "public"),
+    name="static",
+)
 
 load_dotenv()
 HOST = os.environ.get("HOST") or "::"
@@ -42,6 +76,10 @@ app.include_router(google_auth.router)
 app.include_router(jwt_auth.router)
 app.include_router(auth_context.router)
 app.include_router(gallery.router)
+app.include_router(albums.router)
+app.include_router(feed.router)
+app.include_router(metrics.router)
+app.include_router(profiler.router)
 
 
 def main():
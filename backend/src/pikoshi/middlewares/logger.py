@@ -1,11 +1,68 @@
-import json
-import os
 import time
 from datetime import datetime
-from typing import Callable
+from typing import Any, AsyncIterator, Callable, Dict
 
 from fastapi import Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
 from fastapi.routing import APIRoute
+from starlette.exceptions import HTTPException
+
+from ..utils import accounting
+from ..utils.log_sink import sink_from_env
+from ..utils.metrics import (HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_FLIGHT,
+                             HTTP_RESPONSE_SIZE)
+from ..utils.profiler import (PROFILE_HEADER, RequestProfile, is_authorized,
+                              profiler)
+from ..utils.tracing import activate, deactivate, start_trace, traced_stream
+
+access_log_sink = sink_from_env("logs")
+
+
+async def _finish_stream(
+    body_iterator: AsyncIterator,
+    response_size: Any,
+    stats: accounting.RequestStats,
+    log_entry: Dict[str, Any],
+    profile: RequestProfile | None,
+) -> AsyncIterator:
+    """
+    - Counts the bytes of a StreamingResponse as they go out, and keeps
+      accounting resources used while producing each chunk (i.e. S3 reads)
+      against the request.
+    - The access log entry is only emitted once the stream is done, so that
+      it includes those resources.
+    - Likewise, a request profile also covers the (streaming) task.
+    """
+    size = 0
+    if profile is not None:
+        profile.add_current_task()
+    try:
+        while True:
+            token = accounting.activate(stats)
+            try:
+                chunk = await accounting.cpu_timed(body_iterator.__anext__(), stats)
+            except StopAsyncIteration:
+                break
+            finally:
+                accounting.deactivate(token)
+            size += len(chunk)
+            yield chunk
+    finally:
+        response_size.observe(size)
+        log_entry["resources"] = stats.as_dict()
+        access_log_sink.emit(log_entry)
+        if profile is not None:
+            profiler.stop(profile)
+
+
+def _error_status_code(e: BaseException) -> int:
+    # NOTE: The status the app's exception handlers answer with
+    if isinstance(e, HTTPException):
+        return e.status_code
+    if isinstance(e, RequestValidationError):
+        return 422
+    return 500
 
 
 class TimedRoute(APIRoute):
@@ -13,18 +70,92 @@ class TimedRoute(APIRoute):
     A FastAPI route that measures and logs the duration of each request.
 
     This custom route handler appends standard HTTP logging information
-    to a JSON log file. The log file is created in the 'logs' directory
-    with a daily date format, allowing for easy tracking and analysis of
-    route performance.
+    as one JSON object per line to a log file in the 'logs' directory,
+    rotated daily (and by size). Writing happens on a background thread
+    (see utils/log_sink.py), allowing for easy tracking and analysis of
+    route performance without blocking the event loop.
+
+    It also records latency, in-flight and response size metrics per
+    route template, exposed on /metrics (see utils/metrics.py), opens
+    the request's root trace span, returning its ID as `X-Trace-Id`
+    (see utils/tracing.py), and logs the SQL, S3, Redis and CPU resources
+    used by the request (see utils/accounting.py), also returned as
+    `X-Debug-*` headers when REQUEST_STATS_HEADERS is enabled.
+
+    Requests carrying a valid `X-Profile-Token` header are profiled, the
+    profile's path is returned as `X-Profile-Path` (see utils/profiler.py).
+
+    Exceptions raised by the route or its dependencies (i.e. a 401 from
+    AuthService.get_current_principal, a 422 validation error or a 429 from
+    RateLimitService) are recorded and logged under the status code they
+    are answered with.
     """
 
     def get_route_handler(self) -> Callable:
         original_route_handler = super().get_route_handler()
 
         async def custom_route_handler(request: Request) -> Response:
-            before = time.time()
-            response: Response = await original_route_handler(request)
-            duration = time.time() - before
+            before = time.perf_counter()
+            in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(request.method, self.path)
+            in_flight.inc()
+            root_span = start_trace(
+                f"{request.method} {self.path}", request.headers.get("traceparent")
+            )
+            root_span.set_tag("http.route", self.path)
+            stats = accounting.RequestStats()
+            profile = None
+            if is_authorized(request.headers.get(PROFILE_HEADER)):
+                profile = profiler.start(
+                    RequestProfile(f"{request.method} {self.path}")
+                )
+            trace_token = activate(root_span)
+            stats_token = accounting.activate(stats)
+            try:
+                response: Response = await accounting.cpu_timed(
+                    original_route_handler(request), stats
+                )
+            except BaseException as e:
+                if isinstance(e, Exception):
+                    duration = time.perf_counter() - before
+                    status_code = _error_status_code(e)
+                    root_span.set_tag("http.status_code", status_code)
+                    HTTP_REQUEST_DURATION.labels(
+                        request.method, self.path, status_code
+                    ).observe(duration)
+                    access_log_sink.emit(
+                        {
+                            "route": str(request.url),
+                            "method": request.method,
+                            "duration": duration,
+                            "status_code": status_code,
+                            "timestamp": datetime.now().isoformat(),
+                            "trace_id": root_span.trace_id,
+                            "error": type(e).__name__,
+                            "resources": stats.as_dict(),
+                        }
+                    )
+                root_span.finish(e)
+                if profile is not None:
+                    profiler.stop(profile)
+                raise
+            finally:
+                accounting.deactivate(stats_token)
+                deactivate(trace_token)
+                in_flight.dec()
+            duration = time.perf_counter() - before
+
+            root_span.set_tag("http.status_code", response.status_code)
+            response.headers["X-Trace-Id"] = root_span.trace_id
+            HTTP_REQUEST_DURATION.labels(
+                request.method, self.path, response.status_code
+            ).observe(duration)
+            response_size = HTTP_RESPONSE_SIZE.labels(request.method, self.path)
+            if accounting.REQUEST_STATS_HEADERS:
+                # NOTE: For streamed responses, this excludes the resources
+                # used while streaming (headers are sent first).
+                response.headers.update(stats.as_headers())
+            if profile is not None:
+                response.headers["X-Profile-Path"] = profile.path
 
             log_entry = {
                 "route": str(request.url),
@@ -32,24 +163,28 @@ class TimedRoute(APIRoute):
                 "duration": duration,
                 "status_code": response.status_code,
                 "timestamp": datetime.now().isoformat(),
+                "trace_id": root_span.trace_id,
                 "headers": dict(response.headers),
             }
 
-            log_dir = "logs"
-            os.makedirs(log_dir, exist_ok=True)
-            log_file = os.path.join(log_dir, f"logs_{datetime.now().date()}.json")
-            log_entries = []
-
-            if os.path.exists(log_file):
-                with open(log_file, "r") as f:
-                    content = f.read().strip()
-                    if content:
-                        log_entries = json.loads(content)
-
-            log_entries.append(log_entry)
-
-            with open(log_file, "w") as f:
-                json.dump(log_entries, f, indent=4)
+            if isinstance(response, StreamingResponse):
+                response.body_iterator = _finish_stream(
+                    response.body_iterator, response_size, stats, log_entry, profile
+                )
+                if root_span.sampled:
+                    # The root span is finished once the stream is done
+                    response.body_iterator = traced_stream(
+                        response.body_iterator, root_span
+                    )
+                else:
+                    root_span.finish()
+            else:
+                response_size.observe(len(response.body))
+                root_span.finish()
+                log_entry["resources"] = stats.as_dict()
+                access_log_sink.emit(log_entry)
+                if profile is not None:
+                    profiler.stop(profile)
 
             return response
 
@@ -0,0 +1,48 @@
+"""Album covers and listing indexes
+
+Revision ID: 7c41d2e9a0b3
+Revises: 25b556f883b8
+Create Date: 2026-10-19 15:40:12.418230
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7c41d2e9a0b3"
+down_revision: Union[str, None] = "25b556f883b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "albums",
+        sa.Column("created", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.add_column(
+        "albums",
+        sa.Column(
+            "cover_photo_id",
+            sa.Integer(),
+            sa.ForeignKey("photos.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+    )
+    op.alter_column("photos", "date", server_default=sa.func.now())
+
+    # Keyset pagination over a User's albums, and selectinload() of
+    # their photos (WHERE album_id IN (...))
+    op.create_index("ix_albums_user_id_id", "albums", ["user_id", "id"])
+    op.create_index("ix_photos_album_id", "photos", ["album_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_photos_album_id", table_name="photos")
+    op.drop_index("ix_albums_user_id_id", table_name="albums")
+    op.alter_column("photos", "date", server_default=None)
+    op.drop_column("albums", "cover_photo_id")
+    op.drop_column("albums", "created")
@@ -0,0 +1,31 @@
+"""Unique network members
+
+Revision ID: b5e08f3c61d4
+Revises: 7c41d2e9a0b3
+Create Date: 2026-10-19 16:22:47.905114
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b5e08f3c61d4"
+down_revision: Union[str, None] = "7c41d2e9a0b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A User is a member of an Album's network once, looked up by User
+    # when building their album access (see AlbumAccessService)
+    op.create_unique_constraint(
+        "uq_networks_album_id_user_id", "networks", ["album_id", "user_id"]
+    )
+    op.create_index("ix_networks_user_id", "networks", ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_networks_user_id", table_name="networks")
+    op.drop_constraint("uq_networks_album_id_user_id", "networks", type_="unique")
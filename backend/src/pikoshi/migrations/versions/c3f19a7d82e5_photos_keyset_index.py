@@ -0,0 +1,29 @@
+"""Photos keyset index
+
+Revision ID: c3f19a7d82e5
+Revises: b5e08f3c61d4
+Create Date: 2026-10-19 18:05:31.264518
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c3f19a7d82e5"
+down_revision: Union[str, None] = "b5e08f3c61d4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # An Album's Photos are paged newest first by keyset (see
+    # PhotoService.list_photos), the index still serves album_id lookups
+    op.create_index("ix_photos_album_id_id", "photos", ["album_id", "id"])
+    op.drop_index("ix_photos_album_id", table_name="photos")
+
+
+def downgrade() -> None:
+    op.create_index("ix_photos_album_id", "photos", ["album_id"])
+    op.drop_index("ix_photos_album_id_id", table_name="photos")
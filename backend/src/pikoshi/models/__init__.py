@@ -0,0 +1,8 @@
+# NOTE: Relationships name each other by string, every model has to be
+# imported (registered) before the mappers are first used.
+from .album import Album
+from .network import Network
+from .photo import Photo
+from .user import User
+
+__all__ = ["Album", "Network", "Photo", "User"]
@@ -1,26 +1,62 @@
-from sqlalchemy import Boolean, ForeignKey, Integer, String
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from datetime import datetime
+from typing import TYPE_CHECKING, List
+
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import (Mapped, mapped_column, query_expression,
+                            relationship)
+from sqlalchemy.sql import func
 
 from ..database import Base
-from .network import Network
-from .photo import Photo
-from .user import User
+
+if TYPE_CHECKING:
+    from .network import Network
+    from .photo import Photo
+    from .user import User
 
 
 class Album(Base):
     __tablename__ = "albums"
+    # NOTE: Serves AlbumService.list_albums' keyset pagination
+    __table_args__ = (Index("ix_albums_user_id_id", "user_id", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("users.id"), nullable=False
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    created: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
     )
     title: Mapped[str] = mapped_column(String(30), unique=False, index=True)
     album_name: Mapped[str] = mapped_column(String(254), nullable=True)
     is_private: Mapped[bool] = mapped_column(Boolean, nullable=True, default=True)
+    cover_photo_id: Mapped[int | None] = mapped_column(
+        Integer,
+        ForeignKey("photos.id", ondelete="SET NULL", use_alter=True),
+        nullable=True,
+    )
+    # NOTE: Only loaded on request, i.e. with_expression(Album.photo_count, ...)
+    photo_count: Mapped[int] = query_expression()
 
+    # NOTE: Relationships are never lazy loaded (which would be a query per
+    # album, and isn't possible on an AsyncSession anyway), load them
+    # up front with selectinload(), see services/album_service.py.
+    # Deletes cascade in the database (ondelete="CASCADE"), passive_deletes
+    # leaves them to it instead of loading the children first.
     user: Mapped["User"] = relationship("User", back_populates="albums")
-    photos: Mapped["Photo"] = relationship("Photo", back_populates="album")
-    networks: Mapped["Network"] = relationship("Network", back_populates="album")
+    photos: Mapped[List["Photo"]] = relationship(
+        "Photo",
+        back_populates="album",
+        foreign_keys="Photo.album_id",
+        order_by="Photo.id",
+        lazy="raise",
+        passive_deletes=True,
+    )
+    cover_photo: Mapped["Photo | None"] = relationship(
+        "Photo", foreign_keys=[cover_photo_id], post_update=True, lazy="raise"
+    )
+    networks: Mapped[List["Network"]] = relationship(
+        "Network", back_populates="album", lazy="raise", passive_deletes=True
+    )
 
     def __repr__(self):
         return f"<Album(title='{self.title}', album_name='{self.album_name}', is_private={self.is_private})>"
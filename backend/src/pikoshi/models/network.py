@@ -1,23 +1,31 @@
-from sqlalchemy import ForeignKey, Integer
+from typing import TYPE_CHECKING
+
+from sqlalchemy import ForeignKey, Index, Integer, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..database import Base
-from .album import Album
-from .user import User
+
+if TYPE_CHECKING:
+    from .album import Album
+    from .user import User
 
 
 class Network(Base):
     __tablename__ = "networks"
+    __table_args__ = (
+        UniqueConstraint("album_id", "user_id", name="uq_networks_album_id_user_id"),
+        Index("ix_networks_user_id", "user_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     founder_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("users.id"), nullable=False
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     user_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("users.id"), nullable=False
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     album_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("albums.id"), nullable=False
+        Integer, ForeignKey("albums.id", ondelete="CASCADE"), nullable=False
     )
 
     founder: Mapped["User"] = relationship(
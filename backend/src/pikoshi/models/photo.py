@@ -1,26 +1,33 @@
 from datetime import datetime
+from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
 from ..database import Base
-from .album import Album
+
+if TYPE_CHECKING:
+    from .album import Album
 
 
 class Photo(Base):
     __tablename__ = "photos"
+    # NOTE: Serves PhotoService.list_photos' keyset pagination
+    __table_args__ = (Index("ix_photos_album_id_id", "album_id", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     album_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("albums.id"), nullable=False
+        Integer, ForeignKey("albums.id", ondelete="CASCADE"), nullable=False
     )
     date: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
     file_name: Mapped[str] = mapped_column(String(254), nullable=False)
 
-    album: Mapped["Album"] = relationship("Album", back_populates="photos")
+    album: Mapped["Album"] = relationship(
+        "Album", back_populates="photos", foreign_keys=[album_id]
+    )
 
     def __repr__(self):
         return f"<Photo(file_name='{self.file_name}')>"
@@ -1,11 +1,16 @@
 from datetime import datetime
+from typing import TYPE_CHECKING, List
 
 from sqlalchemy import Boolean, DateTime, Integer, String, Text
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
 from ..database import Base
 
+if TYPE_CHECKING:
+    from .album import Album
+    from .network import Network
+
 
 # TODO: Consider putting certain fields in a separate table
 class User(Base):
@@ -32,5 +37,23 @@ class User(Base):
         String, nullable=False, default="email"
     )
 
+    albums: Mapped[List["Album"]] = relationship(
+        "Album", back_populates="user", lazy="raise", passive_deletes=True
+    )
+    networks: Mapped[List["Network"]] = relationship(
+        "Network",
+        foreign_keys="Network.user_id",
+        back_populates="user",
+        lazy="raise",
+        passive_deletes=True,
+    )
+    founded_networks: Mapped[List["Network"]] = relationship(
+        "Network",
+        foreign_keys="Network.founder_id",
+        back_populates="founder",
+        lazy="raise",
+        passive_deletes=True,
+    )
+
     def __repr__(self):
         return f"<User(name='{self.name}', email='{self.email}', is_active={self.is_active})>"
@@ -0,0 +1,274 @@
+from fastapi import (APIRouter, Body, Depends, HTTPException, Query, Response,
+                     UploadFile)
+from fastapi.responses import JSONResponse
+
+from ..dependencies import DBSessionDep, ReadDBSessionDep
+from ..middlewares.logger import TimedRoute
+from ..schemas.album import (AlbumCreate, AlbumDetail, AlbumLocation,
+                             AlbumPage, AlbumSummary, AlbumUpdate)
+from ..schemas.photo import Photo, PhotoPage
+from ..schemas.user import Principal, UserInput
+from ..services import album_access_service as AlbumAccessService
+from ..services import album_service as AlbumService
+from ..services import auth_service as AuthService
+from ..services import exception_handler_service as ExceptionService
+from ..services import feed_service as FeedService
+from ..services import gallery_service as GalleryService
+from ..services import network_service as NetworkService
+from ..services import photo_service as PhotoService
+from ..services import rate_limit_service as RateLimitService
+from ..services import user_service as UserService
+
+router = APIRouter(prefix="/albums", tags=["albums"], route_class=TimedRoute)
+
+
+@router.get("/")
+async def list_albums(
+    db_session: ReadDBSessionDep,
+    principal: Principal = Depends(AuthService.get_current_principal),
+    limit: int = Query(30, ge=1, le=100),
+    cursor: int | None = None,
+) -> Response:
+    """
+    - Lists a page of the User's Albums, newest first, with their cover
+      Photo and photo count.
+    - Pass the returned `next_cursor` as `cursor` for the next page.
+    """
+    try:
+        albums, next_cursor = await AlbumService.list_albums(
+            db_session, principal.id, limit=limit, cursor=cursor
+        )
+        page = AlbumPage(
+            albums=[AlbumSummary.model_validate(album) for album in albums],
+            next_cursor=next_cursor,
+        )
+        return JSONResponse(status_code=200, content=page.model_dump(mode="json"))
+    except Exception as e:
+        return ExceptionService.handle_generic_exception(e)
+
+
+@router.post("/")
+async def create_album(
+    album: AlbumCreate,
+    db_session: DBSessionDep,
+    principal: Principal = Depends(AuthService.get_current_principal),
+) -> Response:
+    try:
+        db_album = await AlbumService.create_album(
+            db_session, principal.id, album.title, album.is_private
+        )
+        return JSONResponse(
+            status_code=201,
+            content=AlbumDetail.model_validate(db_album).model_dump(mode="json"),
+        )
+    except Exception as e:
+        return ExceptionService.handle_generic_exception(e)
+
+
+@router.get("/{album_id}/")
+async def get_album(
+    album_id: int,
+    db_session: ReadDBSessionDep,
+    principal: Principal = Depends(AuthService.get_current_principal),
+) -> Response:
+    try:
+        db_album = await AlbumService.get_album(db_session, principal.id, album_id)
+        if db_album is None:
+            raise HTTPException(status_code=404, detail="Album Not Found.")
+        return JSONResponse(
+            status_code=200,
+            content=AlbumDetail.model_validate(db_album).model_dump(mode="json"),
+        )
+    except HTTPException as http_e:
+        return ExceptionService.handle_http_exception(http_e)
+    except Exception as e:
+        return ExceptionService.handle_generic_exception(e)
+
+
+@router.get(
+    "/{album_id}/photos/",
+    dependencies=[Depends(AlbumAccessService.require_album_access)],
+)
+async def list_album_photos(
+    album_id: int,
+    db_session: ReadDBSessionDep,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: int | None = None,
+) -> Response:
+    """
+    - Lists a page of the Photos of an Album the User owns or that was
+      shared with them, newest first.
+    - Pass the returned `next_cursor` as `cursor` for the next page.
+    """
+    try:
+        photos, next_cursor = await PhotoService.list_photos(
+            db_session, album_id, limit=limit, cursor=cursor
+        )
+        page = PhotoPage(
+            photos=[Photo.model_validate(photo) for photo in photos],
+            next_cursor=next_cursor,
+        )
+        return JSONResponse(status_code=200, content=page.model_dump(mode="json"))
+    except Exception as e:
+        return ExceptionService.handle_generic_exception(e)
+
+
+@router.patch("/{album_id}/")
+async def update_album(
+    album_id: int,
+    changes: AlbumUpdate,
+    db_session: DBSessionDep,
+    principal: Principal = Depends(AuthService.get_current_principal),
+) -> Response:
+    try:
+        db_album = await AlbumService.update_album(
+            db_session, principal.id, album_id, changes
+        )
+        if db_album is None:
+            raise HTTPException(status_code=404, detail="Album Or Photo Not Found.")
+        return JSONResponse(
+            status_code=200,
+            content=AlbumDetail.model_validate(db_album).model_dump(mode="json"),
+        )
+    except HTTPException as http_e:
+        return ExceptionService.handle_http_exception(http_e)
+    except Exception as e:
+        return ExceptionService.handle_generic_exception(e)
+
+
+@router.delete("/{album_id}/")
+async def delete_album(
+    album_id: int,
+    db_session: DBSessionDep,
+    principal: Principal = Depends(AuthService.get_current_principal),
+) -> Response:
+    try:
+        if not await AlbumService.delete_album(db_session, principal.id, album_id):
+            raise HTTPException(status_code=404, detail="Album Not Found.")
+        return JSONResponse(status_code=200, content={"message": "Album Deleted."})
+    except HTTPException as http_e:
+        return ExceptionService.handle_http_exception(http_e)
+    except Exception as e:
+        return ExceptionService.handle_generic_exception(e)
+
+
+@router.post("/{album_id}/members/")
+async def add_album_member(
+    album_id: int,
+    member: UserInput,
+    db_session: DBSessionDep,
+    principal: Principal = Depends(AuthService.get_current_principal),
+) -> Response:
+    """
+    - Shares one of the User's Albums with another User, by email.
+    """
+    try:
+        user = await UserService.get_user_by_email(db_session, member.email)
+        if user is None or not await NetworkService.add_member(
+            db_session, principal.id, album_id, user.id
+        ):
+            raise HTTPException(status_code=404, detail="Album Or User Not Found.")
+        return JSONResponse(status_code=201, content={"message": "Album Shared."})
+    except HTTPException as http_e:
+        return ExceptionService.handle_http_exception(http_e)
+    except Exception as e:
+        return ExceptionService.handle_generic_exception(e)
+
+
+@router.delete("/{album_id}/members/{user_id}/")
+async def remove_album_member(
+    album_id: int,
+    user_id: int,
+    db_session: DBSessionDep,
+    principal: Principal = Depends(AuthService.get_current_principal),
+) -> Response:
+    try:
+        if not await NetworkService.remove_member(
+            db_session, principal.id, album_id, user_id
+        ):
+            raise HTTPException(status_code=404, detail="Album Member Not Found.")
+        return JSONResponse(
+            status_code=200, content={"message": "Album Member Removed."}
+        )
+    except HTTPException as http_e:
+        return ExceptionService.handle_http_exception(http_e)
+    except Exception as e:
+        return ExceptionService.handle_generic_exception(e)
+
+
+@router.post("/{album_id}/single/")
+async def grab_single_album_image(
+    location: AlbumLocation = Depends(AlbumAccessService.require_album_access),
+    body: dict = Body(...),
+) -> Response:
+    """
+    - Grabs a single image from an Album the User owns or that was shared
+      with them, authorized from the User's (cached) album access.
+    """
+    try:
+        width = body.get("width", 0)
+        file_name = body.get("file_name", "")
+        if len(file_name) == 0:
+            raise HTTPException(status_code=400, detail="No file_name passed")
+        file_format = "mobile" if width < 768 else "original"
+
+        image_file = await GalleryService.grab_single_image(
+            location.bucket_name,
+            location.user_uuid,
+            file_name,
+            file_format=file_format,
+            album_name=location.album_name,
+        )
+        return JSONResponse(
+            status_code=200,
+            content={
+                "message": "Images Retrieved From S3 And Sent To Client Successfully.",
+                "imageAsBase64": image_file,
+            },
+        )
+    except HTTPException as http_e:
+        return ExceptionService.handle_http_exception(http_e)
+    except ValueError as ve:
+        return JSONResponse(status_code=404, content={"message": str(ve)})
+    except Exception as e:
+        return ExceptionService.handle_generic_exception(e)
+
+
+@router.post(
+    "/{album_id}/upload/",
+    dependencies=[Depends(RateLimitService.limit_by_user("upload"))],
+)
+async def upload_image_to_album(
+    album_id: int,
+    file: UploadFile,
+    db_session: DBSessionDep,
+    location: AlbumLocation = Depends(AlbumAccessService.require_album_access),
+    principal: Principal = Depends(AuthService.get_current_principal),
+) -> Response:
+    """
+    - Uploads a new image to one of the User's own Albums, records it as a
+      Photo and publishes it to the feeds of the Album's members.
+    """
+    try:
+        if location.user_uuid != principal.uuid:
+            raise HTTPException(status_code=404, detail="Album Not Found.")
+        thumbnail_data = await GalleryService.upload_new_image(
+            principal, file, album_name=location.album_name
+        )
+        if thumbnail_data is None:
+            raise HTTPException(status_code=500, detail="Image Upload Failed.")
+        photo = await PhotoService.add_photo(
+            db_session, album_id, thumbnail_data["file_name"]
+        )
+        await FeedService.publish_photo(db_session, photo)
+        return JSONResponse(
+            status_code=200,
+            content={
+                "message": "New Image Uploaded To Album Successfully.",
+                "data": thumbnail_data,
+            },
+        )
+    except HTTPException as http_e:
+        return ExceptionService.handle_http_exception(http_e)
+    except Exception as e:
+        return ExceptionService.handle_generic_exception(e)
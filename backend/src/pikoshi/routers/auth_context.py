@@ -4,10 +4,11 @@ from fastapi import APIRouter, Cookie, Depends, HTTPException, Response
 from jwt.exceptions import PyJWTError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..dependencies import get_db_session
+from ..dependencies import get_db_session, get_read_db_session
 from ..middlewares.logger import TimedRoute
 from ..services import auth_service as AuthService
 from ..services import exception_handler_service as ExceptionService
+from ..utils.auth_cookies import remove_auth_cookies
 
 router = APIRouter(prefix="/auth", tags=["auth"], route_class=TimedRoute)
 
@@ -16,7 +17,7 @@ router = APIRouter(prefix="/auth", tags=["auth"], route_class=TimedRoute)
 async def check_auth_context(
     access_token: Annotated[str | None, Cookie()] = None,
     refresh_token: Annotated[str | None, Cookie()] = None,
-    db_session: AsyncSession = Depends(get_db_session),
+    db_session: AsyncSession = Depends(get_read_db_session),
 ) -> Response:
     """
     - Authenticates user by verifying UUID contents of access_token JWT
@@ -40,6 +41,7 @@ async def check_auth_context(
 @router.post("/auth-logout/")
 async def auth_logout(
     access_token: Annotated[str | None, Cookie()] = None,
+    refresh_token: Annotated[str | None, Cookie()] = None,
     db_session: AsyncSession = Depends(get_db_session),
 ) -> Response:
     """
@@ -47,7 +49,8 @@ async def auth_logout(
       and Sets User's `is_active` field in DB to False.
     """
     try:
-        response = await AuthService.logout(str(access_token), db_session)
+        response = await AuthService.logout(access_token, db_session, refresh_token)
         return response
     except Exception as e:
-        return ExceptionService.handle_generic_exception(e)
+        # NOTE: The cookies are cleared however the logout went
+        return remove_auth_cookies(ExceptionService.handle_generic_exception(e))
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import JSONResponse
+
+from ..dependencies import ReadDBSessionDep
+from ..middlewares.logger import TimedRoute
+from ..schemas.feed import FeedPage
+from ..schemas.user import Principal
+from ..services import auth_service as AuthService
+from ..services import exception_handler_service as ExceptionService
+from ..services import feed_service as FeedService
+
+router = APIRouter(prefix="/feed", tags=["feed"], route_class=TimedRoute)
+
+
+@router.get("/")
+async def read_feed(
+    db_session: ReadDBSessionDep,
+    principal: Principal = Depends(AuthService.get_current_principal),
+    limit: int = Query(30, ge=1, le=100),
+    cursor: int | None = None,
+) -> Response:
+    """
+    - Lists a page of the Photos newly added to Albums shared with the User,
+      newest first.
+    - Pass the returned `next_cursor` as `cursor` for the next page.
+    """
+    try:
+        entries, next_cursor = await FeedService.read_feed(
+            db_session, principal, limit=limit, cursor=cursor
+        )
+        page = FeedPage(entries=entries, next_cursor=next_cursor)
+        return JSONResponse(status_code=200, content=page.model_dump(mode="json"))
+    except Exception as e:
+        return ExceptionService.handle_generic_exception(e)
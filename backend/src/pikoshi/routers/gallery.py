@@ -3,12 +3,13 @@ from typing import Annotated
 from fastapi import (APIRouter, Body, Cookie, Depends, HTTPException, Response,
                      UploadFile)
 from fastapi.responses import JSONResponse, StreamingResponse
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..dependencies import get_db_session
 from ..middlewares.logger import TimedRoute
+from ..schemas.user import Principal
+from ..services import auth_service as AuthService
 from ..services import exception_handler_service as ExceptionService
 from ..services import gallery_service as GalleryService
+from ..services import rate_limit_service as RateLimitService
 from ..utils.auth_cookies import set_s3_continuation_token
 
 router = APIRouter(prefix="/gallery", tags=["gallery"], route_class=TimedRoute)
@@ -19,16 +20,13 @@ router = APIRouter(prefix="/gallery", tags=["gallery"], route_class=TimedRoute)
 # rather than actually streaming images on initial page load
 @router.post("/image-count/")
 async def get_default_image_count(
-    access_token: Annotated[str | None, Cookie()] = None,
-    db_session: AsyncSession = Depends(get_db_session),
+    principal: Principal = Depends(AuthService.get_current_principal),
     s3_continuation_token: Annotated[str | None, Cookie()] = None,
     max_keys: int = 30,
     file_format: str = "thumbnail",
 ) -> Response:
     try:
-        s3_credentials = await GalleryService.grab_s3_credentials(
-            str(access_token), db_session
-        )
+        s3_credentials = GalleryService.grab_s3_credentials(principal)
         bucket_name = str(s3_credentials.get("bucket_name"))
         user_uuid = str(s3_credentials.get("user_uuid"))
         s3_response = await GalleryService.grab_file_list(
@@ -65,8 +63,7 @@ async def get_default_image_count(
 # NOTE: IF parameter album_name == None, then default it to "default"
 @router.post("/default-gallery/")
 async def get_default_gallery(
-    access_token: Annotated[str | None, Cookie()] = None,
-    db_session: AsyncSession = Depends(get_db_session),
+    principal: Principal = Depends(AuthService.get_current_principal),
     s3_continuation_token: Annotated[str | None, Cookie()] = None,
     max_keys: int = 30,
     file_format: str = "thumbnail",
@@ -77,9 +74,7 @@ async def get_default_gallery(
     - and default image (default.webp) in new bucket.
     """
     try:
-        s3_credentials = await GalleryService.create_new_user_bucket(
-            str(access_token), db_session
-        )
+        s3_credentials = await GalleryService.create_new_user_bucket(principal)
         bucket_name = str(s3_credentials.get("bucket_name"))
         user_uuid = str(s3_credentials.get("user_uuid"))
 
@@ -122,16 +117,13 @@ async def get_default_gallery(
 
 @router.post("/default-load-more/")
 async def load_next_page_of_images(
-    access_token: Annotated[str | None, Cookie()] = None,
+    principal: Principal = Depends(AuthService.get_current_principal),
     s3_continuation_token: Annotated[str | None, Cookie()] = None,
-    db_session: AsyncSession = Depends(get_db_session),
     max_keys: int = 30,
     file_format="thumbnail",
 ) -> Response:
     try:
-        s3_credentials = await GalleryService.create_new_user_bucket(
-            str(access_token), db_session
-        )
+        s3_credentials = await GalleryService.create_new_user_bucket(principal)
         bucket_name = str(s3_credentials.get("bucket_name"))
         user_uuid = str(s3_credentials.get("user_uuid"))
 
@@ -179,8 +171,7 @@ async def load_next_page_of_images(
 # TODO: again, pass from URL param that
 @router.post("/default-single/")
 async def grab_single_image(
-    access_token: Annotated[str | None, Cookie()] = None,
-    db_session: AsyncSession = Depends(get_db_session),
+    principal: Principal = Depends(AuthService.get_current_principal),
     body: dict = Body(...),
 ) -> Response:
     try:
@@ -188,9 +179,7 @@ async def grab_single_image(
         file_name = body.get("file_name", "")
         file_format = "mobile" if width < 768 else "original"
 
-        s3_credentials = await GalleryService.grab_s3_credentials(
-            str(access_token), db_session
-        )
+        s3_credentials = GalleryService.grab_s3_credentials(principal)
         bucket_name = str(s3_credentials.get("bucket_name"))
         user_uuid = str(s3_credentials.get("user_uuid"))
 
@@ -221,20 +210,19 @@ async def grab_single_image(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/upload/")
+@router.post(
+    "/upload/", dependencies=[Depends(RateLimitService.limit_by_user("upload"))]
+)
 async def upload_image_to_gallery(
     file: UploadFile,
-    access_token: Annotated[str | None, Cookie()] = None,
-    db_session: AsyncSession = Depends(get_db_session),
+    principal: Principal = Depends(AuthService.get_current_principal),
 ) -> Response:
     """
     - Uses User's UUID (from access_token) to upload new image
     - to user's bucket/default album.
     """
     try:
-        thumbnail_data = await GalleryService.upload_new_image(
-            str(access_token), file, db_session
-        )
+        thumbnail_data = await GalleryService.upload_new_image(principal, file)
 
         return JSONResponse(
             status_code=200,
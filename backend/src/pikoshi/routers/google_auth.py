@@ -19,8 +19,8 @@ async def signup_with_google(
     """
     - Grabs the auth-code from
       SolidJS/GoogleOAuth2 Package (hand-written on front end).
-    - Grabs User's OAuth access_token and refresh_token (prefixed here with `google_`).
-    - Grabs User's Information (i.e. google id, email, name, etc.) using google_access_token.
+    - Exchanges it for User's OAuth tokens, and grabs User's Information
+      (i.e. google id, email, name, etc.) from the locally verified id_token.
     - Signs Up User in database and returns new User data from DB.
     - Grabs the new User's UUID and puts it inside of JWT access_token and refresh_token.
     - Sets the JWT access_token and JWT refresh_token in HTTP-Only Secure cookies,
@@ -29,12 +29,8 @@ async def signup_with_google(
     """
     try:
         auth_code = request.code
-        user_tokens = await GoogleOAuthService.get_user_tokens(auth_code)
-        google_access_token = str(user_tokens.get("access_token"))
         # TODO: Use google_refresh_token to refresh google access_token
-        # google_refresh_token = str(user_tokens.get("refresh_token"))
-
-        user_info = await GoogleOAuthService.get_user_info(google_access_token)
+        user_info = await GoogleOAuthService.get_user_info_by_code(auth_code)
         new_user = await GoogleOAuthService.signup_user_with_google(
             user_info, db_session
         )
@@ -61,8 +57,8 @@ async def login_with_google(
     """
     - Grabs the auth-code from
       SolidJS/GoogleOAuth2 Package (hand-written on front end).
-    - Grabs User's OAuth access_token and refresh_token (prefixed here with `google_`).
-    - Grabs User's Information (i.e. google id, email, name, etc.) using google_access_token.
+    - Exchanges it for User's OAuth tokens, and grabs User's Information
+      (i.e. google id, email, name, etc.) from the locally verified id_token.
     - Uses the returned User's Information to query the DB by email and return the User from DB.
     - Authenticates the User By Comparing User's Google ID against DB User Password.
     - Grabs new JWTs with user's UUID inside both JWT access_token and JWT refresh_token.
@@ -71,12 +67,8 @@ async def login_with_google(
     """
     try:
         auth_code = request.code
-        user_tokens = await GoogleOAuthService.get_user_tokens(auth_code)
-        google_access_token = str(user_tokens.get("access_token"))
         # TODO: Use google_refresh_token to refresh google access_token
-        #  google_refresh_token = str(user_tokens.get("refresh_token"))
-
-        user_info = await GoogleOAuthService.get_user_info(google_access_token)
+        user_info = await GoogleOAuthService.get_user_info_by_code(auth_code)
         user_from_db = await GoogleOAuthService.get_user_by_email_from_db(
             user_info, db_session
         )
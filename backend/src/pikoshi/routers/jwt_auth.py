@@ -1,9 +1,9 @@
-from fastapi import (APIRouter, BackgroundTasks, Depends, HTTPException,
-                     Response)
+from fastapi import APIRouter, Depends, HTTPException, Response
 from fastapi.responses import JSONResponse
 from jwt.exceptions import PyJWTError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..config.redis_config import consume
 from ..config.redis_config import redis_instance as redis
 from ..dependencies import get_db_session
 from ..middlewares.logger import TimedRoute
@@ -13,16 +13,18 @@ from ..services import auth_service as AuthService
 from ..services import email_service as EmailService
 from ..services import exception_handler_service as ExceptionService
 from ..services import jwt_service as JWTAuthService
+from ..services import rate_limit_service as RateLimitService
 from ..services import user_service as UserService
 from ..utils.logger import logger
 
 router = APIRouter(prefix="/auth", tags=["auth"], route_class=TimedRoute)
 
 
-@router.post("/email-signup/")
+@router.post(
+    "/email-signup/", dependencies=[Depends(RateLimitService.limit_by_ip("email"))]
+)
 async def signup_with_email(
     user_input: UserInput,
-    background_tasks: BackgroundTasks,
     db_session: AsyncSession = Depends(get_db_session),
 ) -> Response:
     """
@@ -41,7 +43,7 @@ async def signup_with_email(
                 status_code=409, detail="Email has already been registered."
             )
 
-        await EmailService.send_transac_email(user_input, user_email, background_tasks)
+        await EmailService.send_transac_email(user_input, user_email)
 
         return JSONResponse(
             status_code=200, content={"message": "Email has been sent."}
@@ -86,7 +88,8 @@ async def email_onboarding(
       - We check the redis cache to be sure they didn't take too long
         to fill out the form..
       - If the user took too long, we throw back a HTTP 401 to the Client.
-      - Otherwise, the token is removed from the redis cache.
+      - Otherwise, the token is removed from the redis cache, in the same
+        round trip (GETDEL), so it can only ever be used once.
     - A New User is then establised in the DB.
     - And We grab the uuid from the New User from the DB.
     - We then establish a new JWT access_token and a new JWT refresh_token
@@ -95,11 +98,10 @@ async def email_onboarding(
       and sends them back to Client.
     """
     try:
-        user_email = await redis.get(f"signup_token_for_{user_info.token}")
+        user_email = await consume(f"signup_token_for_{user_info.token}")
         if not user_email:
             logger.error(f"Token not found or expired: {user_info.token}")
             raise HTTPException(status_code=401, detail="Token not found or expired.")
-        await redis.delete(f"signup_token_for_{user_info.token}")
 
         new_user = await JWTAuthService.signup_user_with_email(
             user_info, user_email, db_session, method="email"
@@ -120,7 +122,9 @@ async def email_onboarding(
         return ExceptionService.handle_generic_exception(e)
 
 
-@router.post("/email-login/")
+@router.post(
+    "/email-login/", dependencies=[Depends(RateLimitService.limit_by_ip("login"))]
+)
 async def email_login(
     user_info: UserInputEmailPass, db_session: AsyncSession = Depends(get_db_session)
 ) -> Response:
@@ -150,10 +154,11 @@ async def email_login(
         return ExceptionService.handle_generic_exception(e)
 
 
-@router.post("/forgot-password/")
+@router.post(
+    "/forgot-password/", dependencies=[Depends(RateLimitService.limit_by_ip("email"))]
+)
 async def forgot_password(
     user_input: UserInput,
-    background_tasks: BackgroundTasks,
     db_session: AsyncSession = Depends(get_db_session),
 ):
     """
@@ -176,7 +181,7 @@ async def forgot_password(
             )
 
         # Send a password reset email with the token
-        await EmailService.send_password_reset_email(user_input, background_tasks)
+        await EmailService.send_password_reset_email(user_input)
 
         return JSONResponse(status_code=200, content={"message": "a ok!!"})
         # return {"message": "Password reset email sent."}
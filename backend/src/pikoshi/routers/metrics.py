@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Response
+
+from ..utils.metrics import CONTENT_TYPE_LATEST, render_metrics
+
+# NOTE: Deliberately not a TimedRoute, so scrapes don't show up in the
+# access log or skew the route latency histograms.
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics")
+async def get_metrics() -> Response:
+    """
+    - Exposes application metrics in the Prometheus text format.
+    - With PROMETHEUS_MULTIPROC_DIR set, aggregates every uvicorn worker.
+    """
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,76 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Header, HTTPException, Response
+from fastapi.responses import JSONResponse
+
+from ..services import exception_handler_service as ExceptionService
+from ..utils.profiler import (PROFILE_MAX_SECONDS, WindowProfile,
+                              is_authorized, profiler)
+
+# NOTE: Deliberately not a TimedRoute, profiling windows shouldn't
+# show up in the access log or route latency metrics.
+router = APIRouter(prefix="/admin/profiler", tags=["admin"])
+
+
+def _authorize(token: str | None) -> None:
+    if not is_authorized(token):
+        raise HTTPException(status_code=403, detail="Invalid profiler token.")
+
+
+@router.post("/start/")
+async def start_profiling(
+    x_profile_token: Annotated[str | None, Header()] = None,
+    seconds: float = 30,
+) -> Response:
+    """
+    - Starts profiling every thread for `seconds` (at most PROFILE_MAX_SECONDS),
+      or until /admin/profiler/stop/ is called.
+    - Returns the path the folded stacks will be written to.
+    """
+    try:
+        _authorize(x_profile_token)
+        if profiler.window is not None:
+            raise HTTPException(
+                status_code=409, detail="A profiling window is already running."
+            )
+        session = profiler.start(WindowProfile("window", seconds))
+        return JSONResponse(
+            status_code=202,
+            content={
+                "message": "Profiling started.",
+                "seconds": min(seconds, PROFILE_MAX_SECONDS),
+                "profile": session.path,
+            },
+        )
+    except HTTPException as http_e:
+        return ExceptionService.handle_http_exception(http_e)
+    except Exception as e:
+        return ExceptionService.handle_generic_exception(e)
+
+
+@router.post("/stop/")
+async def stop_profiling(
+    x_profile_token: Annotated[str | None, Header()] = None,
+) -> Response:
+    """
+    - Stops the running profiling window, and returns where its folded
+      stacks are written to.
+    """
+    try:
+        _authorize(x_profile_token)
+        session = profiler.window
+        if session is None:
+            raise HTTPException(
+                status_code=404, detail="No profiling window is running."
+            )
+        return JSONResponse(
+            status_code=200,
+            content={
+                "message": "Profiling stopped.",
+                "profile": profiler.stop(session),
+            },
+        )
+    except HTTPException as http_e:
+        return ExceptionService.handle_http_exception(http_e)
+    except Exception as e:
+        return ExceptionService.handle_generic_exception(e)
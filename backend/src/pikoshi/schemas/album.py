@@ -1,4 +1,9 @@
-from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+from typing import Annotated, Dict, List
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+from .photo import Photo
 
 
 class AlbumBase(BaseModel):
@@ -11,3 +16,69 @@ class Album(AlbumBase):
     user_id: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class AlbumCreate(BaseModel):
+    title: Annotated[str, Field(min_length=1, max_length=30)]
+    is_private: bool = True
+
+
+class AlbumUpdate(BaseModel):
+    title: Annotated[str | None, Field(min_length=1, max_length=30)] = None
+    is_private: bool | None = None
+    cover_photo_id: int | None = None
+
+
+class AlbumSummary(Album):
+    """
+    - An Album as listed, with its cover Photo and number of Photos
+      (see AlbumService.list_albums).
+    """
+
+    created: datetime | None = None
+    is_private: bool | None = None
+    photo_count: int = 0
+    cover_photo: Photo | None = None
+
+
+class AlbumDetail(AlbumSummary):
+    """
+    - An Album with its newest Photos (see AlbumService.get_album), the
+      rest are paged from `next_photos_cursor` (see PhotoService.list_photos).
+    """
+
+    photos: List[Photo] = []
+    # Pass as `cursor` to GET /albums/{id}/photos/, None if all are embedded
+    next_photos_cursor: int | None = None
+
+    @model_validator(mode="after")
+    def set_next_photos_cursor(self) -> "AlbumDetail":
+        if self.photos and self.photo_count > len(self.photos):
+            self.next_photos_cursor = self.photos[-1].id
+        return self
+
+
+class AlbumPage(BaseModel):
+    albums: List[AlbumSummary]
+    # Pass back as `cursor` for the next page, None on the last page
+    next_cursor: int | None = None
+
+
+class AlbumLocation(BaseModel):
+    """
+    - Where an Album's images live in S3 (see S3Service.upload_file).
+    """
+
+    bucket_name: str
+    user_uuid: str
+    album_name: str
+
+
+class AlbumAccess(BaseModel):
+    """
+    - The Albums a User may read (their own and those shared with them),
+      by id, as of `version` (see services/album_access_service.py).
+    """
+
+    version: int
+    albums: Dict[int, AlbumLocation]
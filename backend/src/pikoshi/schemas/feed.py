@@ -0,0 +1,21 @@
+from datetime import datetime
+from typing import List
+
+from pydantic import BaseModel
+
+
+class FeedEntry(BaseModel):
+    """
+    - A Photo added to an Album shared with the User (see FeedService).
+    """
+
+    photo_id: int
+    album_id: int
+    file_name: str
+    date: datetime
+
+
+class FeedPage(BaseModel):
+    entries: List[FeedEntry]
+    # Pass back as `cursor` for the next page, None on the last page
+    next_cursor: int | None = None
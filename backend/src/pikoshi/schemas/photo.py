@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import List
 
 from pydantic import BaseModel, ConfigDict
 
@@ -13,3 +14,9 @@ class Photo(PhotoBase):
     id: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class PhotoPage(BaseModel):
+    photos: List[Photo]
+    # Pass back as `cursor` for the next page, None on the last page
+    next_cursor: int | None = None
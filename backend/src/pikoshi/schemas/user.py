@@ -76,3 +76,19 @@ class UserInputPass(BaseModel):
         return value
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class Principal(BaseModel):
+    """
+    - The minimal, cacheable view of an authenticated user
+      (see services/principal_service.py).
+    - `version` is the user's principal version it was loaded under.
+    """
+
+    id: int
+    uuid: str
+    is_active: bool
+    bucket_name: str
+    version: int = 0
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,150 @@
+import os
+from typing import Dict
+
+from dotenv import load_dotenv
+from fastapi import Depends, HTTPException
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config.redis_config import execute_pipeline
+from ..config.redis_config import redis_instance as redis
+from ..config.redis_config import redis_pipeline
+from ..database import is_replica, sessionmanager
+from ..dependencies import get_read_db_session
+from ..models.album import Album as AlbumModel
+from ..models.network import Network as NetworkModel
+from ..models.user import User as UserModel
+from ..schemas.album import AlbumAccess, AlbumLocation
+from ..schemas.user import Principal
+from ..utils.ttl_cache import TTLCache
+from . import auth_service as AuthService
+from . import s3_service as S3Service
+
+load_dotenv()
+# NOTE: A User's readable albums are built with one query, then cached in
+# Redis (stamped with the User's access version) and in-process.
+# Membership changes bump the version, so every worker's next Redis lookup
+# misses, but other workers' in-process caches may still grant (or deny)
+# access for up to ALBUM_ACCESS_LOCAL_TTL seconds, keep it short.
+ALBUM_ACCESS_LOCAL_TTL = float(os.environ.get("ALBUM_ACCESS_LOCAL_TTL") or 5)
+ALBUM_ACCESS_LOCAL_SIZE = int(os.environ.get("ALBUM_ACCESS_LOCAL_SIZE") or 10_000)
+ALBUM_ACCESS_REDIS_TTL = int(os.environ.get("ALBUM_ACCESS_REDIS_TTL") or 300)
+
+local_cache: TTLCache[AlbumAccess] = TTLCache(
+    ALBUM_ACCESS_LOCAL_SIZE, ALBUM_ACCESS_LOCAL_TTL
+)
+
+
+def _version_key(user_id: int) -> str:
+    return f"album_access:version:{user_id}"
+
+
+def _redis_key(user_id: int) -> str:
+    return f"album_access:{user_id}"
+
+
+async def _load_album_access(
+    db_session: AsyncSession, user_id: int, version: int
+) -> AlbumAccess:
+    stmt = (
+        select(AlbumModel.id, AlbumModel.album_name, UserModel.uuid)
+        .join(UserModel, UserModel.id == AlbumModel.user_id)
+        .where(
+            or_(
+                AlbumModel.user_id == user_id,
+                AlbumModel.id.in_(
+                    select(NetworkModel.album_id).where(NetworkModel.user_id == user_id)
+                ),
+            )
+        )
+    )
+    if is_replica(db_session):
+        # NOTE: A lagging replica could cache a membership change that
+        # hasn't reached it yet under the new version.
+        async with sessionmanager.session() as primary_session:
+            rows = (await primary_session.execute(stmt)).all()
+    else:
+        rows = (await db_session.execute(stmt)).all()
+    albums: Dict[int, AlbumLocation] = {
+        row.id: AlbumLocation(
+            bucket_name=S3Service.get_bucket_name(row.uuid),
+            user_uuid=row.uuid,
+            album_name=row.album_name,
+        )
+        for row in rows
+    }
+    return AlbumAccess(version=version, albums=albums)
+
+
+async def get_album_access(db_session: AsyncSession, user_id: int) -> AlbumAccess:
+    """
+    - Resolves the Albums the User may read (their own, and those shared
+      with them through a Network), checking the in-process cache, then
+      Redis (a single MGET of the User's version and cached access), then
+      the DB, always on the primary.
+    - A cached access stamped with an older version is ignored, so a
+      membership change takes effect on the next Redis lookup.
+    - Populates both cache levels on the way back.
+    """
+    access = local_cache.get(user_id)
+    if access is not None:
+        return access
+
+    version, cached = await redis.mget(_version_key(user_id), _redis_key(user_id))
+    version = int(version or 0)
+    if cached is not None:
+        access = AlbumAccess.model_validate_json(cached)
+        if access.version == version:
+            local_cache.set(user_id, access)
+            return access
+
+    # NOTE: If the version moves on while this loads, the access is cached
+    # under the old version and ignored from then on.
+    access = await _load_album_access(db_session, user_id, version)
+    await redis.set(
+        _redis_key(user_id), access.model_dump_json(), ex=ALBUM_ACCESS_REDIS_TTL
+    )
+    local_cache.set(user_id, access)
+    return access
+
+
+async def get_readable_album(
+    db_session: AsyncSession, user_id: int, album_id: int
+) -> AlbumLocation | None:
+    """
+    - Returns where the Album's images live if the User may read it,
+      otherwise None. Usually answered without touching the DB.
+    """
+    access = await get_album_access(db_session, user_id)
+    return access.albums.get(album_id)
+
+
+async def invalidate_album_access(*user_ids: int) -> None:
+    """
+    - Bumps the Users' access versions (and drops their cached access),
+      must be called whenever an Album they own, or their membership of a
+      Network, is created or removed.
+    """
+    pipe = redis_pipeline()
+    for user_id in user_ids:
+        local_cache.pop(user_id)
+        pipe.incr(_version_key(user_id))
+        pipe.delete(_redis_key(user_id))
+    await execute_pipeline(pipe)
+
+
+async def require_album_access(
+    album_id: int,
+    principal: Principal = Depends(AuthService.get_current_principal),
+    db_session: AsyncSession = Depends(get_read_db_session),
+) -> AlbumLocation:
+    """
+    - FastAPI dependency authorizing the requesting User to read the
+      `album_id` path parameter's Album, returning where its images live.
+    - Raises a HTTP 404 (rather than 403, not to reveal that the Album
+      exists) if the User may not read it.
+    """
+    location = await get_readable_album(db_session, principal.id, album_id)
+    if location is None:
+        raise HTTPException(status_code=404, detail="Album Not Found.")
+    return location
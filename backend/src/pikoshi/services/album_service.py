@@ -1 +1,193 @@
-# Put db service methods related to albums for interacting with DB here
+import os
+from typing import List, Tuple
+from uuid import uuid4
+
+from dotenv import load_dotenv
+from sqlalchemy import delete, exists, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, with_expression
+from sqlalchemy.orm.attributes import set_committed_value
+
+from ..models.album import Album as AlbumModel
+from ..models.network import Network as NetworkModel
+from ..models.photo import Photo as PhotoModel
+from ..schemas.album import AlbumUpdate
+from . import album_access_service as AlbumAccessService
+from . import photo_service as PhotoService
+
+load_dotenv()
+# NOTE: Album details embed only their newest ALBUM_PHOTO_PREVIEW Photos,
+# the rest are paged through PhotoService.list_photos.
+ALBUM_PHOTO_PREVIEW = int(os.environ.get("ALBUM_PHOTO_PREVIEW") or 30)
+
+# NOTE: Every query here loads a fixed number of statements, however many
+# albums or photos are involved: the albums (with their photo counts as a
+# correlated subquery), then one `WHERE id IN (...)` per selectinload().
+# Album relationships are lazy="raise", so a missing option fails loudly
+# instead of quietly running a query per album.
+
+
+def _photo_count():
+    return (
+        select(func.count(PhotoModel.id))
+        .where(PhotoModel.album_id == AlbumModel.id)
+        .correlate(AlbumModel)
+        .scalar_subquery()
+    )
+
+
+def _select_albums(user_id: int, *options):
+    # NOTE: populate_existing refreshes albums already in the session,
+    # otherwise their photo_count and relationships wouldn't be (re)loaded.
+    return (
+        select(AlbumModel)
+        .where(AlbumModel.user_id == user_id)
+        .options(
+            with_expression(AlbumModel.photo_count, _photo_count()),
+            selectinload(AlbumModel.cover_photo),
+            *options,
+        )
+        .execution_options(populate_existing=True)
+    )
+
+
+async def list_albums(
+    db_session: AsyncSession,
+    user_id: int,
+    limit: int = 30,
+    cursor: int | None = None,
+) -> Tuple[List[AlbumModel], int | None]:
+    """
+    - Grabs a page of the User's Albums, newest first, each with its
+      photo_count and cover_photo, in two queries.
+    - Pages by keyset (`WHERE id < cursor`) rather than OFFSET, so every
+      page costs the same, however deep.
+    - Returns the Albums and the cursor of the next page, None if this
+      was the last one.
+    """
+    stmt = _select_albums(user_id).order_by(AlbumModel.id.desc()).limit(limit + 1)
+    if cursor is not None:
+        stmt = stmt.where(AlbumModel.id < cursor)
+    result = await db_session.execute(stmt)
+    albums = list(result.scalars().all())
+    if len(albums) > limit:
+        return albums[:limit], albums[limit - 1].id
+    return albums, None
+
+
+async def get_album(
+    db_session: AsyncSession, user_id: int, album_id: int
+) -> AlbumModel | None:
+    """
+    - Grabs one of the User's Albums by PK id, with its photo_count,
+      cover_photo and newest ALBUM_PHOTO_PREVIEW photos, in three queries.
+    - Returns None if the User has no such Album.
+    """
+    stmt = _select_albums(user_id).where(AlbumModel.id == album_id)
+    result = await db_session.execute(stmt)
+    album = result.scalars().first()
+    if album is None:
+        return None
+    photos, _ = await PhotoService.list_photos(
+        db_session, album_id, limit=ALBUM_PHOTO_PREVIEW
+    )
+    set_committed_value(album, "photos", photos)
+    return album
+
+
+async def create_album(
+    db_session: AsyncSession, user_id: int, title: str, is_private: bool = True
+) -> AlbumModel:
+    """
+    - Inserts a new, empty Album for the User with a single
+      `INSERT ... RETURNING` statement, named (i.e. its S3 directory)
+      `album_<random UUID>`.
+    - Commits, invalidates the User's album access and returns the
+      new Album.
+    """
+    stmt = (
+        insert(AlbumModel)
+        .values(
+            user_id=user_id,
+            title=title,
+            album_name=f"album_{uuid4()}",
+            is_private=is_private,
+        )
+        .returning(AlbumModel)
+    )
+    result = await db_session.execute(stmt)
+    album = result.scalars().one()
+    await db_session.commit()
+    await AlbumAccessService.invalidate_album_access(user_id)
+    # A new Album has no photos, nothing to load
+    set_committed_value(album, "photo_count", 0)
+    set_committed_value(album, "cover_photo", None)
+    set_committed_value(album, "photos", [])
+    return album
+
+
+async def update_album(
+    db_session: AsyncSession, user_id: int, album_id: int, changes: AlbumUpdate
+) -> AlbumModel | None:
+    """
+    - Applies the fields set in `changes` to one of the User's Albums with a
+      single `UPDATE`, a `cover_photo_id` must be one of the Album's own
+      Photos (or null, to remove the cover).
+    - Commits and returns the updated Album (see get_album), or None if the
+      User has no such Album or Photo.
+    """
+    values = {
+        field: value
+        for field, value in changes.model_dump(exclude_unset=True).items()
+        if value is not None or field == "cover_photo_id"
+    }
+    if values:
+        stmt = (
+            update(AlbumModel)
+            .where(AlbumModel.id == album_id, AlbumModel.user_id == user_id)
+            .values(**values)
+            .returning(AlbumModel.id)
+        )
+        if values.get("cover_photo_id") is not None:
+            stmt = stmt.where(
+                exists().where(
+                    PhotoModel.id == values["cover_photo_id"],
+                    PhotoModel.album_id == album_id,
+                )
+            )
+        result = await db_session.execute(stmt)
+        updated = result.scalar_one_or_none()
+        await db_session.commit()
+        if updated is None:
+            return None
+    return await get_album(db_session, user_id, album_id)
+
+
+async def delete_album(db_session: AsyncSession, user_id: int, album_id: int) -> bool:
+    """
+    - Removes the members of one of the User's Albums, then deletes the
+      Album (the database cascades the delete to its Photos).
+    - NOTE: The Album's S3 objects are left as they are.
+    - Commits, invalidates the album access of the User and the Album's
+      members, and returns whether the User had such an Album.
+    """
+    # NOTE: Not left to the cascade, to learn whose album access to invalidate
+    members = await db_session.execute(
+        delete(NetworkModel)
+        .where(NetworkModel.album_id == album_id, NetworkModel.founder_id == user_id)
+        .returning(NetworkModel.user_id)
+    )
+    member_ids = list(members.scalars().all())
+    stmt = (
+        delete(AlbumModel)
+        .where(AlbumModel.id == album_id, AlbumModel.user_id == user_id)
+        .returning(AlbumModel.id)
+    )
+    result = await db_session.execute(stmt)
+    deleted = result.scalar_one_or_none()
+    await db_session.commit()
+    if deleted is None:
+        return False
+    await AlbumAccessService.invalidate_album_access(user_id, *member_ids)
+    return True
@@ -1,48 +1,97 @@
-from fastapi import Depends, HTTPException, Response
+from typing import Annotated
+
+from fastapi import Cookie, Depends, HTTPException, Response
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..dependencies import get_db_session
-from ..schemas.user import User
+from ..dependencies import get_db_session, get_read_db_session
+from ..schemas.user import Principal, User
 from ..services import user_service as UserService
 from ..utils.auth_cookies import remove_auth_cookies, set_auth_cookies
+from ..utils.tracing import traced
 from . import jwt_service as JWTAuthService
+from . import principal_service as PrincipalService
+from . import revocation_service as RevocationService
 
 
 # TODO: Implement logic re: refreshing of access_token using refresh_token logic
 # NOTE: See fastapi-with-google POC for refresh_access_token logic for google-oauth2.
 # And also issue new access_token if refresh_token is still good (whether jwt or google-oauth2 token)
+@traced()
 async def get_user_by_token(
     token: str, db_session: AsyncSession = Depends(get_db_session)
 ) -> User:
     """
-    - Verifies both that the JWT access_token has not yet expired,
-      and also returns the user_uuid from inside the JWT's sub field.
+    - Verifies both that the JWT access_token has not yet expired (nor been
+      revoked), and also returns the user_uuid from inside the JWT's sub field.
     - Queries the User DB for a user with that UUID
       and returns the User data from DB.
     """
     verified_token = JWTAuthService.verify_token(token)
-    if verified_token is None:
-        return None  # type:ignore
-    user_uuid = verified_token.get("sub")  # type:ignore
+    if verified_token is None or await RevocationService.is_revoked(verified_token):
+        return None  # type: ignore
+    user_uuid = verified_token.get("sub")  # type: ignore
     return await UserService.get_user_by_uuid(db_session, str(user_uuid))
 
 
+@traced()
+async def get_principal_by_token(
+    token: str, db_session: AsyncSession = Depends(get_db_session)
+) -> Principal | None:
+    """
+    - Verifies that the JWT has not yet expired (nor been revoked, which is
+      usually answered in-process), and grabs the user_uuid
+      from the JWT's sub field.
+    - Returns the (cached) Principal of that user, which, unlike
+      get_user_by_token(), usually doesn't touch the DB at all.
+    """
+    verified_token = JWTAuthService.verify_token(token)
+    if verified_token is None or await RevocationService.is_revoked(verified_token):
+        return None
+    user_uuid = verified_token.get("sub")  # type: ignore
+    return await PrincipalService.get_principal(db_session, str(user_uuid))
+
+
+async def get_current_principal(
+    access_token: Annotated[str | None, Cookie()] = None,
+    db_session: AsyncSession = Depends(get_read_db_session),
+) -> Principal:
+    """
+    - FastAPI dependency resolving the requesting User's Principal (including
+      their S3 bucket_name) from the access_token cookie.
+    - FastAPI caches dependencies per request, so every route parameter and
+      sub-dependency asking for it shares a single lookup.
+    - Reads from a read replica when one is configured (a replica's miss is
+      re-checked on the primary, see PrincipalService.get_principal).
+    - Raises a HTTP 401 if the token is missing, invalid or expired, or if the
+      User doesn't exist or isn't active.
+    """
+    if not access_token:
+        raise HTTPException(status_code=401, detail="No access_token submitted.")
+    principal = await get_principal_by_token(access_token, db_session)
+    if principal is None or not principal.is_active:
+        raise HTTPException(
+            status_code=401, detail="No valid authentication tokens provided."
+        )
+    return principal
+
+
 async def authenticate(
     access_token: str,
     refresh_token: str,
     db_session: AsyncSession = Depends(get_db_session),
 ) -> JSONResponse:
     """
-    - Grabs the User from the DB based off of UUID returned from JWT access_token.
+    - Grabs the User's (cached) Principal based off of UUID returned
+      from JWT access_token.
     - Checks to see if the User exists and if User's `is_active` field is set to True.
     - Returns a HTTP 200 response back to the client if the aforementioned is True,
       and returns a HTTP 401 response if either condition is False.
     """
-    user = await get_user_by_token(access_token, db_session)
+    user = await get_principal_by_token(access_token, db_session)
 
     if not user or not user.is_active:
-        user = await get_user_by_token(refresh_token, db_session)
+        user = await get_principal_by_token(refresh_token, db_session)
 
         if user and user.is_active:
             new_access_token = JWTAuthService.create_access_token(user.uuid)
@@ -77,19 +126,38 @@ def set_authenticated_response(access_token, refresh_token) -> JSONResponse:
 
 
 async def logout(
-    access_token: str,
+    access_token: str | None,
     db_session: AsyncSession = Depends(get_db_session),
+    refresh_token: str | None = None,
 ) -> Response:
     """
-    - Grabs User from DB using UUID from JWT access_token.
-    - Sets the User's `is_active` field in the DB to False.
+    - Revokes both JWTs (by `jti`, see RevocationService.revoke), and
+      evicts them from the verified token cache.
+    - Grabs the User from DB using the UUID in the `sub` field of the JWT
+      access_token, or of the JWT refresh_token when the access_token is
+      expired (or either was already revoked, i.e. logging out twice).
+    - Sets that User's `is_active` field in the DB to False, if any.
     - Creates a HTTP 200 OK Response, indicating successful logout.
     - Removes JWT access_token and JWT refresh_token from Client's Cookie Storage.
     - Returns response to Client.
     """
-    user = await get_user_by_token(access_token, db_session)
-
-    await UserService.set_user_as_inactive(db_session, user)
+    user_uuid = None
+    for token in (access_token, refresh_token):
+        if not token:
+            continue
+        claims = JWTAuthService.verify_token(token)
+        JWTAuthService.evict_token(token)
+        # NOTE: Already revoked tokens (i.e. from another tab) must not log
+        # out the User again, who may have logged back in since.
+        if claims is None or await RevocationService.is_revoked(claims):
+            continue
+        await RevocationService.revoke(claims)
+        user_uuid = user_uuid or claims.get("sub")
+
+    if user_uuid is not None:
+        user = await UserService.get_user_by_uuid(db_session, str(user_uuid))
+        if user is not None:
+            await UserService.set_user_as_inactive(db_session, user)
     response = JSONResponse(
         status_code=200, content={"message": "User Logged Out Successfully."}
     )
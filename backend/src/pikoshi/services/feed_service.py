@@ -0,0 +1,127 @@
+import os
+from typing import List, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config.redis_config import execute_pipeline
+from ..config.redis_config import redis_instance as redis
+from ..config.redis_config import redis_pipeline
+from ..models.network import Network as NetworkModel
+from ..models.photo import Photo as PhotoModel
+from ..schemas.feed import FeedEntry
+from ..schemas.user import Principal
+from ..utils.logger import logger
+from . import album_access_service as AlbumAccessService
+
+load_dotenv()
+# NOTE: New Photos are written into each member's feed (a sorted set scored
+# by Photo id, capped at FEED_MAX_ENTRIES), so reading a feed is a single
+# range query. Albums shared with more than FEED_FANOUT_LIMIT users get one
+# album feed instead, merged into their members' feeds when read.
+FEED_MAX_ENTRIES = int(os.environ.get("FEED_MAX_ENTRIES") or 500)
+FEED_FANOUT_LIMIT = int(os.environ.get("FEED_FANOUT_LIMIT") or 1000)
+FEED_TTL = int(os.environ.get("FEED_TTL") or 60 * 60 * 24 * 30)
+
+
+def _feed_key(user_id: int) -> str:
+    return f"feed:{user_id}"
+
+
+def _album_feed_key(album_id: int) -> str:
+    return f"feed:album:{album_id}"
+
+
+def _fan_out_on_read_key(album_id: int) -> str:
+    return f"feed:fan_out_on_read:{album_id}"
+
+
+async def publish_photo(db_session: AsyncSession, photo: PhotoModel) -> int:
+    """
+    - Adds a new Photo to the feed of every member of its Album's Network
+      in one pipeline (trimming each feed to FEED_MAX_ENTRIES), or, past
+      FEED_FANOUT_LIMIT members, to the Album's own feed only.
+    - Members added later don't see earlier Photos in their feed.
+    - Feeds are best effort, a failure is logged rather than raised.
+    - Returns the number of feeds written.
+    """
+    try:
+        stmt = (
+            select(NetworkModel.user_id)
+            .where(NetworkModel.album_id == photo.album_id)
+            .limit(FEED_FANOUT_LIMIT + 1)
+        )
+        member_ids = list((await db_session.execute(stmt)).scalars().all())
+        entry = FeedEntry(
+            photo_id=photo.id,
+            album_id=photo.album_id,
+            file_name=photo.file_name,
+            date=photo.date,
+        ).model_dump_json()
+
+        pipe = redis_pipeline()
+        if len(member_ids) > FEED_FANOUT_LIMIT:
+            keys = [_album_feed_key(photo.album_id)]
+            pipe.set(_fan_out_on_read_key(photo.album_id), 1, ex=FEED_TTL)
+        else:
+            keys = [_feed_key(user_id) for user_id in member_ids]
+        for key in keys:
+            pipe.zadd(key, {entry: photo.id})
+            pipe.zremrangebyrank(key, 0, -FEED_MAX_ENTRIES - 1)
+            pipe.expire(key, FEED_TTL)
+        if keys:
+            await execute_pipeline(pipe)
+        return len(keys)
+    except Exception as e:
+        logger.error(f"Publishing photo {photo.id} to feeds failed: {e}")
+        return 0
+
+
+async def read_feed(
+    db_session: AsyncSession,
+    principal: Principal,
+    limit: int = 30,
+    cursor: int | None = None,
+) -> Tuple[List[FeedEntry], int | None]:
+    """
+    - Grabs a page of the User's feed, newest first: their own feed plus
+      the album feeds of large Albums shared with them, fetched in one
+      pipeline of `ZREVRANGEBYSCORE ... LIMIT` range queries, i.e.
+      O(log n + limit) each.
+    - Pages by cursor (the last Photo id seen) rather than offset.
+    - Leaves out Albums no longer shared with the User, so a page may hold
+      fewer than `limit` entries even when more follow.
+    - Returns the entries and the cursor of the next page, None if this
+      was the last one.
+    """
+    access = await AlbumAccessService.get_album_access(db_session, principal.id)
+    shared = [
+        album_id
+        for album_id, location in access.albums.items()
+        if location.user_uuid != principal.uuid
+    ]
+    keys = [_feed_key(principal.id)]
+    if shared:
+        flags = await redis.mget(*(_fan_out_on_read_key(a) for a in shared))
+        keys += [_album_feed_key(a) for a, flag in zip(shared, flags) if flag]
+
+    high = "+inf" if cursor is None else f"({cursor}"
+    pipe = redis_pipeline()
+    for key in keys:
+        pipe.zrevrangebyscore(key, high, "-inf", start=0, num=limit + 1)
+    results = await execute_pipeline(pipe)
+
+    entries = {
+        entry.photo_id: entry
+        for raw_entries in results
+        for entry in map(FeedEntry.model_validate_json, raw_entries)
+    }
+    newest = sorted(entries, reverse=True)[: limit + 1]
+    next_cursor = newest[limit - 1] if len(newest) > limit else None
+    page = [
+        entries[photo_id]
+        for photo_id in newest[:limit]
+        if entries[photo_id].album_id in access.albums
+    ]
+    return page, next_cursor
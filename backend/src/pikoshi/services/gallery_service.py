@@ -5,32 +5,23 @@ from base64 import b64encode
 from typing import Any, AsyncGenerator, Dict, List, Tuple
 from uuid import uuid4
 
-from aiobotocore.session import get_session
-from fastapi import Depends, HTTPException, UploadFile
-from PIL import Image
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException, UploadFile
 
-from ..dependencies import get_db_session
+from ..config.s3_config import create_s3_client
+from ..schemas.user import Principal
 from ..utils.hashers import hash_string
-from . import auth_service as AuthService
+from ..utils.images import resize_image
+from ..utils.tracing import traced
 from . import exception_handler_service as ExceptionService
 from . import s3_service as S3Service
 
-AWS_REGION = str(os.environ.get("AWS_REGION"))
-session = get_session()
 
-
-async def create_new_user_bucket(
-    access_token: str,
-    db_session: AsyncSession = Depends(get_db_session),
-) -> Dict[str, str]:
+@traced()
+async def create_new_user_bucket(principal: Principal) -> Dict[str, str]:
     """
-    - Grabs the User data from the database using the JWT
-      access_token's UUID.
-    - Grabs the UUID from the returned User's data from the DB.
-    - Hashes the User's UUID to determine which bucket index
-      to put User's Account (UUID) in (can only be number between 1 and 100).
-    - Establishes a bucket_name based off of returned index.
+    - Takes the requesting User's Principal (see
+      AuthService.get_current_principal), which already includes the User's
+      UUID and bucket_name (see S3Service.get_bucket_name).
     - Creates a new bucket if it doesn't exist, otherwise simply proceeds
       with established bucket.
     - Establishes user's UUID as a directory within bucket (amounting to all
@@ -38,15 +29,13 @@ async def create_new_user_bucket(
     - Returns a dictionary containing the User's bucket_name and user_uuid.
     """
     try:
-        user = await AuthService.get_user_by_token(access_token, db_session)
-        user_uuid = str(user.uuid)
-
-        user_bucket_index = S3Service.get_bucket_index(user_uuid)  # type:ignore
-        bucket_name = f"user-bucket-{user_bucket_index}"
+        s3_credentials = grab_s3_credentials(principal)
         await S3Service.create_bucket(
-            bucket_name, user_uuid, album_name="album_default"
+            s3_credentials["bucket_name"],
+            s3_credentials["user_uuid"],
+            album_name="album_default",
         )
-        return {"bucket_name": bucket_name, "user_uuid": user_uuid}
+        return s3_credentials
     except Exception as e:
         raise HTTPException(
             status_code=400,
@@ -54,29 +43,15 @@ async def create_new_user_bucket(
         )
 
 
-async def grab_s3_credentials(
-    access_token: str, db_session: AsyncSession = Depends(get_db_session)
-) -> Dict[str, str]:
+def grab_s3_credentials(principal: Principal) -> Dict[str, str]:
     """
-    - Uses the JWT's sub field to grab the User's UUID.
-    - Uses the get_bucket_index method to generate the
-      user's bucket id via simple hashing function (i.e. numbers 1-100).
-    - Returns a dictionary with the bucket name and user's UUID.
+    - Returns a dictionary with the bucket name and user's UUID
+      of the requesting User's Principal.
     """
-    try:
-        user = await AuthService.get_user_by_token(access_token, db_session)
-        user_uuid = str(user.uuid)
-
-        user_bucket_index = S3Service.get_bucket_index(user_uuid)  # type:ignore
-        bucket_name = f"user-bucket-{user_bucket_index}"
-        return {"bucket_name": bucket_name, "user_uuid": user_uuid}
-    except Exception as e:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unable To Access User S3 Credentials: {e}",
-        )
+    return {"bucket_name": principal.bucket_name, "user_uuid": str(principal.uuid)}
 
 
+@traced()
 async def grab_file_list(
     bucket_name: str,
     user_uuid: str,
@@ -128,6 +103,7 @@ async def grab_file_list(
         }
 
 
+@traced()
 async def upload_default_image(
     bucket_name: str,
     user_uuid: str,
@@ -202,7 +178,7 @@ async def grab_image_files(
       ensuring all images load.
     """
     try:
-        async with session.create_client("s3", region_name=AWS_REGION) as s3_client:
+        async with create_s3_client() as s3_client:
             for file_name in file_list:
                 if f"/{album_name}/{file_format}" in file_name:
                     orig_file_name = file_name.split("/")[-2]
@@ -230,6 +206,7 @@ async def grab_image_files(
         ExceptionService.handle_generic_exception(e)
 
 
+@traced()
 async def grab_single_image(
     bucket_name: str,
     user_uuid: str,
@@ -250,7 +227,7 @@ async def grab_single_image(
     - Returns an image_as_base64 dictionary with image data base64
       string, as well as image metadata.
     """
-    async with session.create_client("s3", region_name=AWS_REGION) as s3_client:
+    async with create_s3_client() as s3_client:
         prefix = f"{user_uuid}/{album_name}/{file_format}/{file_name}/"
         result = await s3_client.list_objects(
             Bucket=bucket_name, Prefix=prefix, Delimiter="/"
@@ -274,19 +251,15 @@ async def grab_single_image(
         return image_as_base64
 
 
+@traced()
 async def upload_new_image(
-    access_token: str,
+    principal: Principal,
     file: UploadFile,
-    db_session: AsyncSession = Depends(get_db_session),
     album_name: str = "album_default",
 ):
     """
-    - Grabs the User data from the database using the JWT
-      access_token's UUID.
-    - Grabs the UUID from the returned User's data from the DB.
-    - Hashes the User's UUID to determine which bucket index
-      to put User's Account (UUID) in (can only be number between 1 and 100).
-    - Establishes a bucket_name based off of returned index.
+    - Takes the requesting User's Principal, which includes the User's UUID
+      and bucket_name.
     - Uploads the image file to the User's appropriate
       bucket/UUID-directory/album-directory.
     - Establishes image_data in RAM via file.read() and io.BytesIO.
@@ -295,11 +268,8 @@ async def upload_new_image(
       bucket/UUID-directory/album-directory.
     """
     try:
-        user = await AuthService.get_user_by_token(access_token, db_session)
-
-        user_uuid = str(user.uuid)
-        user_bucket_index = S3Service.get_bucket_index(user_uuid)
-        bucket_name = f"user-bucket-{user_bucket_index}"
+        user_uuid = str(principal.uuid)
+        bucket_name = principal.bucket_name
 
         # NOTE: file.seek() is necessary to read UploadFile from RAM again.
         # IMPORTANT: Do NOT reorder where these calls are in this function,
@@ -361,28 +331,25 @@ async def upload_new_image(
         ExceptionService.handle_generic_exception(e)
 
 
+@traced()
 async def _resize_image(
     file: UploadFile, image_bytes: io.BytesIO, size: Tuple[int, int]
 ) -> Tuple[io.BytesIO, str]:
     """
-    - Uses pillow's Image() to create mobile/thumbnail version of image in RAM.
+    - Uses pillow's Image() to create mobile/thumbnail version of image in RAM,
+      in a worker thread.
     - Resizes image to mobile/thumbnail version.
-    - Saves the image in .webp format.
+    - Saves the image in .webp format (see utils/images.py for the settings).
     - Grabs the filename from the file object.
     - Hashes the filename.
     - Prepends `mobile` or `thumbnail` to the hashedfile name for file_name.
     - Prepares object_name based off of file_name.
     - Returns tuple of both img_bytes and object_name.
     """
-    with Image.open(image_bytes) as img:
-        img = img.copy()
-        img.thumbnail(size)
-
-        img_bytes = io.BytesIO()
-        img.save(img_bytes, format="WEBP", quality=85, optimize=True)
-        img_bytes.seek(0)
-        file_name = str(file.filename)
-        hashed_file_name = hash_string(file_name)
-        resized_file_name = hashed_file_name
-        object_name = os.path.join(file_name.split(".")[0], resized_file_name)
+    # NOTE: Pillow work is CPU bound, keep it off the event loop
+    img_bytes = await asyncio.to_thread(resize_image, image_bytes, size)
+    file_name = str(file.filename)
+    hashed_file_name = hash_string(file_name)
+    resized_file_name = hashed_file_name
+    object_name = os.path.join(file_name.split(".")[0], resized_file_name)
     return img_bytes, object_name
@@ -1,33 +1,113 @@
+import asyncio
 import os
-from typing import Dict
+import re
+import time
+from typing import Any, Dict
 from uuid import uuid4
 
-import httpx
+import jwt
 from dotenv import load_dotenv
 from fastapi import Depends
 from fastapi.exceptions import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..config.http_config import http_client
 from ..dependencies import get_db_session
 from ..schemas.user import User
 from ..services import jwt_service as JWTAuthService
 from ..services import security_service as SecurityService
 from ..services import user_service as UserService
+from ..utils.tracing import traced
 
 load_dotenv()
 GOOGLE_OAUTH2_CLIENT_ID = os.environ.get("GOOGLE_OAUTH2_CLIENT_ID")
 GOOGLE_OAUTH2_CLIENT_SECRET = os.environ.get("GOOGLE_OAUTH2_CLIENT_SECRET")
 GOOGLE_OAUTH2_REDIRECT_URI = os.environ.get("GOOGLE_OAUTH2_REDIRECT_URI")
+# NOTE: Endpoints are configurable so a local stand-in can be used in tests.
+GOOGLE_OAUTH2_TOKEN_URL = (
+    os.environ.get("GOOGLE_OAUTH2_TOKEN_URL")
+    or "https://www.googleapis.com/oauth2/v4/token"
+)
+GOOGLE_OAUTH2_USERINFO_URL = (
+    os.environ.get("GOOGLE_OAUTH2_USERINFO_URL")
+    or "https://www.googleapis.com/oauth2/v2/userinfo"
+)
+GOOGLE_OAUTH2_JWKS_URL = (
+    os.environ.get("GOOGLE_OAUTH2_JWKS_URL")
+    or "https://www.googleapis.com/oauth2/v3/certs"
+)
+# NOTE: Google's signing keys are re-fetched once the response's
+# Cache-Control max-age (or GOOGLE_JWKS_REFRESH_SECONDS without one) has
+# passed, and early when an ID token names an unknown key (key rotation),
+# but at most once per GOOGLE_JWKS_MIN_REFETCH_SECONDS.
+GOOGLE_JWKS_REFRESH_SECONDS = float(
+    os.environ.get("GOOGLE_JWKS_REFRESH_SECONDS") or 3600
+)
+GOOGLE_JWKS_MIN_REFETCH_SECONDS = float(
+    os.environ.get("GOOGLE_JWKS_MIN_REFETCH_SECONDS") or 60
+)
+GOOGLE_ID_TOKEN_ISSUERS = ["https://accounts.google.com", "accounts.google.com"]
 
 
+class JWKSCache:
+    """
+    Google's ID token signing keys (a JSON Web Key Set), cached in-process
+    so ID tokens are verified locally without a network call.
+    """
+
+    def __init__(self, url: str, refresh_seconds: float, min_refetch_seconds: float):
+        self.url = url
+        self.refresh_seconds = refresh_seconds
+        self.min_refetch_seconds = min_refetch_seconds
+        self.keys: Dict[str, jwt.PyJWK] = {}
+        self.expires_at = 0.0
+        self.fetched_at = -min_refetch_seconds
+        self._lock = asyncio.Lock()
+
+    async def get_key(self, kid: str) -> jwt.PyJWK:
+        key = self.keys.get(kid)
+        if key is None or time.monotonic() >= self.expires_at:
+            # NOTE: Only one concurrent login re-fetches the keys.
+            async with self._lock:
+                now = time.monotonic()
+                unknown = kid not in self.keys
+                if now >= self.expires_at or (
+                    unknown and now - self.fetched_at >= self.min_refetch_seconds
+                ):
+                    await self.refresh()
+                key = self.keys.get(kid)
+        if key is None:
+            raise ValueError("Google ID Token Signed With An Unknown Key.")
+        return key
+
+    @traced("google_oauth_service.refresh_jwks")
+    async def refresh(self) -> None:
+        response = await http_client.client.get(self.url)
+        if response.status_code != 200:
+            raise ValueError("Error Occurred While Fetching Google Signing Keys.")
+        self.keys = {jwk["kid"]: jwt.PyJWK(jwk) for jwk in response.json()["keys"]}
+        max_age = re.search(r"max-age=(\d+)", response.headers.get("cache-control", ""))
+        self.fetched_at = time.monotonic()
+        self.expires_at = self.fetched_at + (
+            int(max_age.group(1)) if max_age else self.refresh_seconds
+        )
+
+
+google_jwks = JWKSCache(
+    GOOGLE_OAUTH2_JWKS_URL, GOOGLE_JWKS_REFRESH_SECONDS, GOOGLE_JWKS_MIN_REFETCH_SECONDS
+)
+
+
+@traced()
 async def get_user_tokens(auth_code) -> Dict[str, str]:
     """
     - Prepares Google OAuth2 credentials as `data`.
-    - Sends `data` to Google's OAuth2 API.
+    - Sends `data` to Google's OAuth2 API (over the shared keep-alive client).
     - Should anything go wrong, raises a ValueError to be
       caught by route's exception handlers.
     - Returns OAuth2 tokens/authentication credentials,
-      including Google OAuth2 access_token, GoogleOAuth2 refresh_token.
+      including Google OAuth2 access_token, GoogleOAuth2 refresh_token,
+      and (with the `openid` scope) a signed id_token.
     """
     data = {
         "code": auth_code,
@@ -37,30 +117,71 @@ async def get_user_tokens(auth_code) -> Dict[str, str]:
         "grant_type": "authorization_code",
     }
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            "https://www.googleapis.com/oauth2/v4/token", data=data
-        )
+    response = await http_client.client.post(GOOGLE_OAUTH2_TOKEN_URL, data=data)
     if response.status_code != 200:
         raise ValueError("Error Occurred While Getting Tokens Via Google Auth Code.")
     return response.json()
 
 
+@traced()
 async def get_user_info(access_token: str) -> Dict[str, str]:
     """
     - Uses Google OAuth2 access_token to grab more User Information
-      (including name, email, Google ID).
+      (including name, email, Google ID) from Google's userinfo endpoint.
     """
-    user_info_url = "https://www.googleapis.com/oauth2/v2/userinfo"
-
-    async with httpx.AsyncClient() as client:
-        headers = {"Authorization": f"Bearer {access_token}"}
-        response = await client.get(user_info_url, headers=headers)
+    headers = {"Authorization": f"Bearer {access_token}"}
+    response = await http_client.client.get(GOOGLE_OAUTH2_USERINFO_URL, headers=headers)
     if response.status_code != 200:
         raise ValueError("An Error Occurred While Authenticating User By Access Token.")
     return response.json()
 
 
+async def verify_id_token(id_token: str) -> Dict[str, Any]:
+    """
+    - Verifies a Google ID token's signature against Google's (cached)
+      signing keys, as well as its expiry, audience (our client ID) and issuer.
+    - Raises a ValueError if it is invalid.
+    - Returns the ID token's claims.
+    """
+    try:
+        kid = str(jwt.get_unverified_header(id_token).get("kid"))
+        key = await google_jwks.get_key(kid)
+        return jwt.decode(
+            id_token,
+            key,
+            algorithms=["RS256"],
+            audience=GOOGLE_OAUTH2_CLIENT_ID,
+            issuer=GOOGLE_ID_TOKEN_ISSUERS,
+        )
+    except jwt.PyJWTError as e:
+        raise ValueError(f"Invalid Google ID Token: {e}")
+
+
+async def get_user_info_by_code(auth_code: str) -> Dict[str, Any]:
+    """
+    - Exchanges the auth-code for Google OAuth2 tokens.
+    - Grabs the User's Information (Google ID, email, name) from the
+      verified id_token's claims, in the same shape as get_user_info(),
+      so a login makes a single outbound call.
+    - Falls back to get_user_info() if no id_token was issued
+      (i.e. the `openid` scope wasn't requested).
+    """
+    user_tokens = await get_user_tokens(auth_code)
+    id_token = user_tokens.get("id_token")
+    if not id_token:
+        return await get_user_info(str(user_tokens.get("access_token")))
+    claims = await verify_id_token(id_token)
+    return {
+        "id": claims["sub"],
+        "email": claims.get("email"),
+        "verified_email": claims.get("email_verified"),
+        "name": claims.get("name"),
+        "given_name": claims.get("given_name"),
+        "family_name": claims.get("family_name"),
+        "picture": claims.get("picture"),
+    }
+
+
 async def get_user_from_db(
     access_token: str, db_session: AsyncSession = Depends(get_db_session)
 ) -> User:
@@ -105,13 +226,14 @@ async def signup_user_with_google(
     - Utilizes the user_id instead of a user inputted password for
       password field since we don't have access to user's actual password
       using this sign up method (also hashes the user_id as if it were a password).
-    - Toggles the user's is_active field in the DB to True.
+    - Inserts the User already active (see UserService.create_user),
+      in a single statement.
     """
     user_id = str(user_info.get("id"))
     salt = SecurityService.generate_salt()
     user_name = user_info.get("name")
     user_email = user_info.get("email")
-    user_password = SecurityService.hash_value(user_id, salt)
+    user_password = await SecurityService.hash_value(user_id, salt)
     uuid = str(uuid4())
     new_user = UserService.generate_user_profile(
         user_name, user_password, user_email, salt, uuid
@@ -121,8 +243,6 @@ async def signup_user_with_google(
         raise HTTPException(
             status_code=409, detail="Email has already been registered."
         )
-    await UserService.set_user_as_active(db_session, new_user)
-    await UserService.update_user_last_login(db_session, new_user)
     return new_user
 
 
@@ -136,18 +256,26 @@ async def authenticate_user_with_google(
     - Verifies that the hashed/salted/peppered user_id matches the
       password retreived from the DB.
     - Grabs the User's Pikoshi DB id (different from Google ID).
-    - Toggles the user's is_active field in the DB to True.
+    - Rehashes the user_id if it was hashed with a legacy algorithm or
+      outdated cost parameters (see SecurityService.needs_rehash).
+    - Toggles the user's is_active field in the DB to True and updates their
+      last_login (and hash) in a single statement (see UserService.record_login).
     """
     user_id = str(user_info.get("id"))
     user_password = str(user_from_db.password)
     user_salt = str(user_from_db.salt)
-    user_is_verified = SecurityService.verify_value(user_id, user_password, user_salt)
+    user_is_verified = await SecurityService.verify_value(
+        user_id, user_password, user_salt
+    )
     if not user_is_verified:
         raise HTTPException(status_code=401, detail="Hashes in DB do not match")
 
+    new_password = None
+    if SecurityService.needs_rehash(user_password):
+        new_password = await SecurityService.hash_value(user_id, user_salt)
+
     user_id = user_from_db.id
     user_uuid = user_from_db.uuid
     user_tokens = JWTAuthService.get_user_tokens(user_uuid)
-    await UserService.set_user_as_active(db_session, user_from_db)
-    await UserService.update_user_last_login(db_session, user_from_db)
+    await UserService.record_login(db_session, user_from_db.id, new_password)
     return user_tokens
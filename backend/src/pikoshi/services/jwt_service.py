@@ -1,6 +1,8 @@
+import hashlib
 import os
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Dict
+from typing import Any, Dict
 from uuid import uuid4
 
 import jwt
@@ -14,11 +16,22 @@ from ..schemas.user import User
 from ..services import exception_handler_service as ExceptionService
 from ..services import security_service as SecurityService
 from ..services import user_service as UserService
+from ..utils.ttl_cache import TTLCache
 
 load_dotenv()
 
 SECRET_KEY = str(os.environ.get("SECRET_KEY"))
 ALGORITHM = str(os.environ.get("ALGORITHM"))
+# NOTE: Verified claims are cached per worker, keyed by the token's SHA-256
+# digest, until the token's `exp` (or JWT_CACHE_TTL seconds, if sooner).
+JWT_CACHE_SIZE = int(os.environ.get("JWT_CACHE_SIZE") or 10_000)
+JWT_CACHE_TTL = float(os.environ.get("JWT_CACHE_TTL") or 3600)
+
+verified_tokens: TTLCache[Dict[str, Any]] = TTLCache(JWT_CACHE_SIZE, JWT_CACHE_TTL)
+
+
+def _token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
 
 
 def get_user_tokens(user_uuid: str) -> Dict[str, str]:
@@ -37,6 +50,7 @@ def get_user_tokens(user_uuid: str) -> Dict[str, str]:
             "exp": access_token_expires,
             "iat": datetime.now(timezone.utc),
             "sub": user_uuid,
+            "jti": uuid4().hex,
         },
         SECRET_KEY,
         algorithm=ALGORITHM,
@@ -46,6 +60,7 @@ def get_user_tokens(user_uuid: str) -> Dict[str, str]:
             "exp": refresh_token_expires,
             "iat": datetime.now(timezone.utc),
             "sub": user_uuid,
+            "jti": uuid4().hex,
         },
         SECRET_KEY,
         algorithm=ALGORITHM,
@@ -58,12 +73,31 @@ def verify_token(token: str) -> Dict[str, str] | None:
     """
     - Decodes the JWT and returns all values inside if successful
       (i.e. JWT is not expired or corrupted).
+    - Successfully verified claims are cached until the JWT expires,
+      so repeated requests with the same JWT skip signature verification.
     """
+    digest = _token_digest(token)
+    claims = verified_tokens.get(digest)
+    if claims is not None:
+        return claims
     try:
-        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except Exception as e:
         ExceptionService.handle_generic_exception(e)
         return None
+    expires_at = None
+    if "exp" in claims:
+        expires_at = time.monotonic() + float(claims["exp"]) - time.time()
+    verified_tokens.set(digest, claims, expires_at=expires_at)
+    return claims
+
+
+def evict_token(token: str) -> None:
+    """
+    - Drops a JWT's cached claims (i.e. on logout), so this worker
+      verifies it from scratch next time.
+    """
+    verified_tokens.pop(_token_digest(token))
 
 
 async def signup_user_with_email(
@@ -77,11 +111,12 @@ async def signup_user_with_email(
     - Generates Unique Salt and stores it in DB.
     - Hashes,salts, and peppers the User's Inputted Password, and stores the
       hashed password and salt in the DB.
-    - Toggles the user's is_active field in the DB to True.
+    - Inserts the User already active (see UserService.create_user),
+      in a single statement.
     """
     salt = SecurityService.generate_salt()
     user_name = user_info.username
-    user_password = SecurityService.hash_value(user_info.password, salt)
+    user_password = await SecurityService.hash_value(user_info.password, salt)
     uuid = str(uuid4())
     new_user = UserService.generate_user_profile(
         user_name, user_password, user_email, salt, uuid
@@ -92,10 +127,6 @@ async def signup_user_with_email(
         raise HTTPException(
             status_code=409, detail="Email has already been registered."
         )
-
-    user_from_db = await UserService.get_user_by_email(db_session, user_email)
-    await UserService.set_user_as_active(db_session, user_from_db)
-    await UserService.update_user_last_login(db_session, user_from_db)
     return new_user
 
 
@@ -108,8 +139,11 @@ async def authenticate_user_with_jwt(
     - Grabs the User's salt from the DB.
     - Verifies that the hashed/salted/peppered user_id matches the
       password retreived from the DB.
-    - Grabs the User's Pikoshi DB id.
-    - Toggles the user's is_active field in the DB to True.
+    - Rehashes the password if it was hashed with a legacy algorithm or
+      outdated cost parameters (see SecurityService.needs_rehash).
+    - Toggles the user's is_active field in the DB to True and updates their
+      last_login (and password hash), returning the updated User in the
+      same statement (see UserService.record_login).
     """
     user_email = user_info.email
     user_password = user_info.password
@@ -120,17 +154,19 @@ async def authenticate_user_with_jwt(
 
     user_password_from_db = user_from_db.password
     user_salt = user_from_db.salt
-    user_is_verified = SecurityService.verify_value(
+    user_is_verified = await SecurityService.verify_value(
         user_password, user_password_from_db, user_salt  # type:ignore
     )
 
     if not user_is_verified:
         raise HTTPException(status_code=401, detail="Hashes in DB do not match")
 
-    user_from_db = await UserService.get_user_by_email(db_session, user_email)
-    await UserService.set_user_as_active(db_session, user_from_db)
-    await UserService.update_user_last_login(db_session, user_from_db)
-    return user_from_db
+    new_password = None
+    if SecurityService.needs_rehash(user_password_from_db):
+        new_password = await SecurityService.hash_value(user_password, user_salt)
+    return await UserService.record_login(
+        db_session, user_from_db.id, new_password
+    )  # type:ignore
 
 
 def create_access_token(user_uuid: str) -> str:
@@ -140,6 +176,7 @@ def create_access_token(user_uuid: str) -> str:
             "exp": access_token_expires,
             "iat": datetime.now(timezone.utc),
             "sub": user_uuid,
+            "jti": uuid4().hex,
         },
         SECRET_KEY,
         algorithm=ALGORITHM,
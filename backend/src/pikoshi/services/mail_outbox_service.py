@@ -0,0 +1,189 @@
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict
+from uuid import uuid4
+
+from dotenv import load_dotenv
+
+from ..config.mail_config import mail_backend
+from ..config.redis_config import CACHE_BACKEND, execute_pipeline
+from ..config.redis_config import redis_instance as redis
+from ..config.redis_config import redis_pipeline
+from ..utils.logger import logger
+
+load_dotenv()
+# NOTE: Outgoing mail is queued in Redis by the web workers and sent by a
+# single mail worker (`rye run mail-worker`, see mail_worker.py), so requests
+# never wait on the mail provider, and queued mail survives restarts.
+# Failed sends are retried after MAIL_RETRY_BASE_SECONDS * 2**(attempts - 1)
+# (capped at MAIL_RETRY_MAX_SECONDS), and moved to the dead letter list
+# after MAIL_MAX_ATTEMPTS.
+MAIL_BATCH_SIZE = int(os.environ.get("MAIL_BATCH_SIZE") or 100)
+MAIL_MAX_ATTEMPTS = int(os.environ.get("MAIL_MAX_ATTEMPTS") or 8)
+MAIL_RETRY_BASE_SECONDS = float(os.environ.get("MAIL_RETRY_BASE_SECONDS") or 5)
+MAIL_RETRY_MAX_SECONDS = float(os.environ.get("MAIL_RETRY_MAX_SECONDS") or 3600)
+MAIL_POLL_SECONDS = float(os.environ.get("MAIL_POLL_SECONDS") or 1)
+# NOTE: Defaults to the mail provider's own limit (see backends/mail.py),
+# 0 disables rate limiting.
+MAIL_RATE_LIMIT_PER_SECOND = float(
+    os.environ.get("MAIL_RATE_LIMIT_PER_SECOND") or mail_backend.rate_limit_per_second
+)
+# NOTE: The in-process Redis stand-in is not shared with a separate mail
+# worker, so with CACHE_BACKEND="memory" the app runs one itself.
+MAIL_WORKER_IN_PROCESS = (
+    os.environ.get("MAIL_WORKER_IN_PROCESS") or str(CACHE_BACKEND == "memory")
+).lower() == "true"
+
+OUTBOX_KEY = "mail:outbox"
+PROCESSING_KEY = "mail:processing"
+RETRY_KEY = "mail:retry"
+DEAD_LETTER_KEY = "mail:dead"
+
+
+async def enqueue(params: Dict[str, Any]) -> str:
+    """
+    - Queues a message (Resend `Emails.send` params) for the mail worker,
+      and returns its outbox id.
+    """
+    message_id = uuid4().hex
+    await redis.lpush(
+        OUTBOX_KEY, json.dumps({"id": message_id, "params": params, "attempts": 0})
+    )
+    return message_id
+
+
+def retry_delay(attempts: int) -> float:
+    return min(MAIL_RETRY_MAX_SECONDS, MAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+
+
+class RateLimiter:
+    """
+    Spaces out calls to at most `rate` per second (0 disables), i.e. one
+    per mail provider, so batches are not rejected for exceeding its limit.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._next_at = 0.0
+
+    async def wait(self) -> None:
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        delay = self._next_at - now
+        self._next_at = max(now, self._next_at) + 1 / self.rate
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class MailOutboxWorker:
+    """
+    Drains the Redis mail outbox through the configured mail backend.
+
+    Each pass moves due retries back onto the outbox, claims up to
+    `batch_size` messages (RPOPLPUSH onto a processing list, so a crash
+    mid-send loses nothing) and sends them in one batch API call. Sends are
+    at-least-once: messages still in processing on startup (i.e. after a
+    crash) are queued again, so run a single mail worker.
+    """
+
+    def __init__(
+        self,
+        backend: Any = mail_backend,
+        batch_size: int = MAIL_BATCH_SIZE,
+        rate_limit_per_second: float = MAIL_RATE_LIMIT_PER_SECOND,
+        poll_seconds: float = MAIL_POLL_SECONDS,
+    ):
+        self.backend = backend
+        self.batch_size = min(batch_size, backend.max_batch_size)
+        self.rate_limiter = RateLimiter(rate_limit_per_second)
+        self.poll_seconds = poll_seconds
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run(), name="mail-outbox-worker")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def recover(self) -> None:
+        """
+        - Queues messages left in processing by a previous worker again.
+        """
+        while await redis.rpoplpush(PROCESSING_KEY, OUTBOX_KEY) is not None:
+            pass
+
+    async def promote_retries(self) -> None:
+        due = await redis.zrangebyscore(
+            RETRY_KEY, "-inf", time.time(), start=0, num=self.batch_size
+        )
+        for raw in due:
+            # NOTE: Only the worker that removed it queues it again.
+            if await redis.zrem(RETRY_KEY, raw):
+                await redis.lpush(OUTBOX_KEY, raw)
+
+    async def run_once(self) -> int:
+        """
+        - Sends one batch from the outbox, returns how many messages it
+          claimed (0 once the outbox is empty).
+        """
+        await self.promote_retries()
+        queued = await redis.llen(OUTBOX_KEY)
+        if not queued:
+            return 0
+        # NOTE: One round trip claims the whole batch
+        pipe = redis_pipeline()
+        for _ in range(min(self.batch_size, queued)):
+            pipe.rpoplpush(OUTBOX_KEY, PROCESSING_KEY)
+        claimed = [raw for raw in await execute_pipeline(pipe) if raw is not None]
+        if not claimed:
+            return 0
+
+        messages = [json.loads(raw) for raw in claimed]
+        await self.rate_limiter.wait()
+        try:
+            await asyncio.to_thread(
+                self.backend.send_batch, [message["params"] for message in messages]
+            )
+        except Exception as e:
+            logger.error(f"Sending {len(messages)} queued emails failed: {e}")
+            for message in messages:
+                await self.reschedule(message)
+        pipe = redis_pipeline()
+        for raw in claimed:
+            pipe.lrem(PROCESSING_KEY, 1, raw)
+        await execute_pipeline(pipe)
+        return len(claimed)
+
+    async def reschedule(self, message: Dict[str, Any]) -> None:
+        message = {**message, "attempts": message["attempts"] + 1}
+        if message["attempts"] >= MAIL_MAX_ATTEMPTS:
+            logger.error(f"Giving up on queued email {message['id']}")
+            await redis.lpush(DEAD_LETTER_KEY, json.dumps(message))
+            return
+        due = time.time() + retry_delay(message["attempts"])
+        await redis.zadd(RETRY_KEY, {json.dumps(message): due})
+
+    async def run(self) -> None:
+        await self.recover()
+        while True:
+            try:
+                if await self.run_once() < self.batch_size:
+                    await asyncio.sleep(self.poll_seconds)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Mail outbox worker failed, retrying: {e}")
+                await asyncio.sleep(self.poll_seconds)
+
+
+mail_outbox_worker = MailOutboxWorker()
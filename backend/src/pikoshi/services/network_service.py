@@ -1 +1,62 @@
-# Put db service methods related to networks for interacting with DB here
+from sqlalchemy import delete, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.album import Album as AlbumModel
+from ..models.network import Network as NetworkModel
+from . import album_access_service as AlbumAccessService
+
+
+async def add_member(
+    db_session: AsyncSession, founder_id: int, album_id: int, user_id: int
+) -> bool:
+    """
+    - Shares one of the founder's Albums with a User, adding them to the
+      Album's Network with a single `INSERT ... SELECT` statement, which
+      only inserts if the founder owns the Album (sharing twice is a no-op).
+    - Commits and invalidates the User's album access.
+    - Returns whether the founder owns the Album.
+    """
+    album = select(AlbumModel.user_id, literal(user_id), AlbumModel.id).where(
+        AlbumModel.id == album_id, AlbumModel.user_id == founder_id
+    )
+    stmt = insert(NetworkModel).from_select(
+        ["founder_id", "user_id", "album_id"], album
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_networks_album_id_user_id",
+        set_={"founder_id": stmt.excluded.founder_id},
+    ).returning(NetworkModel.id)
+    result = await db_session.execute(stmt)
+    added = result.scalar_one_or_none()
+    await db_session.commit()
+    if added is None:
+        return False
+    await AlbumAccessService.invalidate_album_access(user_id)
+    return True
+
+
+async def remove_member(
+    db_session: AsyncSession, founder_id: int, album_id: int, user_id: int
+) -> bool:
+    """
+    - Removes a User from the Network of one of the founder's Albums.
+    - Commits and invalidates the User's album access.
+    - Returns whether the User was a member.
+    """
+    stmt = (
+        delete(NetworkModel)
+        .where(
+            NetworkModel.founder_id == founder_id,
+            NetworkModel.album_id == album_id,
+            NetworkModel.user_id == user_id,
+        )
+        .returning(NetworkModel.id)
+    )
+    result = await db_session.execute(stmt)
+    removed = result.scalar_one_or_none()
+    await db_session.commit()
+    if removed is None:
+        return False
+    await AlbumAccessService.invalidate_album_access(user_id)
+    return True
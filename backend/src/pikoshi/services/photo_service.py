@@ -1 +1,54 @@
-# Put db service methods related to photos for interacting with DB here
+from typing import List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.photo import Photo as PhotoModel
+
+
+async def add_photo(
+    db_session: AsyncSession, album_id: int, file_name: str
+) -> PhotoModel:
+    """
+    - Inserts a new Photo into the Album with a single
+      `INSERT ... RETURNING` statement, dated now.
+    - Commits and returns the new Photo.
+    """
+    stmt = (
+        insert(PhotoModel)
+        .values(album_id=album_id, file_name=file_name)
+        .returning(PhotoModel)
+    )
+    result = await db_session.execute(stmt)
+    photo = result.scalars().one()
+    await db_session.commit()
+    return photo
+
+
+async def list_photos(
+    db_session: AsyncSession,
+    album_id: int,
+    limit: int = 50,
+    cursor: int | None = None,
+) -> Tuple[List[PhotoModel], int | None]:
+    """
+    - Grabs a page of the Album's Photos, newest first, in one query.
+    - Pages by keyset (`WHERE id < cursor`) rather than OFFSET, so every
+      page costs the same, however deep.
+    - Returns the Photos and the cursor of the next page, None if this
+      was the last one.
+    """
+    stmt = (
+        select(PhotoModel)
+        .where(PhotoModel.album_id == album_id)
+        .order_by(PhotoModel.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        stmt = stmt.where(PhotoModel.id < cursor)
+    result = await db_session.execute(stmt)
+    photos = list(result.scalars().all())
+    if len(photos) > limit:
+        return photos[:limit], photos[limit - 1].id
+    return photos, None
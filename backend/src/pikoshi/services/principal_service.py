@@ -0,0 +1,94 @@
+import os
+
+from dotenv import load_dotenv
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config.redis_config import execute_pipeline
+from ..config.redis_config import redis_instance as redis
+from ..config.redis_config import redis_pipeline
+from ..database import is_replica, sessionmanager
+from ..models.user import User as UserModel
+from ..schemas.user import Principal
+from ..utils.ttl_cache import TTLCache
+from . import s3_service as S3Service
+
+load_dotenv()
+# NOTE: Invalidation only reaches this worker's in-process cache (and Redis),
+# so other workers may serve a stale principal for up to
+# PRINCIPAL_LOCAL_TTL seconds, keep it short.
+PRINCIPAL_LOCAL_TTL = float(os.environ.get("PRINCIPAL_LOCAL_TTL") or 5)
+PRINCIPAL_LOCAL_SIZE = int(os.environ.get("PRINCIPAL_LOCAL_SIZE") or 10_000)
+PRINCIPAL_REDIS_TTL = int(os.environ.get("PRINCIPAL_REDIS_TTL") or 60)
+
+local_cache: TTLCache[Principal] = TTLCache(PRINCIPAL_LOCAL_SIZE, PRINCIPAL_LOCAL_TTL)
+
+
+def _version_key(user_uuid: str) -> str:
+    return f"principal:version:{user_uuid}"
+
+
+def _redis_key(user_uuid: str) -> str:
+    return f"principal:{user_uuid}"
+
+
+async def get_principal(db_session: AsyncSession, user_uuid: str) -> Principal | None:
+    """
+    - Resolves the user's Principal (id, uuid, is_active, bucket_name),
+      checking the in-process cache, then Redis (a single MGET of the
+      user's version and cached Principal), then the DB.
+    - A cached Principal stamped with an older version is ignored, so one
+      re-cached by a load racing `invalidate_principal` is never served.
+    - Populates both cache levels on the way back.
+    - Re-reads users missing (or inactive) on a read replica from the primary.
+    - Returns None if no user has that UUID.
+    """
+    principal = local_cache.get(user_uuid)
+    if principal is not None:
+        return principal
+
+    version, cached = await redis.mget(_version_key(user_uuid), _redis_key(user_uuid))
+    version = int(version or 0)
+    if cached is not None:
+        principal = Principal.model_validate_json(cached)
+        if principal.version == version:
+            local_cache.set(user_uuid, principal)
+            return principal
+
+    stmt = select(UserModel.id, UserModel.uuid, UserModel.is_active).filter(
+        UserModel.uuid == user_uuid
+    )
+    row = (await db_session.execute(stmt)).first()
+    if (row is None or not row.is_active) and is_replica(db_session):
+        # NOTE: A lagging replica may not have seen the signup or login yet
+        async with sessionmanager.session() as primary_session:
+            row = (await primary_session.execute(stmt)).first()
+    if row is None:
+        return None
+    principal = Principal(
+        id=row.id,
+        uuid=row.uuid,
+        is_active=bool(row.is_active),
+        bucket_name=S3Service.get_bucket_name(row.uuid),
+        version=version,
+    )
+    # NOTE: If the version moves on while this loads, the Principal is
+    # cached under the old version and ignored from then on.
+    await redis.set(
+        _redis_key(user_uuid), principal.model_dump_json(), ex=PRINCIPAL_REDIS_TTL
+    )
+    local_cache.set(user_uuid, principal)
+    return principal
+
+
+async def invalidate_principal(user_uuid: str) -> None:
+    """
+    - Bumps the user's principal version (and drops their cached Principal
+      from both cache levels), must be called whenever `is_active` (or
+      anything else cached) changes.
+    """
+    local_cache.pop(user_uuid)
+    pipe = redis_pipeline()
+    pipe.incr(_version_key(user_uuid))
+    pipe.delete(_redis_key(user_uuid))
+    await execute_pipeline(pipe)
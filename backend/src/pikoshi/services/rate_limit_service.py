@@ -0,0 +1,131 @@
+import math
+import os
+import time
+from typing import Any, Callable, Coroutine, List, Tuple
+
+from dotenv import load_dotenv
+from fastapi import Depends, HTTPException, Request
+from redis.exceptions import NoScriptError
+
+from ..backends.redis_scripts import TOKEN_BUCKET_LUA, TOKEN_BUCKET_SHA
+from ..config.redis_config import redis_instance as redis
+from ..schemas.user import Principal
+from ..services import auth_service as AuthService
+from ..utils.logger import logger
+from ..utils.ttl_cache import TTLCache
+
+load_dotenv()
+# NOTE: Policies are "<requests>/<seconds>": a token bucket holding up to
+# <requests> tokens (the burst), refilled at <requests> per <seconds>.
+# Client IPs come from the connection, run uvicorn with --proxy-headers
+# (and --forwarded-allow-ips) behind a reverse proxy.
+RATE_LIMIT_ENABLED = (os.environ.get("RATE_LIMIT_ENABLED") or "true").lower() == "true"
+RATE_LIMIT_POLICIES = {
+    "upload": os.environ.get("RATE_LIMIT_UPLOAD") or "30/60",
+    "email": os.environ.get("RATE_LIMIT_EMAIL") or "5/600",
+    "login": os.environ.get("RATE_LIMIT_LOGIN") or "20/60",
+}
+# NOTE: When a bucket is at least half full, a worker takes a lease of
+# extra tokens (a tenth of the bucket) along with the one it needs, and
+# spends them without asking Redis again for up to RATE_LIMIT_LEASE_SECONDS.
+# Unspent leases simply expire, so leasing never lets more requests through.
+RATE_LIMIT_LEASE_SECONDS = float(os.environ.get("RATE_LIMIT_LEASE_SECONDS") or 1)
+RATE_LIMIT_LEASE_CACHE_SIZE = int(
+    os.environ.get("RATE_LIMIT_LEASE_CACHE_SIZE") or 10_000
+)
+
+
+class RateLimitPolicy:
+    """
+    A named token bucket setting, parsed from "<requests>/<seconds>".
+    """
+
+    def __init__(self, name: str, setting: str):
+        requests, seconds = setting.split("/")
+        self.name = name
+        self.capacity = int(requests)
+        self.rate = self.capacity / float(seconds)
+        self.lease = self.capacity // 10
+
+
+policies = {
+    name: RateLimitPolicy(name, setting)
+    for name, setting in RATE_LIMIT_POLICIES.items()
+}
+leases: TTLCache[Tuple[int, float]] = TTLCache(
+    RATE_LIMIT_LEASE_CACHE_SIZE, RATE_LIMIT_LEASE_SECONDS
+)
+
+
+async def _take_tokens(key: str, policy: RateLimitPolicy) -> List[int]:
+    args = (policy.capacity, policy.rate, policy.lease)
+    try:
+        return await redis.evalsha(TOKEN_BUCKET_SHA, 1, key, *args)
+    except NoScriptError:
+        # NOTE: EVAL caches the script in Redis, so later calls only send
+        # its SHA1 again.
+        return await redis.eval(TOKEN_BUCKET_LUA, 1, key, *args)
+
+
+async def check(policy: RateLimitPolicy, identity: str) -> None:
+    """
+    - Takes a token for `identity` (i.e. "ip:<address>" or "user:<id>") from
+      the policy's bucket, spending a leased token in-process when it has
+      one, otherwise running TOKEN_BUCKET_LUA atomically in Redis.
+    - Raises a HTTP 429 with a Retry-After header once the bucket is empty.
+    - Lets the request through if Redis is unavailable.
+    """
+    if not RATE_LIMIT_ENABLED:
+        return
+    key = f"rate_limit:{policy.name}:{identity}"
+    lease = leases.get(key)
+    if lease is not None and lease[0] > 0:
+        leases.set(key, (lease[0] - 1, lease[1]), expires_at=lease[1])
+        return
+
+    try:
+        granted, retry_after_ms = await _take_tokens(key, policy)
+    except Exception as e:
+        logger.error(f"Rate limit check for {key} failed, allowing request: {e}")
+        return
+    if int(granted) > 1:
+        expires_at = time.monotonic() + RATE_LIMIT_LEASE_SECONDS
+        leases.set(key, (int(granted) - 1, expires_at), expires_at=expires_at)
+    elif not int(granted):
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests, please try again later.",
+            headers={"Retry-After": str(max(1, math.ceil(int(retry_after_ms) / 1000)))},
+        )
+
+
+def limit_by_ip(
+    policy_name: str,
+) -> Callable[..., Coroutine[Any, Any, None]]:
+    """
+    - FastAPI dependency rate limiting a route per client IP.
+    """
+    policy = policies[policy_name]
+
+    async def dependency(request: Request) -> None:
+        host = request.client.host if request.client else "unknown"
+        await check(policy, f"ip:{host}")
+
+    return dependency
+
+
+def limit_by_user(
+    policy_name: str,
+) -> Callable[..., Coroutine[Any, Any, None]]:
+    """
+    - FastAPI dependency rate limiting an authenticated route per User.
+    - Shares the route's AuthService.get_current_principal lookup.
+    """
+    policy = policies[policy_name]
+
+    async def dependency(
+        principal: Principal = Depends(AuthService.get_current_principal),
+    ) -> None:
+        await check(policy, f"user:{principal.id}")
+
+    return dependency
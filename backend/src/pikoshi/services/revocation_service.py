@@ -0,0 +1,125 @@
+import asyncio
+import os
+import time
+from typing import Any, Dict
+
+from dotenv import load_dotenv
+
+from ..config.redis_config import execute_pipeline
+from ..config.redis_config import redis_instance as redis
+from ..config.redis_config import redis_pipeline
+from ..utils.bloom_filter import BloomFilter
+from ..utils.logger import logger
+
+load_dotenv()
+# NOTE: Revoked JWT IDs (`jti`) live in Redis until their token would have
+# expired anyway. Every worker mirrors them into an in-process Bloom filter,
+# kept in sync over pub/sub and rebuilt from Redis every
+# REVOCATION_REBUILD_SECONDS (dropping expired entries), so most checks
+# never leave the process. Size REVOCATION_BLOOM_CAPACITY for the number of
+# tokens revoked within one refresh_token lifetime.
+REVOCATION_BLOOM_CAPACITY = int(os.environ.get("REVOCATION_BLOOM_CAPACITY") or 100_000)
+REVOCATION_BLOOM_ERROR_RATE = float(
+    os.environ.get("REVOCATION_BLOOM_ERROR_RATE") or 0.001
+)
+REVOCATION_REBUILD_SECONDS = float(os.environ.get("REVOCATION_REBUILD_SECONDS") or 3600)
+REVOCATION_CHANNEL = "revoked_jti"
+
+revoked_jtis = BloomFilter(REVOCATION_BLOOM_CAPACITY, REVOCATION_BLOOM_ERROR_RATE)
+
+
+def _redis_key(jti: str) -> str:
+    return f"revoked_jti:{jti}"
+
+
+async def revoke(claims: Dict[str, Any]) -> None:
+    """
+    - Revokes a verified JWT by its `jti` claim, for the rest of its lifetime.
+    - Marks it in this worker's Bloom filter right away, and tells the
+      other workers over pub/sub.
+    - Tokens without a `jti` (issued before revocation existed) or already
+      expired are skipped.
+    """
+    jti = claims.get("jti")
+    remaining = int(float(claims.get("exp", 0)) - time.time()) + 1
+    if not jti or remaining <= 0:
+        return
+    revoked_jtis.add(jti)
+    pipe = redis_pipeline()
+    pipe.set(_redis_key(jti), "1", ex=remaining)
+    pipe.publish(REVOCATION_CHANNEL, jti)
+    await execute_pipeline(pipe)
+
+
+async def is_revoked(claims: Dict[str, Any]) -> bool:
+    """
+    - Checks whether a verified JWT was revoked.
+    - Answered in-process when the Bloom filter has never seen its `jti`,
+      only possible matches (or false positives) are checked in Redis.
+    """
+    jti = claims.get("jti")
+    if not jti or jti not in revoked_jtis:
+        return False
+    return bool(await redis.exists(_redis_key(jti)))
+
+
+class RevocationSync:
+    """
+    Keeps the `revoked_jtis` Bloom filter in sync with Redis.
+
+    A background task subscribes to REVOCATION_CHANNEL, then rebuilds the
+    filter from the `revoked_jti:*` keys, so no revocation published in
+    between is missed. It then adds every published `jti` as it arrives,
+    and rebuilds again every REVOCATION_REBUILD_SECONDS, or after
+    reconnecting when the subscription drops.
+    """
+
+    def __init__(self, rebuild_seconds: float = REVOCATION_REBUILD_SECONDS):
+        self.rebuild_seconds = rebuild_seconds
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="revocation-sync")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def rebuild(self) -> None:
+        rebuilt = BloomFilter(REVOCATION_BLOOM_CAPACITY, REVOCATION_BLOOM_ERROR_RATE)
+        async for key in redis.scan_iter(match=_redis_key("*"), count=1000):
+            rebuilt.add(key.split(":", 1)[1])
+        revoked_jtis.load(rebuilt)
+
+    async def _run(self) -> None:
+        while True:
+            pubsub = redis.pubsub()
+            try:
+                await pubsub.subscribe(REVOCATION_CHANNEL)
+                await self.rebuild()
+                rebuilt_at = time.monotonic()
+                while True:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=1.0
+                    )
+                    if message is not None:
+                        revoked_jtis.add(message["data"])
+                    if time.monotonic() - rebuilt_at > self.rebuild_seconds:
+                        await self.rebuild()
+                        rebuilt_at = time.monotonic()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Revocation list sync failed, retrying: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+
+revocation_sync = RevocationSync()
@@ -1,20 +1,18 @@
+import asyncio
 import hashlib
 import io
 import os
+from pathlib import Path
 from typing import Any, List
 
-from aiobotocore.session import get_session
 from botocore.exceptions import ClientError
-from dotenv import load_dotenv
 from fastapi import UploadFile
 
+from ..config.s3_config import AWS_REGION, create_s3_client
 from ..utils.hashers import hash_string
+from ..utils.tracing import traced
 from . import exception_handler_service as ExceptionService
 
-load_dotenv()
-AWS_REGION = str(os.environ.get("AWS_REGION"))
-session = get_session()
-
 
 def get_bucket_index(user_uuid: str, num_buckets: int = 100) -> int:
     """
@@ -27,12 +25,20 @@ def get_bucket_index(user_uuid: str, num_buckets: int = 100) -> int:
     return int(hash_digest, 16) % num_buckets
 
 
+def get_bucket_name(user_uuid: str) -> str:
+    """
+    - Returns the name of the S3 bucket the user's albums live in.
+    """
+    return f"user-bucket-{get_bucket_index(user_uuid)}"
+
+
+@traced()
 async def get_all_buckets() -> List[str]:
     """
     - Grabs All Existing Bucket Names from S3
     """
     try:
-        async with session.create_client("s3", region_name=AWS_REGION) as s3_client:
+        async with create_s3_client() as s3_client:
             response = await s3_client.list_buckets()
             all_buckets = []
             if response:
@@ -44,6 +50,7 @@ async def get_all_buckets() -> List[str]:
         return []
 
 
+@traced()
 async def create_bucket(
     bucket_name: str,
     user_uuid: str,
@@ -57,7 +64,7 @@ async def create_bucket(
     - Creates a new album directory within user's uuid directory
     """
     try:
-        async with session.create_client("s3", region_name=AWS_REGION) as s3_client:
+        async with create_s3_client() as s3_client:
             location = {"LocationConstraint": AWS_REGION}
             all_buckets = await get_all_buckets()
             if bucket_name not in all_buckets:
@@ -71,6 +78,7 @@ async def create_bucket(
         ExceptionService.handle_s3_exception(e)
 
 
+@traced()
 async def grab_file_list(
     bucket: str,
     user_uuid: str,
@@ -97,7 +105,7 @@ async def grab_file_list(
         - Constructs and returns a dict that holds both the file_list and the
           next continuation token.
         """
-        async with session.create_client("s3", region_name=AWS_REGION) as s3_client:
+        async with create_s3_client() as s3_client:
             if continuation_token == "None":
                 return {"file_list": None}
             file_list = []
@@ -164,6 +172,7 @@ async def _create_bucket_if_not_exists(s3_client, bucket_name: str) -> None:
             raise
 
 
+@traced()
 async def upload_file(
     file: UploadFile | None,
     bucket_name: str,
@@ -190,7 +199,7 @@ async def upload_file(
       or file specified.
     """
     try:
-        async with session.create_client("s3") as s3_client:
+        async with create_s3_client(region_name=None) as s3_client:
             await _create_bucket_if_not_exists(s3_client, bucket_name)
 
             gallery_name = f"{user_uuid}/{album_name}/{file_format}"
@@ -214,17 +223,17 @@ async def upload_file(
 
             # Default Files
             elif object_name is not None:
-                with open(file_name, "rb") as f:
-                    file_name = file_name.split("/")[-1]
-                    hashed_file_name = hash_string(file_name)
-                    object_name = os.path.join(
-                        gallery_name,
-                        os.path.basename(object_name),
-                        os.path.basename(hashed_file_name),
-                    )
-                    return await s3_client.put_object(
-                        Bucket=bucket_name, Key=object_name, Body=f.read()
-                    )
+                body = await asyncio.to_thread(Path(file_name).read_bytes)
+                file_name = file_name.split("/")[-1]
+                hashed_file_name = hash_string(file_name)
+                object_name = os.path.join(
+                    gallery_name,
+                    os.path.basename(object_name),
+                    os.path.basename(hashed_file_name),
+                )
+                return await s3_client.put_object(
+                    Bucket=bucket_name, Key=object_name, Body=body
+                )
             else:
                 raise ValueError("Unknown Error Occurred When Uploading File(s).")
     except Exception as e:
@@ -236,7 +245,7 @@ async def upload_file(
 # but we WILL need to delete album
 async def delete_bucket(bucket) -> None:
     try:
-        async with session.create_client("s3") as s3_client:
+        async with create_s3_client(region_name=None) as s3_client:
             await s3_client.delete_bucket(Bucket=bucket)
     except Exception as e:
         ExceptionService.handle_s3_exception(e)
@@ -244,7 +253,7 @@ async def delete_bucket(bucket) -> None:
 
 async def download_file(file_name, bucket, object_name) -> None:
     try:
-        async with session.create_client("s3", region_name=AWS_REGION) as s3_client:
+        async with create_s3_client() as s3_client:
             s3_client.download_file(bucket, object_name, file_name)
     except Exception as e:
         ExceptionService.handle_s3_exception(e)
@@ -252,7 +261,7 @@ async def download_file(file_name, bucket, object_name) -> None:
 
 async def delete_file(bucket, key_name) -> None:
     try:
-        async with session.create_client("s3", region_name=AWS_REGION) as s3_client:
+        async with create_s3_client() as s3_client:
             s3_client.delete_object(Bucket=bucket, Key=key_name)
     except Exception as e:
         ExceptionService.handle_s3_exception(e)
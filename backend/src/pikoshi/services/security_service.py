@@ -1,31 +1,131 @@
+import asyncio
 import hashlib
 import hmac
 import os
 from base64 import urlsafe_b64encode
+from concurrent.futures import ThreadPoolExecutor
 from hashlib import sha256
 from time import time
+from typing import Tuple
 
 from dotenv import load_dotenv
 
+from ..utils.tracing import traced
+
 load_dotenv()
 PEPPER = os.environ.get("PEPPER")
+# NOTE: scrypt cost parameters for new hashes, N (CPU/memory cost, a power
+# of 2), r (block size) and p (parallelism). Each hash takes ~128 * N * r
+# bytes of memory. Hashes with other parameters (or legacy SHA-256 hashes)
+# still verify, and are rehashed on the User's next successful login.
+PASSWORD_KDF_N = int(os.environ.get("PASSWORD_KDF_N") or 2**14)
+PASSWORD_KDF_R = int(os.environ.get("PASSWORD_KDF_R") or 8)
+PASSWORD_KDF_P = int(os.environ.get("PASSWORD_KDF_P") or 1)
+# NOTE: Hashing runs on its own thread pool (hashlib.scrypt releases the
+# GIL), so it never blocks the event loop nor starves asyncio.to_thread()
+# work such as image resizing. At most PASSWORD_HASH_MAX_PENDING hashes are
+# running or queued at once, further logins wait their turn.
+PASSWORD_HASH_WORKERS = int(
+    os.environ.get("PASSWORD_HASH_WORKERS") or max(1, (os.cpu_count() or 2) // 2)
+)
+PASSWORD_HASH_MAX_PENDING = int(
+    os.environ.get("PASSWORD_HASH_MAX_PENDING") or PASSWORD_HASH_WORKERS * 4
+)
+SCRYPT_PREFIX = "scrypt"
+
+_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+# NOTE: A semaphore binds to the event loop it first waits on, so it is
+# created per running loop (i.e. repeated asyncio.run() in benchmarks).
+_pending: Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore] | None = None
+
+
+def _pending_hashes() -> asyncio.Semaphore:
+    global _pending
+    loop = asyncio.get_running_loop()
+    if _pending is None or _pending[0] is not loop:
+        _pending = (loop, asyncio.Semaphore(PASSWORD_HASH_MAX_PENDING))
+    return _pending[1]
+
+
+def scrypt_hash(
+    value: str,
+    salt: str,
+    n: int = PASSWORD_KDF_N,
+    r: int = PASSWORD_KDF_R,
+    p: int = PASSWORD_KDF_P,
+) -> str:
+    """
+    - Hashes a string value with scrypt, using a salt and pepper.
+    - Returns a versioned hash string, `scrypt$<N>$<r>$<p>$<hex digest>`,
+      so the cost parameters can be raised later on.
+    - NOTE: Blocking (and deliberately slow), use hash_value() on the event loop.
+    """
+    digest = hashlib.scrypt(
+        f"{value}{PEPPER}".encode(),
+        salt=salt.encode(),
+        n=n,
+        r=r,
+        p=p,
+        maxmem=128 * r * (n + p + 2) + 1024 * 1024,
+        dklen=32,
+    )
+    return f"{SCRYPT_PREFIX}${n}${r}${p}${digest.hex()}"
 
 
-def hash_value(value: str, salt: str) -> str:
+def legacy_sha256_hash(value: str, salt: str) -> str:
     """
     - Hash a string value using SHA-256 with
       a salt and pepper.
+    - NOTE: Only used to verify hashes stored before scrypt was introduced.
     """
     combined = f"{value}{salt}{PEPPER}".encode()
     return hashlib.sha256(combined).hexdigest()
 
 
-def verify_value(value: str, hashed_value: str, salt: str) -> bool:
+def _verify_blocking(value: str, hashed_value: str, salt: str) -> bool:
+    parts = hashed_value.split("$")
+    if len(parts) == 5 and parts[0] == SCRYPT_PREFIX:
+        n, r, p = (int(part) for part in parts[1:4])
+        expected = scrypt_hash(value, salt, n, r, p)
+    else:
+        expected = legacy_sha256_hash(value, salt)
+    return hmac.compare_digest(expected, hashed_value)
+
+
+async def _run_in_pool(fn, *args):
+    async with _pending_hashes():
+        return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+
+
+@traced()
+async def hash_value(value: str, salt: str) -> str:
+    """
+    - Hash a string value using scrypt (at the current cost parameters)
+      with a salt and pepper, on the password hashing thread pool.
+    """
+    return await _run_in_pool(scrypt_hash, value, salt)
+
+
+@traced()
+async def verify_value(value: str, hashed_value: str, salt: str) -> bool:
+    """
+    - Verify a value against a hashed value (scrypt or legacy SHA-256)
+      using the same salt and pepper, in constant time.
+    """
+    if not hashed_value.startswith(f"{SCRYPT_PREFIX}$"):
+        return _verify_blocking(value, hashed_value, salt)
+    return await _run_in_pool(_verify_blocking, value, hashed_value, salt)
+
+
+def needs_rehash(hashed_value: str) -> bool:
     """
-    - Verify a value against a hashed value
-      using the same salt and pepper
+    - Whether a stored hash is a legacy SHA-256 hash or uses other
+      scrypt cost parameters than the current ones.
     """
-    return hash_value(value, salt) == hashed_value
+    current = f"{SCRYPT_PREFIX}${PASSWORD_KDF_N}${PASSWORD_KDF_R}${PASSWORD_KDF_P}$"
+    return not hashed_value.startswith(current)
 
 
 def generate_salt() -> str:
@@ -1,11 +1,13 @@
 from uuid import uuid4
 
-from sqlalchemy import select
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import func
 
 from ..models.user import User as UserModel
 from ..schemas.user import User, UserCreate
+from . import principal_service as PrincipalService
 
 
 async def get_user(db_session: AsyncSession, user_id: int) -> UserModel:
@@ -59,59 +61,83 @@ async def create_user(
     db_session: AsyncSession, user: UserCreate, method: str = "email"
 ) -> UserModel | None:
     """
-    - Grabs the User By Email.
     - Establishes a new random UUID.
-    - Prepares SQLAlchemy Statement and assigns it the `db_user`.
-    - Adds and Commits new User data to user table DB.
-    - Refresh DB via to ensure DB does not retain in memory data.
-    - Return the new User from the DB.
-    """
-    db_user = await get_user_by_email(db_session, email=user.email)
-    uuid = str(uuid4())
-    if db_user:
-        return None
-    db_user = UserModel(
-        created=func.now(),
-        name=user.name,
-        email=user.email,
-        uuid=uuid,
-        password=user.password,
-        salt=user.salt,
-        is_active=True,
-        last_login=func.now(),
-        signed_up_method=method,
+    - Inserts the new User, already active and logged in, with a single
+      `INSERT ... ON CONFLICT (email) DO NOTHING RETURNING` statement,
+      so the email check, insert and read back are one round trip.
+    - Commits and returns the new User, or None if the email is
+      already registered.
+    """
+    stmt = (
+        insert(UserModel)
+        .values(
+            created=func.now(),
+            name=user.name,
+            email=user.email,
+            uuid=str(uuid4()),
+            password=user.password,
+            salt=user.salt,
+            is_active=True,
+            last_login=func.now(),
+            signed_up_method=method,
+        )
+        .on_conflict_do_nothing(index_elements=[UserModel.email])
+        .returning(UserModel)
     )
-    db_session.add(db_user)
+    result = await db_session.execute(stmt)
+    db_user = result.scalars().first()
     await db_session.commit()
-    await db_session.refresh(db_user)
     return db_user
 
 
-async def set_user_as_active(db_session: AsyncSession, user: User) -> None:
-    """
-    - Sets the User's `is_active` field to True.
+async def record_login(
+    db_session: AsyncSession, user_id: int, password: str | None = None
+) -> UserModel | None:
     """
-    user.__setattr__("is_active", True)
-    db_session.add(user)
+    - Sets the User's `is_active` field to True and `last_login` to the current
+      time with a single `UPDATE ... RETURNING` statement.
+    - Also replaces the User's password hash when given one
+      (see SecurityService.needs_rehash).
+    - Commits and invalidates the User's cached Principal.
+    - Returns the updated User, or None if no User has that id.
+    """
+    stmt = (
+        update(UserModel)
+        .where(UserModel.id == user_id)
+        .values(is_active=True, last_login=func.now())
+        .returning(UserModel)
+    )
+    if password is not None:
+        stmt = stmt.values(password=password)
+    result = await db_session.execute(stmt)
+    db_user = result.scalars().first()
     await db_session.commit()
-    await db_session.refresh(user)
+    if db_user is not None:
+        await PrincipalService.invalidate_principal(str(db_user.uuid))
+    return db_user
 
 
-async def update_user_last_login(db_session: AsyncSession, user: User) -> None:
+async def set_user_as_active(db_session: AsyncSession, user: User) -> None:
     """
-    - Updates user's last_login to current time.
+    - Sets the User's `is_active` field to True.
+    - Invalidates the User's cached Principal.
     """
-    user.__setattr__("last_login", func.now())
-    db_session.add(user)
-    await db_session.commit()
-    await db_session.refresh(user)
+    await _set_user_is_active(db_session, user, True)
 
 
 async def set_user_as_inactive(db_session: AsyncSession, user: User) -> None:
     """
     - Sets the User's `is_active` field to False.
+    - Invalidates the User's cached Principal.
     """
-    user.__setattr__("is_active", False)
-    db_session.add(user)
+    await _set_user_is_active(db_session, user, False)
+
+
+async def _set_user_is_active(
+    db_session: AsyncSession, user: User, is_active: bool
+) -> None:
+    # NOTE: A bulk UPDATE also updates `user` in the session, no refresh needed.
+    stmt = update(UserModel).where(UserModel.id == user.id).values(is_active=is_active)
+    await db_session.execute(stmt)
     await db_session.commit()
-    await db_session.refresh(user)
+    await PrincipalService.invalidate_principal(str(user.uuid))
@@ -1,4 +1,14 @@
+import os
 from contextlib import ExitStack
+from pathlib import Path
+
+# NOTE: Tests run against the in-process S3, Redis and mail stand-ins
+# (see backends/), these must be set before the app is imported.
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("CACHE_BACKEND", "memory")
+os.environ.setdefault("MAIL_BACKEND", "memory")
+# NOTE: Exposes per request resource counts, see helpers.assert_max_queries.
+os.environ.setdefault("REQUEST_STATS_HEADERS", "true")
 
 import pytest
 from alembic.config import Config
@@ -8,7 +18,7 @@ from alembic.script import ScriptDirectory
 from fastapi.testclient import TestClient
 
 from ..database import SQLALCHEMY_DATABASE_URL, Base, sessionmanager
-from ..dependencies import get_db_session
+from ..dependencies import get_db_session, get_read_db_session
 from ..main import app as actual_app
 
 
@@ -24,11 +34,14 @@ def client(app):
         yield c
 
 
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+
 # NOTE: Make sure to run alembic downgrade -1
-# in src/fastapi_app before running tests
+# in src/pikoshi before running tests
 def run_migrations(connection):
-    config = Config("fastapi_app/alembic.ini")
-    config.set_main_option("script_location", ".")
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "migrations"))
     config.set_main_option("sqlalchemy.url", SQLALCHEMY_DATABASE_URL)
     script = ScriptDirectory.from_config(config)
 
@@ -76,6 +89,7 @@ async def db_session(transactional_session):
 @pytest.fixture(scope="function", autouse=True)
 async def session_override(app, db_session):
     async def get_db_session_override():
-        yield db_session[0]
+        yield db_session
 
     app.dependency_overrides[get_db_session] = get_db_session_override
+    app.dependency_overrides[get_read_db_session] = get_db_session_override
@@ -0,0 +1,60 @@
+from contextlib import contextmanager
+from typing import Iterator
+from uuid import uuid4
+
+from httpx import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.user import User as UserModel
+from ..schemas.user import Principal
+from ..services import principal_service as PrincipalService
+from ..services import user_service as UserService
+from ..utils.accounting import RequestStats, track_resources
+
+
+def assert_max_queries(response: Response, max_queries: int) -> None:
+    """
+    - Asserts that the request behind `response` executed at most
+      `max_queries` SQL statements, i.e. `assert_max_queries(response, 2)`.
+    - Relies on the X-Debug-* headers (REQUEST_STATS_HEADERS, set in conftest).
+    """
+    queries = int(response.headers["X-Debug-Sql-Statements"])
+    assert queries <= max_queries, (
+        f"{response.request.method} {response.request.url.path} executed "
+        f"{queries} SQL statements, expected at most {max_queries}"
+    )
+
+
+@contextmanager
+def max_queries(limit: int) -> Iterator[RequestStats]:
+    """
+    - Asserts that the enclosed block (i.e. a service call) executes at most
+      `limit` SQL statements.
+    """
+    with track_resources() as stats:
+        yield stats
+    assert (
+        stats.sql_statements <= limit
+    ), f"Executed {stats.sql_statements} SQL statements, expected at most {limit}"
+
+
+async def create_user(db_session: AsyncSession, name: str = "test") -> UserModel:
+    """
+    - Creates an active User with a unique email and UUID.
+    """
+    profile = UserService.generate_user_profile(
+        name, "hashed", f"{uuid4()}@pikoshi.test", str(uuid4()), str(uuid4())
+    )
+    user = await UserService.create_user(db_session, profile)
+    assert user is not None
+    return user
+
+
+async def create_principal(db_session: AsyncSession, name: str = "test") -> Principal:
+    """
+    - Creates an active User (see `create_user`), returning its Principal.
+    """
+    user = await create_user(db_session, name)
+    principal = await PrincipalService.get_principal(db_session, str(user.uuid))
+    assert principal is not None
+    return principal
@@ -0,0 +1,107 @@
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from ..backends.cache import MemoryRedis
+from ..backends.storage import FakeS3Client, MemoryObjectStore
+from ..middlewares.logger import TimedRoute
+from ..utils import accounting
+from ..utils.metrics import (REDIS_COMMAND_DURATION, REDIS_COMMAND_ERRORS,
+                             S3_REQUEST_DURATION, S3_REQUEST_ERRORS,
+                             InstrumentedClient, InstrumentedClientContext)
+from .helpers import assert_max_queries, max_queries
+
+engine = create_engine("sqlite://")
+accounting.instrument_engine(engine)
+redis = InstrumentedClient(
+    MemoryRedis(),
+    REDIS_COMMAND_DURATION,
+    REDIS_COMMAND_ERRORS,
+    remote="redis",
+    on_call=accounting.account_redis_command,
+)
+object_store = MemoryObjectStore()
+
+
+def s3_client():
+    return InstrumentedClientContext(
+        FakeS3Client(object_store),
+        S3_REQUEST_DURATION,
+        S3_REQUEST_ERRORS,
+        remote="s3",
+        on_call=accounting.account_s3_call,
+    )
+
+
+router = APIRouter(prefix="/accounting-test", route_class=TimedRoute)
+
+
+@router.get("/work/")
+async def do_work():
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        connection.execute(text("SELECT 2"))
+    await redis.set("key", "value")
+    async with s3_client() as s3:
+        await s3.create_bucket(Bucket="bucket")
+        await s3.put_object(Bucket="bucket", Key="key", Body=b"x" * 100)
+        response = await s3.get_object(Bucket="bucket", Key="key")
+        await response["Body"].read()
+    sum(i * i for i in range(20_000))
+    return {"ok": True}
+
+
+@router.get("/stream/")
+async def stream_work():
+    async def chunks():
+        for _ in range(3):
+            await redis.get("key")
+            yield b"chunk"
+
+    return StreamingResponse(chunks())
+
+
+accounting_app = FastAPI()
+accounting_app.include_router(router)
+
+
+def test_resources_are_returned_as_debug_headers():
+    response = TestClient(accounting_app).get("/accounting-test/work/")
+
+    assert response.headers["X-Debug-Sql-Statements"] == "2"
+    assert response.headers["X-Debug-Redis-Commands"] == "1"
+    assert response.headers["X-Debug-S3-Calls"] == "3"
+    assert response.headers["X-Debug-S3-Bytes-Sent"] == "100"
+    assert response.headers["X-Debug-S3-Bytes-Received"] == "100"
+    assert float(response.headers["X-Debug-Cpu-Ms"]) > 0
+    assert_max_queries(response, 2)
+    with pytest.raises(AssertionError):
+        assert_max_queries(response, 1)
+
+
+def test_streamed_resources_are_logged(monkeypatch):
+    entries = []
+    monkeypatch.setattr(
+        "pikoshi.middlewares.logger.access_log_sink.emit", entries.append
+    )
+    response = TestClient(accounting_app).get("/accounting-test/stream/")
+
+    assert response.content == b"chunk" * 3
+    assert entries[-1]["resources"]["redis_commands"] == 3
+
+
+def test_max_queries_counts_statements():
+    with max_queries(3) as stats:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            connection.commit()
+    assert stats.sql_statements == 1
+    assert stats.db_round_trips == 3  # BEGIN, SELECT, COMMIT
+
+    with pytest.raises(AssertionError):
+        with max_queries(1):
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+                connection.execute(text("SELECT 2"))
@@ -0,0 +1,84 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config.redis_config import redis_instance as redis
+from ..services import album_access_service as AlbumAccessService
+from ..services import album_service as AlbumService
+from ..services import network_service as NetworkService
+from ..services import s3_service as S3Service
+from .helpers import create_user, max_queries
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_shared_albums_are_readable_without_queries(db_session: AsyncSession):
+    owner, member = await create_user(db_session, "access"), await create_user(
+        db_session, "access"
+    )
+    album = await AlbumService.create_album(db_session, owner.id, "shared")
+
+    with max_queries(1):
+        assert (
+            await AlbumAccessService.get_readable_album(db_session, member.id, album.id)
+            is None
+        )
+
+    assert await NetworkService.add_member(db_session, owner.id, album.id, member.id)
+    # Sharing twice is a no-op, only the owner can share
+    assert await NetworkService.add_member(db_session, owner.id, album.id, member.id)
+    assert not await NetworkService.add_member(
+        db_session, member.id, album.id, member.id
+    )
+
+    with max_queries(1):
+        location = await AlbumAccessService.get_readable_album(
+            db_session, member.id, album.id
+        )
+    assert location is not None
+    assert location.user_uuid == owner.uuid
+    assert location.bucket_name == S3Service.get_bucket_name(owner.uuid)
+    assert location.album_name == album.album_name
+
+    # Served from the in-process cache, then from Redis
+    with max_queries(0):
+        assert (
+            await AlbumAccessService.get_readable_album(db_session, member.id, album.id)
+            == location
+        )
+        AlbumAccessService.local_cache.clear()
+        assert (
+            await AlbumAccessService.get_readable_album(db_session, member.id, album.id)
+            == location
+        )
+
+    assert await NetworkService.remove_member(db_session, owner.id, album.id, member.id)
+    assert (
+        await AlbumAccessService.get_readable_album(db_session, member.id, album.id)
+        is None
+    )
+    # The owner can always read their own albums
+    assert (
+        await AlbumAccessService.get_readable_album(db_session, owner.id, album.id)
+        == location
+    )
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_outdated_album_access_is_ignored(db_session: AsyncSession):
+    owner, member = await create_user(db_session, "access"), await create_user(
+        db_session, "access"
+    )
+    album = await AlbumService.create_album(db_session, owner.id, "versioned")
+    stale = await AlbumAccessService.get_album_access(db_session, member.id)
+    assert stale.albums == {}
+
+    await NetworkService.add_member(db_session, owner.id, album.id, member.id)
+    # i.e. another worker caching what it read before the change
+    await redis.set(f"album_access:{member.id}", stale.model_dump_json())
+    AlbumAccessService.local_cache.clear()
+    access = await AlbumAccessService.get_album_access(db_session, member.id)
+    assert access.version == stale.version + 1
+    assert album.id in access.albums
+
+    assert await AlbumService.delete_album(db_session, owner.id, album.id)
+    access = await AlbumAccessService.get_album_access(db_session, member.id)
+    assert album.id not in access.albums
@@ -0,0 +1,142 @@
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import LAST_WRITE_COOKIE
+from ..schemas.album import AlbumDetail, AlbumSummary, AlbumUpdate
+from ..services import album_service as AlbumService
+from ..services import jwt_service as JWTAuthService
+from ..services import photo_service as PhotoService
+from .helpers import assert_max_queries, create_user, max_queries
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_albums_are_listed_in_constant_queries(db_session: AsyncSession):
+    user = await create_user(db_session, "albums")
+    albums = [
+        await AlbumService.create_album(db_session, user.id, f"album {i}")
+        for i in range(7)
+    ]
+    for i, album in enumerate(albums):
+        photos = [
+            await PhotoService.add_photo(db_session, album.id, f"photo{n}.webp")
+            for n in range(i)
+        ]
+        if photos:
+            changes = AlbumUpdate(cover_photo_id=photos[-1].id)
+            await AlbumService.update_album(db_session, user.id, album.id, changes)
+
+    # Pages by keyset, newest first, 2 queries (albums, covers) per page
+    listed, cursor = [], None
+    while True:
+        with max_queries(2):
+            page, cursor = await AlbumService.list_albums(
+                db_session, user.id, limit=3, cursor=cursor
+            )
+        listed += [AlbumSummary.model_validate(album) for album in page]
+        if cursor is None:
+            break
+    assert [album.title for album in listed] == [f"album {i}" for i in range(6, -1, -1)]
+    assert [album.photo_count for album in listed] == list(range(6, -1, -1))
+    assert [album.cover_photo and album.cover_photo.file_name for album in listed] == [
+        f"photo{i - 1}.webp" if i else None for i in range(6, -1, -1)
+    ]
+
+    with max_queries(3):
+        album = await AlbumService.get_album(db_session, user.id, albums[3].id)
+    detail = AlbumDetail.model_validate(album)
+    assert detail.photo_count == 3
+    assert [photo.file_name for photo in detail.photos] == [
+        "photo2.webp",
+        "photo1.webp",
+        "photo0.webp",
+    ]
+    assert detail.next_photos_cursor is None
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_album_photos_are_embedded_up_to_a_preview(
+    db_session: AsyncSession, monkeypatch
+):
+    monkeypatch.setattr(AlbumService, "ALBUM_PHOTO_PREVIEW", 2)
+    user = await create_user(db_session, "albums")
+    album = await AlbumService.create_album(db_session, user.id, "big")
+    photos = [
+        await PhotoService.add_photo(db_session, album.id, f"photo{n}.webp")
+        for n in range(5)
+    ]
+
+    with max_queries(3):
+        detail = AlbumDetail.model_validate(
+            await AlbumService.get_album(db_session, user.id, album.id)
+        )
+    assert detail.photo_count == 5
+    assert [photo.id for photo in detail.photos] == [photos[4].id, photos[3].id]
+
+    # The rest are paged by keyset, one query per page
+    listed, cursor = [], detail.next_photos_cursor
+    while cursor is not None:
+        with max_queries(1):
+            page, cursor = await PhotoService.list_photos(
+                db_session, album.id, limit=2, cursor=cursor
+            )
+        listed += [photo.id for photo in page]
+    assert listed == [photos[2].id, photos[1].id, photos[0].id]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_albums_are_scoped_to_their_owner(db_session: AsyncSession):
+    owner, other = await create_user(db_session, "albums"), await create_user(
+        db_session, "albums"
+    )
+    album = await AlbumService.create_album(db_session, owner.id, "mine")
+    other_album = await AlbumService.create_album(db_session, other.id, "theirs")
+    other_photo = await PhotoService.add_photo(db_session, other_album.id, "x.webp")
+
+    assert await AlbumService.get_album(db_session, other.id, album.id) is None
+    assert not await AlbumService.delete_album(db_session, other.id, album.id)
+    # A cover must be one of the album's own photos
+    changes = AlbumUpdate(cover_photo_id=other_photo.id)
+    assert (
+        await AlbumService.update_album(db_session, owner.id, album.id, changes) is None
+    )
+
+    updated = await AlbumService.update_album(
+        db_session, owner.id, album.id, AlbumUpdate(title="renamed", is_private=False)
+    )
+    assert updated is not None
+    assert (updated.title, updated.is_private) == ("renamed", False)
+
+    assert await AlbumService.delete_album(db_session, owner.id, album.id)
+    assert await AlbumService.get_album(db_session, owner.id, album.id) is None
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_album_routes(app, db_session: AsyncSession):
+    user = await create_user(db_session, "albums")
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://test",
+        cookies={"access_token": JWTAuthService.create_access_token(str(user.uuid))},
+    ) as client:
+        response = await client.post("/albums/", json={"title": "trip"})
+        assert response.status_code == 201
+        # The next reads stay on the primary (see ReadYourWritesMiddleware)
+        assert LAST_WRITE_COOKIE in response.headers["set-cookie"]
+        album_id = response.json()["id"]
+
+        response = await client.get("/albums/", params={"limit": 10})
+        assert response.status_code == 200
+        assert [album["id"] for album in response.json()["albums"]] == [album_id]
+        assert response.json()["next_cursor"] is None
+        # Principal lookup plus the albums page
+        assert_max_queries(response, 3)
+
+        response = await client.get("/albums/0/")
+        assert response.status_code == 404
+
+        response = await client.get(f"/albums/{album_id}/photos/")
+        assert response.status_code == 200
+        assert response.json() == {"photos": [], "next_cursor": None}
+        response = await client.get("/albums/0/photos/")
+        assert response.status_code == 404
@@ -0,0 +1,127 @@
+import asyncio
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+from ..backends.cache import MemoryRedis
+from ..backends.mail import MemoryMailBackend
+from ..backends.storage import (FakeS3Client, FilesystemObjectStore,
+                                MemoryObjectStore)
+from ..config.redis_config import (consume, execute_pipeline, redis_instance,
+                                   redis_pipeline, set_once)
+from ..utils.accounting import track_resources
+
+
+@pytest.mark.asyncio(loop_scope="function")
+@pytest.mark.parametrize("store_type", ["memory", "filesystem"])
+async def test_fake_s3_round_trip(store_type, tmp_path):
+    store = (
+        MemoryObjectStore()
+        if store_type == "memory"
+        else FilesystemObjectStore(str(tmp_path))
+    )
+    async with FakeS3Client(store) as s3_client:
+        with pytest.raises(ClientError):
+            await s3_client.head_bucket(Bucket="user-bucket-1")
+
+        await s3_client.create_bucket(Bucket="user-bucket-1")
+        for i in range(5):
+            await s3_client.put_object(
+                Bucket="user-bucket-1",
+                Key=f"uuid/album_default/thumbnail/img_{i}/hash",
+                Body=b"x" * (i + 1),
+            )
+
+        response = await s3_client.list_objects_v2(
+            Bucket="user-bucket-1", Prefix="uuid/album_default/thumbnail", MaxKeys=3
+        )
+        assert response["KeyCount"] == 3
+        assert response["IsTruncated"] is True
+
+        response = await s3_client.list_objects_v2(
+            Bucket="user-bucket-1",
+            Prefix="uuid/album_default/thumbnail",
+            MaxKeys=3,
+            ContinuationToken=response["NextContinuationToken"],
+        )
+        assert [c["Key"][-10:] for c in response["Contents"]] == [
+            "img_3/hash",
+            "img_4/hash",
+        ]
+        assert "NextContinuationToken" not in response
+
+        file_obj = await s3_client.get_object(
+            Bucket="user-bucket-1", Key="uuid/album_default/thumbnail/img_4/hash"
+        )
+        assert await file_obj["Body"].read() == b"xxxxx"
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_fake_s3_injects_latency_and_bandwidth():
+    store = MemoryObjectStore()
+    store.create_bucket("bucket")
+    async with FakeS3Client(store, latency=0.02, bandwidth=10_000) as s3_client:
+        before = time.perf_counter()
+        await s3_client.put_object(Bucket="bucket", Key="key", Body=b"x" * 1000)
+        assert time.perf_counter() - before >= 0.02 + 0.1
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_memory_redis_expiry_and_nx():
+    redis = MemoryRedis()
+    assert await redis.set("signup_token_for_abc", "a@b.c", ex=600) is True
+    assert await redis.set("signup_token_for_abc", "x@y.z", nx=True) is None
+    assert await redis.get("signup_token_for_abc") == "a@b.c"
+
+    await redis.set("short_lived", 1, px=1)
+    time.sleep(0.01)
+    assert await redis.get("short_lived") is None
+    assert await redis.delete("signup_token_for_abc") == 1
+    assert await redis.exists("signup_token_for_abc") == 0
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_one_time_tokens_are_consumed_exactly_once_in_one_round_trip():
+    await redis_instance.set("signup_token_for_once", "a@b.c", ex=600)
+    with track_resources() as stats:
+        results = await asyncio.gather(
+            *(consume("signup_token_for_once") for _ in range(5))
+        )
+    assert results.count("a@b.c") == 1 and results.count(None) == 4
+    assert stats.redis_commands == 5
+
+    assert await set_once("signup_token_for_once", "x@y.z", ex=600) is True
+    assert await set_once("signup_token_for_once", "a@b.c", ex=600) is False
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_pipelines_send_queued_commands_in_one_round_trip():
+    pipe = redis_pipeline()
+    pipe.lpush("pipelined", "a", "b")
+    pipe.llen("pipelined")
+    pipe.getdel("missing")
+    with track_resources() as stats:
+        assert await execute_pipeline(pipe) == [2, 2, None]
+    assert stats.redis_commands == 1
+    await redis_instance.delete("pipelined")
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_memory_redis_capped_sorted_sets():
+    redis = MemoryRedis()
+    for score in range(6):
+        await redis.zadd("capped", {f"entry{score}": score})
+        await redis.zremrangebyrank("capped", 0, -4)
+    assert await redis.zrevrangebyscore("capped", "+inf", "-inf", start=0, num=2) == [
+        "entry5",
+        "entry4",
+    ]
+    # "(" excludes the cursor itself
+    assert await redis.zrevrangebyscore("capped", "(4", "-inf") == ["entry3"]
+
+
+def test_memory_mail_backend_records_messages():
+    mail_backend = MemoryMailBackend()
+    mail_backend.send({"to": "a@b.c", "subject": "Complete Pikoshi Sign up"})
+    assert mail_backend.outbox[0]["to"] == "a@b.c"
@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config.redis_config import redis_instance as redis
+from ..services import album_service as AlbumService
+from ..services import feed_service as FeedService
+from ..services import network_service as NetworkService
+from ..services import photo_service as PhotoService
+from .helpers import create_principal, max_queries
+
+
+async def read_all(db_session: AsyncSession, principal, limit: int):
+    photo_ids, cursor = [], None
+    while True:
+        entries, cursor = await FeedService.read_feed(
+            db_session, principal, limit=limit, cursor=cursor
+        )
+        photo_ids += [entry.photo_id for entry in entries]
+        if cursor is None:
+            return photo_ids
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_uploads_fan_out_to_members(db_session: AsyncSession, monkeypatch):
+    monkeypatch.setattr(FeedService, "FEED_MAX_ENTRIES", 4)
+    owner = await create_principal(db_session, "feed")
+    members = [await create_principal(db_session, "feed") for _ in range(2)]
+    album = await AlbumService.create_album(db_session, owner.id, "shared")
+    for member in members:
+        await NetworkService.add_member(db_session, owner.id, album.id, member.id)
+
+    photos = []
+    for i in range(5):
+        photo = await PhotoService.add_photo(db_session, album.id, f"p{i}")
+        assert await FeedService.publish_photo(db_session, photo) == 2
+        photos.append(photo.id)
+
+    # Capped at FEED_MAX_ENTRIES, newest first, paged by cursor
+    await read_all(db_session, members[0], limit=3)
+    with max_queries(0):
+        assert await read_all(db_session, members[0], limit=3) == photos[:0:-1]
+    assert await read_all(db_session, owner, limit=3) == []
+
+    await NetworkService.remove_member(db_session, owner.id, album.id, members[1].id)
+    assert await read_all(db_session, members[1], limit=3) == []
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_large_networks_fan_out_on_read(db_session: AsyncSession, monkeypatch):
+    monkeypatch.setattr(FeedService, "FEED_FANOUT_LIMIT", 1)
+    owner = await create_principal(db_session, "feed")
+    members = [await create_principal(db_session, "feed") for _ in range(2)]
+    large = await AlbumService.create_album(db_session, owner.id, "large")
+    small = await AlbumService.create_album(db_session, owner.id, "small")
+    for member in members:
+        await NetworkService.add_member(db_session, owner.id, large.id, member.id)
+    await NetworkService.add_member(db_session, owner.id, small.id, members[0].id)
+
+    first = await PhotoService.add_photo(db_session, large.id, "first")
+    second = await PhotoService.add_photo(db_session, small.id, "second")
+    third = await PhotoService.add_photo(db_session, large.id, "third")
+    # One album feed, instead of a feed per member
+    assert await FeedService.publish_photo(db_session, first) == 1
+    assert await FeedService.publish_photo(db_session, second) == 1
+    assert await FeedService.publish_photo(db_session, third) == 1
+    assert await redis.zcard(f"feed:{members[1].id}") == 0
+
+    assert await read_all(db_session, members[0], limit=2) == [
+        third.id,
+        second.id,
+        first.id,
+    ]
+    assert await read_all(db_session, members[1], limit=2) == [third.id, first.id]
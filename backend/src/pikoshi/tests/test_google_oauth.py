@@ -0,0 +1,75 @@
+import time
+
+import httpx
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import FastAPI, Response
+from jwt.algorithms import RSAAlgorithm
+
+from ..config.http_config import SharedHttpClient
+from ..services import google_oauth_service as GoogleOAuthService
+
+# NOTE: A local stand-in for Google's token and JWKS endpoints.
+signing_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+calls = {"token": 0, "certs": 0}
+standin = FastAPI()
+
+
+@standin.post("/token")
+async def token():
+    calls["token"] += 1
+    id_token = jwt.encode(
+        {
+            "iss": "https://accounts.google.com",
+            "aud": GoogleOAuthService.GOOGLE_OAUTH2_CLIENT_ID,
+            "sub": "1234567890",
+            "email": "google-user@pikoshi.test",
+            "email_verified": True,
+            "name": "Google User",
+            "exp": int(time.time()) + 3600,
+        },
+        signing_key,
+        algorithm="RS256",
+        headers={"kid": "standin-key"},
+    )
+    return {"access_token": "google-access-token", "id_token": id_token}
+
+
+@standin.get("/certs")
+async def certs(response: Response):
+    calls["certs"] += 1
+    jwk = RSAAlgorithm.to_jwk(signing_key.public_key(), as_dict=True)
+    response.headers["Cache-Control"] = "public, max-age=600"
+    return {"keys": [{**jwk, "kid": "standin-key", "alg": "RS256", "use": "sig"}]}
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_id_token_is_verified_locally(monkeypatch):
+    monkeypatch.setattr(GoogleOAuthService, "GOOGLE_OAUTH2_CLIENT_ID", "test-client")
+    client = SharedHttpClient(transport=httpx.ASGITransport(app=standin))
+    monkeypatch.setattr(GoogleOAuthService, "http_client", client)
+    monkeypatch.setattr(
+        GoogleOAuthService, "GOOGLE_OAUTH2_TOKEN_URL", "http://google.test/token"
+    )
+    jwks = GoogleOAuthService.JWKSCache("http://google.test/certs", 3600, 60)
+    monkeypatch.setattr(GoogleOAuthService, "google_jwks", jwks)
+
+    try:
+        for _ in range(2):
+            user_info = await GoogleOAuthService.get_user_info_by_code("auth-code")
+            assert user_info["id"] == "1234567890"
+            assert user_info["email"] == "google-user@pikoshi.test"
+        # One token exchange per login, signing keys fetched once
+        assert calls == {"token": 2, "certs": 1}
+
+        forged = jwt.encode(
+            {"sub": "1234567890"},
+            rsa.generate_private_key(public_exponent=65537, key_size=2048),
+            algorithm="RS256",
+            headers={"kid": "standin-key"},
+        )
+        with pytest.raises(ValueError):
+            await GoogleOAuthService.verify_id_token(forged)
+    finally:
+        await client.close()
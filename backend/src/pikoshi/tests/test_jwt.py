@@ -0,0 +1,37 @@
+from datetime import datetime, timedelta, timezone
+
+import jwt
+
+from ..services import jwt_service as JWTAuthService
+
+
+def test_verified_tokens_are_cached_until_evicted(monkeypatch):
+    decodes = []
+    decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        decodes.append(args[0])
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(jwt, "decode", counting_decode)
+    token = JWTAuthService.create_access_token("cached-user")
+
+    assert JWTAuthService.verify_token(token)["sub"] == "cached-user"  # type:ignore
+    assert JWTAuthService.verify_token(token)["sub"] == "cached-user"  # type:ignore
+    assert len(decodes) == 1
+
+    JWTAuthService.evict_token(token)
+    assert JWTAuthService.verify_token(token) is not None
+    assert len(decodes) == 2
+
+
+def test_invalid_and_expired_tokens_are_not_cached():
+    expired = jwt.encode(
+        {"exp": datetime.now(timezone.utc) - timedelta(seconds=1), "sub": "expired"},
+        JWTAuthService.SECRET_KEY,
+        algorithm=JWTAuthService.ALGORITHM,
+    )
+    size = len(JWTAuthService.verified_tokens)
+    assert JWTAuthService.verify_token(expired) is None
+    assert JWTAuthService.verify_token("not-a-jwt") is None
+    assert len(JWTAuthService.verified_tokens) == size
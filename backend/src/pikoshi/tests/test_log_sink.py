@@ -0,0 +1,78 @@
+import json
+import os
+import threading
+import time
+
+from ..utils.log_sink import JsonLinesLogSink, sink_from_env
+
+
+def _read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_log_sink_writes_json_lines(tmp_path):
+    sink = JsonLinesLogSink(log_dir=str(tmp_path), prefix="access")
+    for i in range(3):
+        assert sink.emit({"route": f"/items/{i}", "status_code": 200})
+    sink.close()
+
+    (log_file,) = os.listdir(tmp_path)
+    assert log_file.startswith("access_") and log_file.endswith(".jsonl")
+    entries = _read_lines(tmp_path / log_file)
+    assert [e["route"] for e in entries] == ["/items/0", "/items/1", "/items/2"]
+    assert sink.stats()["written"] == 3
+
+    assert not sink.emit({"route": "/closed"})
+    assert sink.dropped == 1
+
+
+def test_log_sink_rotates_by_size(tmp_path):
+    sink = JsonLinesLogSink(log_dir=str(tmp_path), prefix="access", max_bytes=64)
+    for i in range(4):
+        sink.emit({"route": f"/items/{i}", "padding": "x" * 20})
+    sink.close()
+
+    files = sorted(os.listdir(tmp_path))
+    assert len(files) == 4
+    assert any(f.endswith(".1.jsonl") for f in files)
+    assert sink.rotations == 3
+    total = sum(len(_read_lines(tmp_path / f)) for f in files)
+    assert total == 4
+
+
+def test_log_sink_drops_instead_of_blocking(tmp_path, monkeypatch):
+    sink = JsonLinesLogSink(log_dir=str(tmp_path), prefix="access", queue_size=1)
+    release = threading.Event()
+    original_write_batch = sink._write_batch
+
+    def blocked_write_batch(batch):
+        release.wait(5)
+        original_write_batch(batch)
+
+    monkeypatch.setattr(sink, "_write_batch", blocked_write_batch)
+
+    assert sink.emit({"n": 0})
+    # Wait for the writer thread to pick up the first entry and block on it.
+    deadline = time.monotonic() + 5
+    while sink.stats()["queued"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    before = time.perf_counter()
+    results = [sink.emit({"n": i}) for i in range(1, 6)]
+    assert time.perf_counter() - before < 0.5
+    assert results == [True, False, False, False, False]
+    assert sink.dropped == 4
+
+    release.set()
+    sink.close()
+    assert sink.written == 2
+
+
+def test_sinks_are_configured_from_the_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv("LOG_DIR", str(tmp_path))
+    monkeypatch.setenv("LOG_MAX_BYTES", "64")
+    monkeypatch.setenv("LOG_ROTATE_WHEN", "hourly")
+    sink = sink_from_env("traces")
+    assert (sink.log_dir, sink.prefix) == (str(tmp_path), "traces")
+    assert (sink.max_bytes, sink.rotate_when) == (64, "hourly")
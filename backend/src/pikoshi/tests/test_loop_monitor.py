@@ -0,0 +1,30 @@
+import asyncio
+import logging
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+
+from ..utils.loop_monitor import LoopMonitor
+
+
+def blocking_call():
+    time.sleep(0.3)
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_loop_monitor_records_lag_and_catches_blocking_calls(caplog):
+    lag_samples = REGISTRY.get_sample_value("event_loop_lag_seconds_count") or 0
+    monitor = LoopMonitor(interval=0.02, detect_blocking=True, threshold=0.1)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.1)
+        with caplog.at_level(logging.WARNING):
+            blocking_call()
+            await asyncio.sleep(0.1)
+    finally:
+        await monitor.stop()
+
+    assert monitor.blocks == 1
+    assert "blocking_call" in caplog.text
+    assert REGISTRY.get_sample_value("event_loop_lag_seconds_count") > lag_samples
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from ..backends.mail import MemoryMailBackend
+from ..config.redis_config import redis_instance as redis
+from ..services import email_service as EmailService
+from ..services import mail_outbox_service as MailOutboxService
+from ..services.mail_outbox_service import (DEAD_LETTER_KEY, OUTBOX_KEY,
+                                            PROCESSING_KEY, RETRY_KEY,
+                                            MailOutboxWorker)
+from ..utils.accounting import track_resources
+
+
+class FailingMailBackend(MemoryMailBackend):
+    def send_batch(self, messages):
+        raise ConnectionError("mail provider unavailable")
+
+
+@pytest.fixture
+async def empty_outbox():
+    await redis.delete(OUTBOX_KEY, PROCESSING_KEY, RETRY_KEY, DEAD_LETTER_KEY)
+    yield
+    await redis.delete(OUTBOX_KEY, PROCESSING_KEY, RETRY_KEY, DEAD_LETTER_KEY)
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_queued_emails_are_sent_in_batches(empty_outbox):
+    for i in range(5):
+        await EmailService.send_signup_email(f"user{i}@pikoshi.test", "<p>hi</p>")
+    assert await redis.llen(OUTBOX_KEY) == 5
+
+    backend = MemoryMailBackend()
+    worker = MailOutboxWorker(backend, batch_size=3, rate_limit_per_second=0)
+    assert await worker.run_once() == 3
+    assert await worker.run_once() == 2
+    # An idle poll checks the retries and the outbox' length, nothing else
+    with track_resources() as stats:
+        assert await worker.run_once() == 0
+    assert stats.redis_commands == 2
+
+    # Sent oldest first, and nothing left behind in processing
+    assert [m["to"] for m in backend.outbox] == [
+        f"user{i}@pikoshi.test" for i in range(5)
+    ]
+    assert await redis.llen(PROCESSING_KEY) == 0
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_failed_emails_back_off_then_dead_letter(empty_outbox, monkeypatch):
+    monkeypatch.setattr(MailOutboxService, "MAIL_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(MailOutboxService, "MAIL_RETRY_BASE_SECONDS", 0)
+    await EmailService.send_change_password_email("a@pikoshi.test", "<p>reset</p>")
+
+    worker = MailOutboxWorker(FailingMailBackend(), rate_limit_per_second=0)
+    for _ in range(3):
+        assert await worker.run_once() == 1
+    assert await worker.run_once() == 0
+
+    dead = [json.loads(raw) for raw in await redis.lrange(DEAD_LETTER_KEY, 0, -1)]
+    assert [(m["params"]["to"], m["attempts"]) for m in dead] == [("a@pikoshi.test", 3)]
+    assert await redis.zcard(RETRY_KEY) == 0
+
+
+def test_retry_delay_grows_exponentially(monkeypatch):
+    monkeypatch.setattr(MailOutboxService, "MAIL_RETRY_BASE_SECONDS", 5)
+    monkeypatch.setattr(MailOutboxService, "MAIL_RETRY_MAX_SECONDS", 60)
+    delays = [MailOutboxService.retry_delay(attempts) for attempts in range(1, 6)]
+    assert delays == [5, 10, 20, 40, 60]
@@ -0,0 +1,130 @@
+import pytest
+from fastapi import APIRouter, Depends, FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from ..backends.cache import MemoryRedis
+from ..database import (SQLALCHEMY_DATABASE_URL, DatabaseSessionManager,
+                        engine_settings)
+from ..middlewares.logger import TimedRoute
+from ..routers import metrics
+from ..utils.metrics import (REDIS_COMMAND_DURATION, REDIS_COMMAND_ERRORS,
+                             InstrumentedClient)
+
+# NOTE: A bare app, so these tests don't depend on the DB session override.
+router = APIRouter(prefix="/metrics-test", route_class=TimedRoute)
+
+
+@router.get("/items/{item_id}")
+async def read_item(item_id: int):
+    return {"item_id": item_id}
+
+
+def deny():
+    raise HTTPException(status_code=401, detail="No access_token submitted.")
+
+
+@router.get("/denied/", dependencies=[Depends(deny)])
+async def denied():
+    return {}
+
+
+@router.get("/stream/")
+async def stream_items():
+    async def chunks():
+        for _ in range(4):
+            yield b"x" * 256
+
+    return StreamingResponse(chunks())
+
+
+metrics_app = FastAPI()
+metrics_app.include_router(router)
+metrics_app.include_router(metrics.router)
+
+
+def _value(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_instrumented_client_times_commands():
+    redis = InstrumentedClient(
+        MemoryRedis(), REDIS_COMMAND_DURATION, REDIS_COMMAND_ERRORS, remote="redis"
+    )
+    sets = _value("redis_command_duration_seconds_count", command="set")
+    errors = _value("redis_command_errors_total", command="incr")
+
+    assert await redis.set("key", "value", ex=60)
+    assert await redis.get("key") == "value"
+    with pytest.raises(ValueError):
+        await redis.incr("key")
+
+    assert _value("redis_command_duration_seconds_count", command="set") == sets + 1
+    assert _value("redis_command_errors_total", command="incr") == errors + 1
+
+
+def test_metrics_endpoint_records_route_metrics():
+    client = TestClient(metrics_app)
+    item_route = dict(method="GET", route="/metrics-test/items/{item_id}")
+    requests = _value(
+        "http_request_duration_seconds_count", **item_route, status_code="200"
+    )
+    streamed = _value(
+        "http_response_size_bytes_sum", method="GET", route="/metrics-test/stream/"
+    )
+
+    assert client.get("/metrics-test/items/1").status_code == 200
+    assert client.get("/metrics-test/items/2").status_code == 200
+    assert len(client.get("/metrics-test/stream/").content) == 1024
+
+    assert (
+        _value("http_request_duration_seconds_count", **item_route, status_code="200")
+        == requests + 2
+    )
+    assert _value("http_requests_in_flight", **item_route) == 0
+    assert (
+        _value(
+            "http_response_size_bytes_sum", method="GET", route="/metrics-test/stream/"
+        )
+        == streamed + 1024
+    )
+
+    # Raised by a dependency or by validation, before the route runs
+    for path, route, status_code in (
+        ("/metrics-test/denied/", "/metrics-test/denied/", "401"),
+        ("/metrics-test/items/x", "/metrics-test/items/{item_id}", "422"),
+    ):
+        labels = dict(method="GET", route=route, status_code=status_code)
+        failed = _value("http_request_duration_seconds_count", **labels)
+        assert client.get(path).status_code == int(status_code)
+        assert _value("http_request_duration_seconds_count", **labels) == failed + 1
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'route="/metrics-test/items/{item_id}"' in response.text
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_db_pool_metrics_track_overflow_and_checkout_waits():
+    manager = DatabaseSessionManager(
+        SQLALCHEMY_DATABASE_URL,
+        engine_settings(pool_size=1, max_overflow=1, pool_timeout=0.1),
+    )
+    primary = dict(pool="primary")
+    waits = _value("db_pool_checkout_wait_seconds_count", **primary)
+    timeouts = _value("db_pool_checkout_timeouts_total", **primary)
+    try:
+        async with manager.connect(), manager.connect():
+            assert _value("db_pool_overflow_connections", **primary) == 1
+            with pytest.raises(PoolTimeoutError):
+                async with manager.connect():
+                    pass
+        assert _value("db_pool_overflow_connections", **primary) == 0
+        assert _value("db_pool_checkout_wait_seconds_count", **primary) == waits + 3
+        assert _value("db_pool_checkout_timeouts_total", **primary) == timeouts + 1
+    finally:
+        await manager.close()
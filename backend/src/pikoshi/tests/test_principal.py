@@ -0,0 +1,67 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config.redis_config import redis_instance as redis
+from ..services import auth_service as AuthService
+from ..services import jwt_service as JWTAuthService
+from ..services import principal_service as PrincipalService
+from ..services import s3_service as S3Service
+from ..services import user_service as UserService
+from .helpers import max_queries
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_principal_is_cached_and_invalidated(db_session: AsyncSession):
+    profile = UserService.generate_user_profile(
+        "principal", "hashed", f"{uuid4()}@pikoshi.test", str(uuid4()), str(uuid4())
+    )
+    user = await UserService.create_user(db_session, profile)
+    assert user is not None
+    user_uuid = str(user.uuid)
+
+    with max_queries(1):
+        principal = await PrincipalService.get_principal(db_session, user_uuid)
+    assert principal is not None
+    assert principal.is_active is True
+    assert principal.bucket_name == S3Service.get_bucket_name(user_uuid)
+
+    # Served from the in-process cache, then from Redis
+    with max_queries(0):
+        assert await PrincipalService.get_principal(db_session, user_uuid) == principal
+        PrincipalService.local_cache.clear()
+        assert await PrincipalService.get_principal(db_session, user_uuid) == principal
+
+    # A load racing the invalidation re-caches the active principal
+    stale = await redis.get(f"principal:{user_uuid}")
+    await UserService.set_user_as_inactive(db_session, user)
+    await redis.set(f"principal:{user_uuid}", stale)
+    with max_queries(1):
+        principal = await PrincipalService.get_principal(db_session, user_uuid)
+    assert principal is not None
+    assert principal.is_active is False
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_current_principal_dependency(db_session: AsyncSession):
+    profile = UserService.generate_user_profile(
+        "current", "hashed", f"{uuid4()}@pikoshi.test", str(uuid4()), str(uuid4())
+    )
+    user = await UserService.create_user(db_session, profile)
+    assert user is not None
+    access_token = JWTAuthService.create_access_token(str(user.uuid))
+
+    principal = await AuthService.get_current_principal(access_token, db_session)
+    assert principal.uuid == str(user.uuid)
+
+    for token in (None, "not-a-jwt"):
+        with pytest.raises(HTTPException) as exc_info:
+            await AuthService.get_current_principal(token, db_session)
+        assert exc_info.value.status_code == 401
+
+    await UserService.set_user_as_inactive(db_session, user)
+    with pytest.raises(HTTPException) as exc_info:
+        await AuthService.get_current_principal(access_token, db_session)
+    assert exc_info.value.status_code == 401
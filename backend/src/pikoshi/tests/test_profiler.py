@@ -0,0 +1,84 @@
+import os
+import time
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from ..middlewares.logger import TimedRoute
+from ..routers import profiler as profiler_router
+from ..utils import profiler
+
+TOKEN = "test-profiler-token"
+
+router = APIRouter(prefix="/profiler-test", route_class=TimedRoute)
+
+
+def busy_work():
+    deadline = time.perf_counter() + 0.1
+    while time.perf_counter() < deadline:
+        sum(i * i for i in range(1000))
+
+
+@router.get("/busy/")
+async def busy():
+    busy_work()
+    return {"ok": True}
+
+
+profiler_app = FastAPI()
+profiler_app.include_router(router)
+profiler_app.include_router(profiler_router.router)
+
+
+@pytest.fixture(autouse=True)
+def profiler_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiler, "PROFILER_TOKEN", TOKEN)
+    monkeypatch.setattr(profiler, "PROFILE_DIR", str(tmp_path))
+
+
+def _read_profile(path, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with open(path) as f:
+        return f.read().splitlines()
+
+
+def test_request_with_token_is_profiled():
+    client = TestClient(profiler_app)
+    response = client.get("/profiler-test/busy/", headers={"X-Profile-Token": TOKEN})
+
+    lines = _read_profile(response.headers["X-Profile-Path"])
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert any("busy_work" in line for line in lines)
+
+
+def test_request_without_valid_token_is_not_profiled():
+    client = TestClient(profiler_app)
+    response = client.get("/profiler-test/busy/")
+    assert "X-Profile-Path" not in response.headers
+    response = client.get("/profiler-test/busy/", headers={"X-Profile-Token": "nope"})
+    assert "X-Profile-Path" not in response.headers
+
+
+def test_admin_profiling_window():
+    client = TestClient(profiler_app)
+    assert client.post("/admin/profiler/start/").status_code == 403
+
+    headers = {"X-Profile-Token": TOKEN}
+    response = client.post("/admin/profiler/start/?seconds=10", headers=headers)
+    assert response.status_code == 202
+    path = response.json()["profile"]
+    assert client.post("/admin/profiler/start/", headers=headers).status_code == 409
+
+    client.get("/profiler-test/busy/")
+    response = client.post("/admin/profiler/stop/", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["profile"] == path
+
+    lines = _read_profile(path)
+    assert any(line.startswith("MainThread;") for line in lines)
+    assert client.post("/admin/profiler/stop/", headers=headers).status_code == 404
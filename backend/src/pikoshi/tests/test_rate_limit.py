@@ -0,0 +1,88 @@
+import os
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from redis import asyncio as aioredis
+
+from ..backends.cache import MemoryRedis
+from ..backends.redis_scripts import TOKEN_BUCKET_LUA, TOKEN_BUCKET_SHA
+from ..config.redis_config import redis_instance as redis
+from ..services import rate_limit_service as RateLimitService
+from ..services.rate_limit_service import RateLimitPolicy
+from ..utils.accounting import track_resources
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_full_buckets_lease_tokens_to_skip_redis():
+    policy = RateLimitPolicy("test-lease", "100/60")
+    await redis.delete("rate_limit:test-lease:ip:lease")
+
+    with track_resources() as stats:
+        for _ in range(policy.lease + 1):
+            await RateLimitService.check(policy, "ip:lease")
+    # One script call took a token plus a lease of `policy.lease` more
+    assert stats.redis_commands == 1
+
+    with track_resources() as stats:
+        await RateLimitService.check(policy, "ip:lease")
+    assert stats.redis_commands == 1
+
+
+def test_empty_buckets_answer_429_with_retry_after(monkeypatch):
+    monkeypatch.setitem(
+        RateLimitService.policies, "test-429", RateLimitPolicy("test-429", "3/60")
+    )
+    limited_app = FastAPI()
+
+    @limited_app.post(
+        "/limited/", dependencies=[Depends(RateLimitService.limit_by_ip("test-429"))]
+    )
+    async def limited():
+        return {"ok": True}
+
+    client = TestClient(limited_app)
+    responses = [client.post("/limited/") for _ in range(4)]
+    assert [r.status_code for r in responses] == [200, 200, 200, 429]
+    # One token refills every 20 seconds
+    assert 1 <= int(responses[-1].headers["retry-after"]) <= 20
+
+
+@pytest.fixture
+async def real_redis():
+    client = aioredis.StrictRedis(
+        host=os.environ.get("REDIS_HOST") or "localhost",
+        port=int(os.environ.get("REDIS_PORT") or 6379),
+        password=os.environ.get("REDIS_PASS"),
+        decode_responses=True,
+        socket_connect_timeout=0.5,
+    )
+    try:
+        await client.ping()
+    except Exception:
+        await client.aclose()
+        pytest.skip("No Redis server available")
+    yield client
+    await client.aclose()
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_token_bucket_lua_matches_its_memory_fallback(real_redis):
+    key = "rate_limit:test-lua:ip:lua"
+    results = {}
+    for name, client in (("redis", real_redis), ("memory", MemoryRedis())):
+        await client.delete(key)
+        results[name] = [
+            # 10/60 leases 1 extra token while the bucket is at least half full
+            await client.eval(TOKEN_BUCKET_LUA, 1, key, 10, 10 / 60, 1)
+            for _ in range(8)
+        ]
+        assert set(await client.hgetall(key)) == {"tokens", "ts"}
+        assert 0 < await client.ttl(key) <= 61
+    # Once cached by EVAL, the script runs by its SHA1 alone
+    assert await real_redis.evalsha(TOKEN_BUCKET_SHA, 1, key, 10, 10 / 60, 1)
+
+    grants = {name: [int(r[0]) for r in result] for name, result in results.items()}
+    assert grants["redis"] == grants["memory"] == [2, 2, 2, 1, 1, 1, 1, 0]
+    retry_after = [int(results[name][-1][1]) for name in results]
+    assert all(0 < ms <= 6000 for ms in retry_after)
@@ -0,0 +1,137 @@
+import time
+
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI
+from prometheus_client import REGISTRY
+from sqlalchemy import text, update
+
+from ..database import (LAST_WRITE_COOKIE, SQLALCHEMY_DATABASE_URL,
+                        DatabaseSessionManager, _host, _request_routing,
+                        engine_settings, is_replica)
+from ..dependencies import ReadYourWritesMiddleware
+from ..middlewares.logger import TimedRoute
+from ..models.user import User as UserModel
+
+# NOTE: Unreachable, nothing listens on port 1
+DOWN_REPLICA_URL = SQLALCHEMY_DATABASE_URL.rsplit("@", 1)[0] + "@127.0.0.1:1/none"
+
+
+@pytest.fixture
+async def manager():
+    # The primary doubles as a (never lagging) replica here
+    manager = DatabaseSessionManager(
+        SQLALCHEMY_DATABASE_URL,
+        engine_settings(pool_size=1, max_overflow=2),
+        replica_hosts=[SQLALCHEMY_DATABASE_URL, DOWN_REPLICA_URL],
+        replica_check_seconds=60,
+    )
+    token = _request_routing.set(None)
+    yield manager
+    _request_routing.reset(token)
+    await manager.close()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_reads_fail_over_from_down_replicas(manager):
+    seen = []
+    for _ in range(4):
+        async with manager.read_session() as session:
+            await session.execute(text("SELECT 1"))
+            seen.append(is_replica(session))
+    # The down replica falls back to the primary once, then sits out
+    assert seen.count(False) == 1 and seen.count(True) == 3
+
+    await manager.check_replicas()
+    assert [
+        manager._replica_down_until.get(replica, 0) == 0
+        for replica in manager._replicas
+    ] == [True, False]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_replica_pools_have_their_own_metrics(manager):
+    def checkouts(pool):
+        labels = {"pool": pool}
+        return REGISTRY.get_sample_value("db_pool_checkout_wait_seconds_count", labels)
+
+    down = checkouts("replica:127.0.0.1:1") or 0
+    async with manager.read_session() as session:
+        await session.execute(text("SELECT 1"))
+    async with manager.read_session() as session:
+        await session.execute(text("SELECT 1"))
+    assert checkouts("replica:127.0.0.1:1") == down + 1
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_reads_stay_on_the_primary_after_a_write(manager):
+    await manager.check_replicas()
+    async with manager.read_session() as session:
+        assert is_replica(session)
+
+    async with manager.session() as session:
+        await session.execute(update(UserModel).where(UserModel.id == -1))
+        await session.commit()
+
+    async with manager.read_session() as session:
+        assert not is_replica(session)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_unused_read_sessions_dont_check_out_connections(manager):
+    def checkouts():
+        return sum(
+            REGISTRY.get_sample_value("db_pool_checkout_wait_seconds_count", labels)
+            or 0
+            for labels in (
+                {"pool": "primary"},
+                {"pool": f"replica:{_host(SQLALCHEMY_DATABASE_URL)}"},
+                {"pool": "replica:127.0.0.1:1"},
+            )
+        )
+
+    before = checkouts()
+    for _ in range(4):
+        async with manager.read_session():
+            pass
+    assert checkouts() == before
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_reads_stay_on_the_primary_in_requests_after_a_write(manager):
+    await manager.check_replicas()
+    router = APIRouter(route_class=TimedRoute)
+
+    @router.post("/replicas-test/write/")
+    async def write():
+        async with manager.session() as session:
+            await session.execute(update(UserModel).where(UserModel.id == -1))
+            await session.commit()
+        return {}
+
+    @router.get("/replicas-test/read/")
+    async def read():
+        async with manager.read_session() as session:
+            await session.execute(text("SELECT 1"))
+            return {"replica": is_replica(session)}
+
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware)
+    app.include_router(router)
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="https://test"
+    ) as client:
+        response = await client.get("/replicas-test/read/")
+        assert response.json() == {"replica": True}
+        assert LAST_WRITE_COOKIE not in response.cookies
+
+        response = await client.post("/replicas-test/write/")
+        assert LAST_WRITE_COOKIE in response.cookies
+        response = await client.get("/replicas-test/read/")
+        assert response.json() == {"replica": False}
+
+        # Once replicas caught up with the write
+        last_write = time.time() - manager.max_replica_lag
+        client.cookies = {LAST_WRITE_COOKIE: str(last_write)}
+        response = await client.get("/replicas-test/read/")
+        assert response.json() == {"replica": True}
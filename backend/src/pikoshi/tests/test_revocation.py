@@ -0,0 +1,103 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import jwt
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config.redis_config import redis_instance as redis
+from ..services import jwt_service as JWTAuthService
+from ..services import principal_service as PrincipalService
+from ..services import revocation_service as RevocationService
+from ..services import user_service as UserService
+from ..utils.accounting import track_resources
+from ..utils.bloom_filter import BloomFilter
+from .helpers import create_user
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    values = [f"jti-{i}" for i in range(1000)]
+    for value in values:
+        bloom.add(value)
+    assert all(value in bloom for value in values)
+    false_positives = sum(f"other-{i}" in bloom for i in range(10_000))
+    assert false_positives < 300
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_revoked_tokens_are_checked_in_process_first():
+    tokens = JWTAuthService.get_user_tokens("revoked-user")
+    access = JWTAuthService.verify_token(tokens["access_token"])
+    refresh = JWTAuthService.verify_token(tokens["refresh_token"])
+    assert access is not None and refresh is not None
+
+    # Never revoked, answered by the Bloom filter alone
+    with track_resources() as stats:
+        assert not await RevocationService.is_revoked(access)
+    assert stats.redis_commands == 0
+
+    await RevocationService.revoke(access)
+    assert await RevocationService.is_revoked(access)
+    assert not await RevocationService.is_revoked(refresh)
+    assert 0 < await redis.ttl(f"revoked_jti:{access['jti']}") <= 3601
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_revocations_sync_between_workers():
+    claims = JWTAuthService.verify_token(
+        JWTAuthService.create_access_token("synced-user")
+    )
+    assert claims is not None
+    sync = RevocationService.RevocationSync()
+    sync.start()
+    try:
+        await asyncio.sleep(0.05)
+        RevocationService.revoked_jtis.clear()
+        # i.e. published by another worker
+        await redis.set(f"revoked_jti:{claims['jti']}", "1", ex=60)
+        await redis.publish(RevocationService.REVOCATION_CHANNEL, claims["jti"])
+        await asyncio.sleep(0.05)
+        assert claims["jti"] in RevocationService.revoked_jtis
+        assert await RevocationService.is_revoked(claims)
+
+        RevocationService.revoked_jtis.clear()
+        await sync.rebuild()
+        assert claims["jti"] in RevocationService.revoked_jtis
+    finally:
+        await sync.stop()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_logout_with_an_expired_access_token(app, db_session: AsyncSession):
+    user = await create_user(db_session, "logout")
+    user_uuid = str(user.uuid)
+    refresh_token = JWTAuthService.get_user_tokens(user_uuid)["refresh_token"]
+    refresh = JWTAuthService.verify_token(refresh_token)
+    assert refresh is not None
+    expired_access_token = jwt.encode(
+        {"exp": datetime.now(timezone.utc) - timedelta(minutes=1), "sub": user_uuid},
+        JWTAuthService.SECRET_KEY,
+        algorithm=JWTAuthService.ALGORITHM,
+    )
+    cookies = {"access_token": expired_access_token, "refresh_token": refresh_token}
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.post("/auth/auth-logout/", cookies=cookies)
+        assert response.status_code == 200
+        cleared = response.headers.get_list("set-cookie")
+        assert any(cookie.startswith("access_token=") for cookie in cleared)
+        assert any(cookie.startswith("refresh_token=") for cookie in cleared)
+        assert await redis.exists(f"revoked_jti:{refresh['jti']}")
+        principal = await PrincipalService.get_principal(db_session, user_uuid)
+        assert principal is not None and not principal.is_active
+
+        # Logging out again (i.e. from another tab) after logging back in
+        await UserService.set_user_as_active(db_session, user)
+        response = await client.post("/auth/auth-logout/", cookies=cookies)
+        assert response.status_code == 200
+        principal = await PrincipalService.get_principal(db_session, user_uuid)
+        assert principal is not None and principal.is_active
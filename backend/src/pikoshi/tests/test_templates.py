@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+from ..utils.templates import (CompiledTemplate, TemplateRegistry,
+                               email_templates)
+
+
+def test_email_templates_are_preloaded_and_escaped():
+    assert {
+        "signup_email.html",
+        "change_password.html",
+    } <= email_templates._templates.keys()
+    html_content = email_templates.render(
+        "signup_email.html", activation_link='https://pikoshi.test/?a=1&b="2"'
+    )
+    assert 'href="https://pikoshi.test/?a=1&amp;b=&quot;2&quot;"' in html_content
+
+
+def test_templates_require_exactly_their_variables():
+    template = CompiledTemplate("t.html", "<p>{{literal}} {name}</p>")
+    assert template.render(name="<b>") == "<p>{literal} &lt;b&gt;</p>"
+    with pytest.raises(KeyError):
+        template.render()
+    with pytest.raises(KeyError):
+        template.render(name="a", nmae="b")
+    with pytest.raises(ValueError):
+        CompiledTemplate("t.html", "{user.__class__}")
+
+
+def test_templates_reload_when_edited(tmp_path):
+    path = tmp_path / "t.html"
+    path.write_text("<p>{name}</p>")
+    registry = TemplateRegistry(tmp_path, reload=True, reload_seconds=0)
+    assert registry.render("t.html", name="a") == "<p>a</p>"
+
+    path.write_text("<h1>{name}</h1>")
+    os.utime(path, (0, 0))
+    assert registry.render("t.html", name="a") == "<h1>a</h1>"
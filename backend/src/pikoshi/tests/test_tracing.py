@@ -0,0 +1,118 @@
+import json
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from ..middlewares.logger import TimedRoute
+from ..utils import tracing
+from ..utils.log_sink import JsonLinesLogSink
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+router = APIRouter(prefix="/tracing-test", route_class=TimedRoute)
+
+
+@router.get("/work/")
+async def do_work():
+    with tracing.span("work.step"):
+        pass
+    return {"ok": True}
+
+
+@router.get("/stream/")
+async def stream_work():
+    async def chunks():
+        for _ in range(3):
+            with tracing.span("work.chunk"):
+                yield b"chunk"
+
+    return StreamingResponse(chunks())
+
+
+tracing_app = FastAPI()
+tracing_app.include_router(router)
+
+
+@pytest.fixture
+def exported_spans(tmp_path, monkeypatch):
+    sink = JsonLinesLogSink(log_dir=str(tmp_path), prefix="traces")
+    monkeypatch.setattr(tracing, "trace_sink", sink)
+
+    def read():
+        sink.close()
+        spans = []
+        for log_file in tmp_path.iterdir():
+            with open(log_file) as f:
+                spans.extend(json.loads(line) for line in f)
+        return {span["name"]: span for span in spans}
+
+    return read
+
+
+def test_sampled_request_exports_nested_spans(exported_spans):
+    client = TestClient(tracing_app)
+    response = client.get(
+        "/tracing-test/work/", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"}
+    )
+    assert response.headers["X-Trace-Id"] == TRACE_ID
+
+    spans = exported_spans()
+    root = spans["GET /tracing-test/work/"]
+    assert root["traceId"] == TRACE_ID
+    assert root["parentId"] == PARENT_ID
+    assert root["kind"] == "SERVER"
+    assert root["tags"]["http.status_code"] == "200"
+    assert spans["work.step"]["parentId"] == root["id"]
+
+
+def test_streamed_chunks_are_spans_of_the_request(exported_spans):
+    client = TestClient(tracing_app)
+    response = client.get(
+        "/tracing-test/stream/",
+        headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"},
+    )
+    assert response.content == b"chunk" * 3
+
+    spans = exported_spans()
+    root = spans["GET /tracing-test/stream/"]
+    assert root["tags"]["stream.chunks"] == "3"
+    assert spans["stream.chunk"]["parentId"] == root["id"]
+    assert spans["work.chunk"]["parentId"] != root["id"]
+
+
+def test_unsampled_request_exports_nothing(exported_spans, monkeypatch):
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 0.0)
+    client = TestClient(tracing_app)
+    response = client.get("/tracing-test/work/")
+    assert len(response.headers["X-Trace-Id"]) == 32
+    assert exported_spans() == {}
+
+
+def test_sql_statements_are_client_spans(exported_spans):
+    engine = create_engine("sqlite://")
+    tracing.instrument_engine(engine)
+    root = tracing.start_trace("job", f"00-{TRACE_ID}-{PARENT_ID}-01")
+    token = tracing.activate(root)
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            connection.exec_driver_sql("  ")
+    finally:
+        tracing.deactivate(token)
+    root.finish()
+
+    spans = exported_spans()
+    statement_span = spans["db.select"]
+    assert statement_span["kind"] == "CLIENT"
+    assert statement_span["parentId"] == root.span_id
+    assert statement_span["tags"]["db.statement"] == "SELECT 1"
+    assert "db.query" in spans
+
+    # Outside of a sampled trace, statements only push the no-op span
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        assert connection.info["trace_spans"] == []
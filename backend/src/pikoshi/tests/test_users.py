@@ -1,7 +1,95 @@
+import asyncio
+from types import SimpleNamespace
+from uuid import uuid4
+
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..services import jwt_service as JWTAuthService
+from ..services import security_service as SecurityService
+from ..services import user_service as UserService
+from .helpers import max_queries
+
 
 @pytest.mark.asyncio(loop_scope="function")
 async def test_my_crud_function(db_session: AsyncSession):
     pass
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_signup_and_login_round_trips(db_session: AsyncSession):
+    password = "Test_Password_1!"
+    salt = SecurityService.generate_salt()
+    email = f"{uuid4()}@pikoshi.test"
+    profile = UserService.generate_user_profile(
+        "login",
+        await SecurityService.hash_value(password, salt),
+        email,
+        salt,
+        str(uuid4()),
+    )
+
+    with max_queries(1):
+        user = await UserService.create_user(db_session, profile)
+    assert user is not None
+    assert user.is_active is True
+    assert user.last_login is not None
+
+    duplicate = profile.model_copy(update={"salt": SecurityService.generate_salt()})
+    with max_queries(1):
+        assert await UserService.create_user(db_session, duplicate) is None
+
+    await UserService.set_user_as_inactive(db_session, user)
+    with max_queries(2):
+        logged_in = await JWTAuthService.authenticate_user_with_jwt(
+            SimpleNamespace(email=email, password=password), db_session
+        )
+    assert logged_in.uuid == user.uuid
+    assert logged_in.is_active is True
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_password_hashes_are_versioned():
+    salt = SecurityService.generate_salt()
+    hashed = await SecurityService.hash_value("Test_Password_1!", salt)
+    assert hashed.startswith("scrypt$")
+    assert not SecurityService.needs_rehash(hashed)
+    assert await SecurityService.verify_value("Test_Password_1!", hashed, salt)
+    assert not await SecurityService.verify_value("Wrong_Password_1!", hashed, salt)
+
+    weaker = SecurityService.scrypt_hash("Test_Password_1!", salt, n=2**10)
+    assert SecurityService.needs_rehash(weaker)
+    assert await SecurityService.verify_value("Test_Password_1!", weaker, salt)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_legacy_hash_is_rehashed_on_login(db_session: AsyncSession):
+    password = "Test_Password_1!"
+    salt = SecurityService.generate_salt()
+    email = f"{uuid4()}@pikoshi.test"
+    legacy_hash = SecurityService.legacy_sha256_hash(password, salt)
+    profile = UserService.generate_user_profile(
+        "legacy", legacy_hash, email, salt, str(uuid4())
+    )
+    await UserService.create_user(db_session, profile)
+
+    user = await JWTAuthService.authenticate_user_with_jwt(
+        SimpleNamespace(email=email, password=password), db_session
+    )
+    assert user.password.startswith("scrypt$")
+    assert await SecurityService.verify_value(password, user.password, salt)
+
+
+def test_password_hashing_is_bounded_on_every_event_loop(monkeypatch):
+    monkeypatch.setattr(SecurityService, "PASSWORD_HASH_MAX_PENDING", 1)
+    monkeypatch.setattr(SecurityService, "_pending", None)
+
+    async def hash_concurrently():
+        salt = SecurityService.generate_salt()
+        return await asyncio.gather(
+            *(SecurityService.hash_value("Test_Password_1!", salt) for _ in range(3))
+        )
+
+    # i.e. the benchmarks' repeated asyncio.run()
+    for _ in range(2):
+        assert len(set(asyncio.run(hash_concurrently()))) == 1
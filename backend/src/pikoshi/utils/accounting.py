@@ -0,0 +1,171 @@
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Coroutine, Dict, Generator, Iterator
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+
+load_dotenv()
+# NOTE: Adds X-Debug-* resource headers to every TimedRoute response.
+# Handy in development and tests, keep disabled in production.
+REQUEST_STATS_HEADERS = (
+    os.environ.get("REQUEST_STATS_HEADERS") or "false"
+).lower() == "true"
+
+_current_stats: ContextVar["RequestStats | None"] = ContextVar(
+    "current_request_stats", default=None
+)
+
+
+class RequestStats:
+    """
+    Resources used while handling a single request.
+
+    - sql_statements: statements executed (executemany counts each row).
+    - db_round_trips: cursor executes plus BEGIN/COMMIT/ROLLBACK.
+    - s3_calls, s3_bytes_sent, s3_bytes_received: S3 operations and payloads.
+    - redis_commands: Redis commands sent.
+    - cpu_seconds: CPU time spent on this request's own coroutine steps
+      (other requests interleaving on the event loop are not counted).
+    """
+
+    __slots__ = (
+        "sql_statements",
+        "db_round_trips",
+        "s3_calls",
+        "s3_bytes_sent",
+        "s3_bytes_received",
+        "redis_commands",
+        "cpu_seconds",
+    )
+
+    def __init__(self):
+        self.sql_statements = 0
+        self.db_round_trips = 0
+        self.s3_calls = 0
+        self.s3_bytes_sent = 0
+        self.s3_bytes_received = 0
+        self.redis_commands = 0
+        self.cpu_seconds = 0.0
+
+    def as_dict(self) -> Dict[str, int | float]:
+        return {
+            "sql_statements": self.sql_statements,
+            "db_round_trips": self.db_round_trips,
+            "s3_calls": self.s3_calls,
+            "s3_bytes_sent": self.s3_bytes_sent,
+            "s3_bytes_received": self.s3_bytes_received,
+            "redis_commands": self.redis_commands,
+            "cpu_ms": round(self.cpu_seconds * 1000, 3),
+        }
+
+    def as_headers(self) -> Dict[str, str]:
+        return {
+            f"X-Debug-{key.replace('_', '-').title()}": str(value)
+            for key, value in self.as_dict().items()
+        }
+
+
+def activate(stats: RequestStats) -> Token:
+    return _current_stats.set(stats)
+
+
+def deactivate(token: Token) -> None:
+    _current_stats.reset(token)
+
+
+def current_stats() -> RequestStats | None:
+    return _current_stats.get()
+
+
+@contextmanager
+def track_resources() -> Iterator[RequestStats]:
+    """
+    - Collects the resources used by the enclosed block into a new
+      RequestStats (i.e. for service level tests).
+    """
+    stats = RequestStats()
+    token = activate(stats)
+    try:
+        yield stats
+    finally:
+        deactivate(token)
+
+
+class _CpuTimed:
+    """
+    - Awaitable driving a coroutine step by step, adding the thread CPU time
+      of each step to `stats`. Time spent suspended (and so on other tasks)
+      is excluded.
+    """
+
+    def __init__(self, coro: Coroutine, stats: RequestStats):
+        self._coro = coro
+        self._stats = stats
+
+    def __await__(self) -> Generator[Any, Any, Any]:
+        coro, stats = self._coro, self._stats
+        send_value: Any = None
+        error: BaseException | None = None
+        while True:
+            before = time.thread_time()
+            try:
+                if error is None:
+                    yielded = coro.send(send_value)
+                else:
+                    yielded = coro.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                stats.cpu_seconds += time.thread_time() - before
+            try:
+                send_value, error = (yield yielded), None
+            except BaseException as e:
+                send_value, error = None, e
+
+
+def cpu_timed(coro: Coroutine, stats: RequestStats) -> _CpuTimed:
+    return _CpuTimed(coro, stats)
+
+
+def account_s3_call(operation: str, params: Dict[str, Any], response: Any) -> None:
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    stats.s3_calls += 1
+    body = params.get("Body")
+    if isinstance(body, (bytes, bytearray)):
+        stats.s3_bytes_sent += len(body)
+    if isinstance(response, dict):
+        stats.s3_bytes_received += int(response.get("ContentLength") or 0)
+
+
+def account_redis_command(command: str, params: Dict[str, Any], response: Any) -> None:
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.redis_commands += 1
+
+
+def instrument_engine(engine: Any) -> None:
+    """
+    - Counts statements and round trips of a (sync) Engine against the
+      current request's RequestStats.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        stats = _current_stats.get()
+        if stats is None:
+            return
+        stats.sql_statements += len(parameters) if many and parameters else 1
+        stats.db_round_trips += 1
+
+    def count_round_trip(conn, *args):
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.db_round_trips += 1
+
+    for identifier in ("begin", "commit", "rollback"):
+        event.listen(engine, identifier, count_round_trip)
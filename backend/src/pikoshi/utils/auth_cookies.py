@@ -1,3 +1,5 @@
+import math
+import time
 from datetime import datetime, timedelta, timezone
 
 from fastapi.responses import JSONResponse, Response
@@ -18,6 +20,25 @@ def set_s3_continuation_token(response: Response, continuation_token: str) -> Re
     return response
 
 
+def set_last_write_cookie(response: Response, key: str, max_age: float) -> Response:
+    """
+    - Sets the time of the request's database write in an HTTP Only Secure
+      Cookie, expiring after `max_age` seconds.
+    - NOTE: Keeps the client's reads on the primary database until read
+      replicas caught up with its write (see DatabaseSessionManager).
+    """
+    response.set_cookie(
+        key=key,
+        value=f"{time.time():.3f}",
+        max_age=math.ceil(max_age),
+        httponly=True,
+        samesite="none",
+        secure=True,
+        path="/",
+    )
+    return response
+
+
 def set_auth_cookie(
     response: JSONResponse, key: str, value: str, expires: int
 ) -> JSONResponse:
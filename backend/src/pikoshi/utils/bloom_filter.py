@@ -0,0 +1,55 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    A fixed size, in-process Bloom filter of strings.
+
+    `value in bloom` is False for values never added, and True for added
+    values plus roughly `error_rate` of the rest (false positives), as long
+    as at most `capacity` values were added. Values can't be removed, start
+    over with `clear()` (i.e. rebuild from the source of truth) instead.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray(math.ceil(self.size / 8))
+
+    def _positions(self, value: str) -> list[int]:
+        # NOTE: Double hashing (Kirsch-Mitzenmacher), k positions out of a
+        # single 128 bit digest.
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, value: str) -> None:
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+    def load(self, other: "BloomFilter") -> None:
+        """
+        - Replaces this filter's contents with those of an equally sized
+          filter, i.e. one rebuilt from scratch.
+        """
+        if other.size != self.size or other.hashes != self.hashes:
+            raise ValueError("Bloom filters must have the same size and hashes")
+        self._bits, self.count = other._bits, other.count
+
+    def clear(self) -> None:
+        self._bits = bytearray(len(self._bits))
+        self.count = 0
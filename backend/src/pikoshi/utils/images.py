@@ -0,0 +1,58 @@
+import io
+from typing import Any, Tuple
+
+from PIL import Image
+
+from .metrics import timed_stage
+
+# NOTE: Defaults used for the mobile/thumbnail versions of uploaded images,
+# see benchmarks/image_pipeline.py before changing these.
+RESIZED_IMAGE_FORMAT = "WEBP"
+RESIZED_IMAGE_QUALITY = 85
+RESIZED_IMAGE_OPTIONS: dict[str, Any] = {"optimize": True}
+
+
+@timed_stage("decode")
+def decode_image(image_bytes: io.BytesIO) -> Image.Image:
+    """
+    - Opens and fully decodes an image held in RAM.
+    - NOTE: Image.open() is lazy, `load()` forces the actual decode.
+    """
+    image_bytes.seek(0)
+    with Image.open(image_bytes) as img:
+        img.load()
+        return img.copy()
+
+
+@timed_stage("resize")
+def shrink_image(img: Image.Image, size: Tuple[int, int]) -> Image.Image:
+    """
+    - Shrinks the image in place to fit within `size`, preserving aspect ratio.
+    """
+    img.thumbnail(size)
+    return img
+
+
+@timed_stage("encode")
+def encode_image(
+    img: Image.Image,
+    format: str = RESIZED_IMAGE_FORMAT,
+    quality: int = RESIZED_IMAGE_QUALITY,
+    **options: Any,
+) -> io.BytesIO:
+    """
+    - Encodes the image in `format` into a new in RAM buffer, rewound to 0.
+    """
+    img_bytes = io.BytesIO()
+    img.save(img_bytes, format=format, quality=quality, **options)
+    img_bytes.seek(0)
+    return img_bytes
+
+
+def resize_image(image_bytes: io.BytesIO, size: Tuple[int, int]) -> io.BytesIO:
+    """
+    - Decodes, shrinks and re-encodes an image using the default
+      resized image format, quality and options.
+    """
+    img = shrink_image(decode_image(image_bytes), size)
+    return encode_image(img, **RESIZED_IMAGE_OPTIONS)
@@ -0,0 +1,188 @@
+import json
+import os
+import queue
+import threading
+from datetime import datetime
+from typing import Any, Dict, List
+
+from dotenv import load_dotenv
+
+from .logger import logger
+
+ROTATE_FORMATS = {"daily": "%Y-%m-%d", "hourly": "%Y-%m-%d_%H"}
+
+
+class JsonLinesLogSink:
+    """
+    An append-only JSON lines log sink.
+
+    Entries are handed over through a bounded in-memory queue and written by a
+    single background thread, so callers (i.e. TimedRoute, on the event loop)
+    never touch the disk. When the queue is full, entries are dropped and
+    counted rather than blocking the caller.
+
+    Files are named `<prefix>_<period>.jsonl`, where the period rolls over
+    daily or hourly (time based rotation). A file that would grow beyond
+    `max_bytes` is renamed to `<prefix>_<period>.<n>.jsonl` and a fresh one
+    started (size based rotation).
+    """
+
+    def __init__(
+        self,
+        log_dir: str = "logs",
+        prefix: str = "logs",
+        max_bytes: int = 100 * 1024 * 1024,
+        rotate_when: str = "daily",
+        queue_size: int = 10_000,
+        flush_interval: float = 1.0,
+    ):
+        if rotate_when not in ROTATE_FORMATS:
+            raise ValueError(f"rotate_when must be one of {list(ROTATE_FORMATS)}")
+        self.log_dir = log_dir
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.rotate_when = rotate_when
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+        self._queue: queue.Queue[Dict[str, Any] | None] = queue.Queue(queue_size)
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+        self._file = None
+        self._period: str | None = None
+        self._reported_drops = 0
+
+    def emit(self, entry: Dict[str, Any]) -> bool:
+        """
+        - Queues an entry for writing without blocking.
+        - Returns False (and counts the drop) if the queue is full or the
+          sink has been closed.
+        """
+        if self._closed:
+            self.dropped += 1
+            return False
+        if self._thread is None:
+            self.start()
+        try:
+            self._queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def start(self) -> None:
+        """
+        - Starts the writer thread (also re-opens a closed sink).
+        """
+        with self._start_lock:
+            self._closed = False
+            if self._thread is not None:
+                return
+            os.makedirs(self.log_dir, exist_ok=True)
+            self._thread = threading.Thread(
+                target=self._run, name=f"{self.prefix}-log-sink", daemon=True
+            )
+            self._thread.start()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        - Stops accepting entries, then waits for the queue to be written out.
+        """
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "rotations": self.rotations,
+        }
+
+    def _run(self) -> None:
+        running = True
+        while running:
+            try:
+                entry = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._report_drops()
+                continue
+            batch: List[Dict[str, Any]] = []
+            while entry is not None:
+                batch.append(entry)
+                try:
+                    entry = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if entry is None:
+                running = False
+            if batch:
+                try:
+                    self._write_batch(batch)
+                except Exception as e:
+                    logger.error(f"Unable to write {len(batch)} log entries: {e}")
+            self._report_drops()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _path(self, period: str, index: int | None = None) -> str:
+        suffix = "" if index is None else f".{index}"
+        return os.path.join(self.log_dir, f"{self.prefix}_{period}{suffix}.jsonl")
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        for entry in batch:
+            line = json.dumps(entry, default=str) + "\n"
+            self._rotate_if_needed(len(line.encode("utf-8")))
+            self._file.write(line)  # type: ignore
+            self.written += 1
+        self._file.flush()  # type: ignore
+
+    def _rotate_if_needed(self, line_size: int) -> None:
+        period = datetime.now().strftime(ROTATE_FORMATS[self.rotate_when])
+        if period != self._period:
+            if self._file is not None:
+                self._file.close()
+                self.rotations += 1
+            self._period = period
+            self._file = open(self._path(period), "a", encoding="utf-8")
+        elif (
+            self._file.tell() > 0  # type: ignore
+            and self._file.tell() + line_size > self.max_bytes  # type: ignore
+        ):
+            self._file.close()  # type: ignore
+            index = 1
+            while os.path.exists(self._path(period, index)):
+                index += 1
+            os.rename(self._path(period), self._path(period, index))
+            self._file = open(self._path(period), "a", encoding="utf-8")
+            self.rotations += 1
+
+    def _report_drops(self) -> None:
+        if self.dropped > self._reported_drops:
+            logger.warning(
+                f"{self.prefix} log sink dropped "
+                f"{self.dropped - self._reported_drops} entries (queue full)"
+            )
+            self._reported_drops = self.dropped
+
+
+def sink_from_env(prefix: str) -> JsonLinesLogSink:
+    """
+    - A sink writing `<prefix>_<period>.jsonl` files, configured through the
+      LOG_DIR, LOG_MAX_BYTES, LOG_ROTATE_WHEN and LOG_QUEUE_SIZE environment
+      variables (shared by the access log and trace sinks).
+    """
+    load_dotenv()
+    return JsonLinesLogSink(
+        log_dir=os.environ.get("LOG_DIR") or "logs",
+        prefix=prefix,
+        max_bytes=int(os.environ.get("LOG_MAX_BYTES") or 100 * 1024 * 1024),
+        rotate_when=os.environ.get("LOG_ROTATE_WHEN") or "daily",
+        queue_size=int(os.environ.get("LOG_QUEUE_SIZE") or 10_000),
+    )
@@ -0,0 +1,112 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+
+from dotenv import load_dotenv
+
+from .logger import logger
+from .metrics import EVENT_LOOP_BLOCKS, EVENT_LOOP_LAG
+
+load_dotenv()
+LOOP_LAG_INTERVAL = float(os.environ.get("LOOP_LAG_INTERVAL_MS") or 100) / 1000
+# NOTE: With LOOP_BLOCK_DETECTOR enabled, a watchdog thread logs the stack
+# of whatever holds the event loop for longer than LOOP_BLOCK_THRESHOLD_MS.
+# Blocks shorter than the lag interval can slip between two samples, keep
+# LOOP_LAG_INTERVAL_MS at or below the threshold.
+LOOP_BLOCK_DETECTOR = (
+    os.environ.get("LOOP_BLOCK_DETECTOR") or "false"
+).lower() == "true"
+LOOP_BLOCK_THRESHOLD = float(os.environ.get("LOOP_BLOCK_THRESHOLD_MS") or 100) / 1000
+
+
+class LoopMonitor:
+    """
+    Measures event loop scheduling delay (lag).
+
+    A task sleeps for `interval` over and over, and records how much later
+    than requested it woke up as the `event_loop_lag_seconds` metric.
+
+    In debug mode (`detect_blocking`), a watchdog thread additionally
+    checks whether that wake up is overdue by more than `threshold`, and
+    if so, logs the event loop thread's current stack: the code blocking
+    the loop, caught in the act.
+    """
+
+    def __init__(
+        self,
+        interval: float = LOOP_LAG_INTERVAL,
+        detect_blocking: bool = LOOP_BLOCK_DETECTOR,
+        threshold: float = LOOP_BLOCK_THRESHOLD,
+    ):
+        self.interval = interval
+        self.detect_blocking = detect_blocking
+        self.threshold = threshold
+        self.blocks = 0
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+        self._loop_thread_id: int | None = None
+        self._expected_wake = 0.0
+        self._tick = 0
+
+    def start(self) -> None:
+        """
+        - Starts monitoring the running event loop.
+        """
+        if self._task is not None:
+            return
+        self._stopped.clear()
+        self._loop_thread_id = threading.get_ident()
+        self._expected_wake = time.monotonic() + self.interval
+        self._task = asyncio.create_task(self._run(), name="loop-lag-monitor")
+        if self.detect_blocking:
+            self._watchdog = threading.Thread(
+                target=self._watch, name="loop-block-detector", daemon=True
+            )
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(self.threshold + 1)
+            self._watchdog = None
+
+    async def _run(self) -> None:
+        while True:
+            before = time.monotonic()
+            self._expected_wake = before + self.interval
+            await asyncio.sleep(self.interval)
+            self._tick += 1
+            EVENT_LOOP_LAG.observe(max(0.0, time.monotonic() - self._expected_wake))
+
+    def _watch(self) -> None:
+        reported_tick = -1
+        while not self._stopped.wait(self.threshold / 2):
+            overdue = time.monotonic() - self._expected_wake
+            if overdue <= self.threshold or reported_tick == self._tick:
+                continue
+            reported_tick = self._tick
+            frame = sys._current_frames().get(self._loop_thread_id)  # type:ignore
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame))
+            del frame
+            self.blocks += 1
+            EVENT_LOOP_BLOCKS.inc()
+            logger.warning(
+                f"Event loop blocked for over {overdue * 1000:.0f}ms, "
+                f"currently running:\n{stack}"
+            )
+
+
+loop_monitor = LoopMonitor()
@@ -0,0 +1,284 @@
+import functools
+import inspect
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+
+from .tracing import span
+
+# NOTE: prometheus_client decides between in-process and multi-process
+# (mmap file backed) values on import, so PROMETHEUS_MULTIPROC_DIR has to be
+# loaded before it. Point it at an empty directory (wiped on deploy) when
+# running more than one uvicorn worker, so /metrics aggregates all workers.
+load_dotenv()
+
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY,
+                               CollectorRegistry, Counter, Gauge, Histogram,
+                               generate_latest, multiprocess)
+
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+# NOTE: Buckets in seconds, spanning cache hits (~1ms) to slow S3 uploads.
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+SIZE_BUCKETS = tuple(256 * 4**i for i in range(10))  # 256B - 64MB
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time spent in the route handler, by route template.",
+    ["method", "route", "status_code"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled.",
+    ["method", "route"],
+    multiprocess_mode="livesum",
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Response body size, by route template (streamed bodies included).",
+    ["method", "route"],
+    buckets=SIZE_BUCKETS,
+)
+S3_REQUEST_DURATION = Histogram(
+    "s3_request_duration_seconds",
+    "S3 client call latency, by operation.",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+S3_REQUEST_ERRORS = Counter(
+    "s3_request_errors_total",
+    "S3 client calls that raised, by operation.",
+    ["operation"],
+)
+REDIS_COMMAND_DURATION = Histogram(
+    "redis_command_duration_seconds",
+    "Redis command latency, by command.",
+    ["command"],
+    buckets=LATENCY_BUCKETS,
+)
+REDIS_COMMAND_ERRORS = Counter(
+    "redis_command_errors_total",
+    "Redis commands that raised, by command.",
+    ["command"],
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Database connections currently checked out of the pool.",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_open_connections",
+    "Database connections currently open (checked in or out).",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections",
+    "Database connections currently open beyond pool_size (max_overflow).",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for (or opening) a pooled database connection.",
+    ["pool"],
+    buckets=(0.0001, 0.0005) + LATENCY_BUCKETS,
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT seconds.",
+    ["pool"],
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "How much later than scheduled the event loop ran a timer.",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+EVENT_LOOP_BLOCKS = Counter(
+    "event_loop_blocks_total",
+    "Times the event loop was caught blocked over LOOP_BLOCK_THRESHOLD_MS.",
+)
+IMAGE_STAGE_DURATION = Histogram(
+    "image_stage_duration_seconds",
+    "Image pipeline stage latency (decode, resize, encode).",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+def render_metrics() -> bytes:
+    """
+    - Renders all metrics in the Prometheus text exposition format.
+    - In multi-process mode, merges the values written by every worker.
+    """
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def mark_process_dead(pid: int | None = None) -> None:
+    """
+    - Drops this worker's live gauges (i.e. in-flight requests) on shutdown.
+    """
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid or os.getpid(), MULTIPROC_DIR)
+
+
+def instrument_pool(pool_events_target: Any, pool_name: str = "primary") -> None:
+    """
+    - Tracks open and checked out connections of a SQLAlchemy pool
+      (or Engine) through pool events, labelled `pool_name`.
+    """
+    connections = DB_POOL_CONNECTIONS.labels(pool_name)
+    checked_out = DB_POOL_CHECKED_OUT.labels(pool_name)
+
+    def on_connect(*args):
+        connections.inc()
+
+    def on_close(*args):
+        connections.dec()
+
+    def on_checkout(*args):
+        checked_out.inc()
+
+    def on_checkin(*args):
+        checked_out.dec()
+
+    event.listen(pool_events_target, "connect", on_connect)
+    event.listen(pool_events_target, "close", on_close)
+    event.listen(pool_events_target, "detach", on_close)
+    event.listen(pool_events_target, "checkout", on_checkout)
+    event.listen(pool_events_target, "checkin", on_checkin)
+
+
+class InstrumentedClient:
+    """
+    A transparent proxy around an async client (S3, Redis), timing every
+    public method whose result is awaitable under its method name, and
+    recording it as a `<remote>.<method>` CLIENT span (see utils/tracing.py).
+
+    Completed calls are also passed to `on_call(method, kwargs, result)`,
+    i.e. for per request accounting (see utils/accounting.py).
+
+    Anything else (sync methods, attributes) is passed through untouched,
+    and wrapped methods are cached on the proxy, so the per call overhead
+    is one histogram observation (plus a no-op span outside sampled traces).
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        durations: Histogram,
+        errors: Counter,
+        remote: str,
+        on_call: Callable[[str, Dict[str, Any], Any], None] | None = None,
+    ):
+        self._client = client
+        self._durations = durations
+        self._errors = errors
+        self._remote = remote
+        self._on_call = on_call
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if name.startswith("_") or not callable(attr) or inspect.isclass(attr):
+            return attr
+
+        durations = self._durations.labels(name)
+        errors = self._errors.labels(name)
+        remote = self._remote
+        span_name = f"{remote}.{name}"
+        on_call = self._on_call
+
+        async def timed(awaitable: Awaitable, kwargs: Dict[str, Any]) -> Any:
+            before = time.perf_counter()
+            try:
+                with span(span_name, kind="CLIENT", remote=remote):
+                    result = await awaitable
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                durations.observe(time.perf_counter() - before)
+            if on_call is not None:
+                on_call(name, kwargs, result)
+            return result
+
+        def wrapper(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if inspect.isawaitable(result):
+                return timed(result, kwargs)
+            return result
+
+        self.__dict__[name] = wrapper
+        return wrapper
+
+
+class InstrumentedClientContext:
+    """
+    - Wraps an async context manager yielding a client (i.e. the one returned
+      by `session.create_client("s3")`), yielding an InstrumentedClient.
+    """
+
+    def __init__(
+        self,
+        client_context: Any,
+        durations: Histogram,
+        errors: Counter,
+        remote: str,
+        on_call: Callable[[str, Dict[str, Any], Any], None] | None = None,
+    ):
+        self._client_context = client_context
+        self._durations = durations
+        self._errors = errors
+        self._remote = remote
+        self._on_call = on_call
+
+    async def __aenter__(self) -> InstrumentedClient:
+        client = await self._client_context.__aenter__()
+        return InstrumentedClient(
+            client, self._durations, self._errors, self._remote, self._on_call
+        )
+
+    async def __aexit__(self, *exc_info) -> Any:
+        return await self._client_context.__aexit__(*exc_info)
+
+
+def timed_stage(stage: str) -> Callable:
+    """
+    - Decorator recording a function's duration as an image pipeline stage,
+      and as an `image.<stage>` span.
+    """
+    histogram = IMAGE_STAGE_DURATION.labels(stage)
+    span_name = f"image.{stage}"
+
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with histogram.time(), span(span_name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
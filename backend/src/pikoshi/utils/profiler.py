@@ -0,0 +1,210 @@
+import asyncio
+import hmac
+import os
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from datetime import datetime
+from types import FrameType
+from typing import Dict, List
+
+from dotenv import load_dotenv
+
+from .logger import logger
+
+load_dotenv()
+# NOTE: Profiling is disabled unless PROFILER_TOKEN is set. Requests sent
+# with `X-Profile-Token: <PROFILER_TOKEN>` are profiled individually, and
+# /admin/profiler/ profiles every thread for a time window.
+PROFILER_TOKEN = os.environ.get("PROFILER_TOKEN") or ""
+PROFILE_DIR = os.environ.get("PROFILE_DIR") or "profiles"
+PROFILE_INTERVAL = float(os.environ.get("PROFILE_INTERVAL_MS") or 5) / 1000
+PROFILE_MAX_SECONDS = float(os.environ.get("PROFILE_MAX_SECONDS") or 300)
+PROFILE_HEADER = "X-Profile-Token"
+
+
+def is_authorized(token: str | None) -> bool:
+    """
+    - Checks a profiler token in constant time, always False when
+      PROFILER_TOKEN is unset.
+    """
+    if not PROFILER_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode(), PROFILER_TOKEN.encode())
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _fold(frame: FrameType | None) -> List[str]:
+    stack = []
+    while frame is not None:
+        stack.append(_frame_name(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+class ProfileSession(ABC):
+    """
+    Samples collected by the SamplingProfiler for one request or window.
+
+    Written out as "folded stacks" (`frame;frame;frame <count>` per line),
+    which flamegraph.pl, speedscope and inferno render as flame graphs.
+    """
+
+    def __init__(self, label: str):
+        self.label = label
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self.started = time.monotonic()
+        self.stopped = False
+        safe_label = "".join(c if c.isalnum() else "_" for c in label).strip("_")
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        self.path = os.path.join(PROFILE_DIR, f"{timestamp}_{safe_label}.folded")
+
+    @abstractmethod
+    def sample(self, frames: Dict[int, FrameType]) -> None:
+        """
+        - Records the stacks it profiles out of every thread's current frame.
+        """
+
+    def expired(self) -> bool:
+        return time.monotonic() - self.started > PROFILE_MAX_SECONDS
+
+    def write(self) -> None:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class RequestProfile(ProfileSession):
+    """
+    - Samples the event loop thread, but only while one of the request's own
+      tasks is running on it, so concurrent requests don't show up.
+    """
+
+    def __init__(self, label: str):
+        super().__init__(label)
+        self.loop = asyncio.get_running_loop()
+        self.thread_id = threading.get_ident()
+        self.tasks = set()
+        self.add_current_task()
+
+    def add_current_task(self) -> None:
+        """
+        - Adds the running task (i.e. the one streaming the response body).
+        """
+        task = asyncio.current_task()
+        if task is not None:
+            self.tasks.add(task)
+
+    def sample(self, frames: Dict[int, FrameType]) -> None:
+        if asyncio.current_task(self.loop) not in self.tasks:
+            return
+        frame = frames.get(self.thread_id)
+        if frame is not None:
+            self.stacks[";".join(_fold(frame))] += 1
+            self.samples += 1
+
+
+class WindowProfile(ProfileSession):
+    """
+    - Samples every thread (rooted at the thread's name) for `seconds`.
+    """
+
+    def __init__(self, label: str, seconds: float):
+        super().__init__(label)
+        self.seconds = min(seconds, PROFILE_MAX_SECONDS)
+
+    def expired(self) -> bool:
+        return time.monotonic() - self.started > self.seconds
+
+    def sample(self, frames: Dict[int, FrameType]) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in frames.items():
+            stack = [names.get(thread_id, str(thread_id)), *_fold(frame)]
+            self.stacks[";".join(stack)] += 1
+        self.samples += 1
+
+
+class SamplingProfiler:
+    """
+    A wall clock sampling profiler.
+
+    A single background thread snapshots every thread's stack through
+    `sys._current_frames()` each `interval` seconds, and hands the snapshot
+    to every active session. The thread only runs while there are sessions,
+    so when nobody is profiling the overhead is nil. Finished sessions are
+    also written out from that thread, keeping disk I/O off the event loop.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self._sessions: List[ProfileSession] = []
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def window(self) -> WindowProfile | None:
+        for session in self._sessions:
+            if isinstance(session, WindowProfile) and not session.stopped:
+                return session
+        return None
+
+    def start(self, session: ProfileSession) -> ProfileSession:
+        with self._lock:
+            self._sessions.append(session)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="sampling-profiler", daemon=True
+                )
+                self._thread.start()
+        return session
+
+    def stop(self, session: ProfileSession) -> str:
+        """
+        - Stops a session, its profile is written to `session.path` shortly.
+        """
+        session.stopped = True
+        return session.path
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while True:
+            with self._lock:
+                sessions = list(self._sessions)
+                if not sessions:
+                    self._thread = None
+                    return
+            frames = sys._current_frames()
+            frames.pop(own_id, None)
+            for session in sessions:
+                if not session.stopped and session.expired():
+                    session.stopped = True
+                if session.stopped:
+                    self._finish(session)
+                else:
+                    session.sample(frames)
+            del frames
+            time.sleep(self.interval)
+
+    def _finish(self, session: ProfileSession) -> None:
+        with self._lock:
+            self._sessions.remove(session)
+        try:
+            session.write()
+            logger.info(
+                f"Wrote profile of {session.label} "
+                f"({session.samples} samples) to {session.path}"
+            )
+        except OSError as e:
+            logger.error(f"Unable to write profile {session.path}: {e}")
+
+
+profiler = SamplingProfiler()
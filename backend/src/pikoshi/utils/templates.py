@@ -0,0 +1,104 @@
+import html
+import os
+import time
+from pathlib import Path
+from string import Formatter
+from typing import Dict, List, Tuple
+
+from dotenv import load_dotenv
+
+from .logger import logger
+
+load_dotenv()
+# NOTE: Templates are read and compiled once, on import. With TEMPLATE_RELOAD
+# enabled (development only), edited templates are picked up again, checked
+# at most every TEMPLATE_RELOAD_SECONDS.
+TEMPLATE_RELOAD = (os.environ.get("TEMPLATE_RELOAD") or "false").lower() == "true"
+TEMPLATE_RELOAD_SECONDS = float(os.environ.get("TEMPLATE_RELOAD_SECONDS") or 1)
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
+
+
+class CompiledTemplate:
+    """
+    An .html template using `{name}` placeholders (`{{`/`}}` for literal
+    braces), parsed once into literal text and variable names.
+
+    `render()` HTML escapes every value and requires exactly the template's
+    variables, so a typo fails loudly instead of sending a broken email.
+    """
+
+    def __init__(self, name: str, source: str):
+        self.name = name
+        self._parts: List[Tuple[str, str | None]] = []
+        for literal, field, spec, conversion in Formatter().parse(source):
+            if field is not None and (
+                not field.isidentifier() or spec or conversion is not None
+            ):
+                raise ValueError(f"Unsupported placeholder {{{field}}} in {name}")
+            self._parts.append((literal, field))
+        self.fields = frozenset(field for _, field in self._parts if field)
+
+    def render(self, **values: str) -> str:
+        if values.keys() != self.fields:
+            raise KeyError(
+                f"{self.name} takes {sorted(self.fields)}, got {sorted(values)}"
+            )
+        escaped = {name: html.escape(str(value)) for name, value in values.items()}
+        return "".join(
+            literal + (escaped[field] if field else "")
+            for literal, field in self._parts
+        )
+
+
+class TemplateRegistry:
+    """
+    Every template in `directory`, compiled and kept in memory by file name.
+    """
+
+    def __init__(
+        self,
+        directory: Path = TEMPLATES_DIR,
+        reload: bool = TEMPLATE_RELOAD,
+        reload_seconds: float = TEMPLATE_RELOAD_SECONDS,
+    ):
+        self.directory = directory
+        self.reload = reload
+        self.reload_seconds = reload_seconds
+        self._templates: Dict[str, CompiledTemplate] = {}
+        self._mtimes: Dict[Path, float] = {}
+        self._checked_at = 0.0
+        self.load()
+
+    def load(self) -> None:
+        templates, mtimes = {}, {}
+        for path in sorted(self.directory.glob("*.html")):
+            templates[path.name] = CompiledTemplate(path.name, path.read_text())
+            mtimes[path] = path.stat().st_mtime
+        self._templates, self._mtimes = templates, mtimes
+        self._checked_at = time.monotonic()
+
+    def _reload_if_changed(self) -> None:
+        if time.monotonic() - self._checked_at < self.reload_seconds:
+            return
+        self._checked_at = time.monotonic()
+        try:
+            paths = set(self.directory.glob("*.html"))
+            if paths != self._mtimes.keys() or any(
+                path.stat().st_mtime != mtime for path, mtime in self._mtimes.items()
+            ):
+                self.load()
+                logger.info(f"Reloaded templates from {self.directory}")
+        except Exception as e:
+            # Keep serving the last good templates
+            logger.error(f"Reloading templates failed: {e}")
+
+    def get(self, name: str) -> CompiledTemplate:
+        if self.reload:
+            self._reload_if_changed()
+        return self._templates[name]
+
+    def render(self, name: str, /, **values: str) -> str:
+        return self.get(name).render(**values)
+
+
+email_templates = TemplateRegistry()
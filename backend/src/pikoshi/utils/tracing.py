@@ -0,0 +1,279 @@
+import functools
+import inspect
+import os
+import random
+import secrets
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, AsyncIterator, Callable, Dict, Iterator
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+
+from .log_sink import sink_from_env
+
+load_dotenv()
+# NOTE: Fraction of requests (without an incoming `traceparent` header)
+# whose spans are recorded, 0 disables span export entirely.
+TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE") or 0)
+TRACE_SERVICE_NAME = os.environ.get("TRACE_SERVICE_NAME") or "pikoshi"
+
+# NOTE: One Zipkin v2 span (JSON) per line, i.e. logs/traces_<date>.jsonl.
+# A file's lines can be wrapped in a JSON array and POSTed as is to a
+# Zipkin compatible collector's /api/v2/spans endpoint.
+trace_sink = sink_from_env("traces")
+
+_current_span: ContextVar["Span | None"] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """
+    A unit of timed work within a trace.
+
+    Spans are only exported when their trace is sampled, unsampled root
+    spans still carry a trace ID (for the X-Trace-Id header and logs),
+    while their children are all the shared no-op span.
+    """
+
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "kind",
+        "remote",
+        "sampled",
+        "tags",
+        "_timestamp",
+        "_before",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: str | None = None,
+        kind: str | None = None,
+        remote: str | None = None,
+        sampled: bool = True,
+    ):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.remote = remote
+        self.sampled = sampled
+        self.tags: Dict[str, str] = {}
+        self._timestamp = time.time_ns() // 1000
+        self._before = time.perf_counter()
+
+    def set_tag(self, key: str, value: Any) -> None:
+        if self.sampled:
+            self.tags[key] = str(value)
+
+    def finish(self, error: BaseException | None = None) -> None:
+        if not self.sampled:
+            return
+        if error is not None:
+            self.tags["error"] = f"{type(error).__name__}: {error}"
+        duration = max(1, int((time.perf_counter() - self._before) * 1_000_000))
+        span: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "id": self.span_id,
+            "name": self.name,
+            "timestamp": self._timestamp,
+            "duration": duration,
+            "localEndpoint": {"serviceName": TRACE_SERVICE_NAME},
+            "tags": self.tags,
+        }
+        if self.parent_id is not None:
+            span["parentId"] = self.parent_id
+        if self.kind is not None:
+            span["kind"] = self.kind
+        if self.remote is not None:
+            span["remoteEndpoint"] = {"serviceName": self.remote}
+        trace_sink.emit(span)
+
+
+NOOP_SPAN = Span("noop", trace_id="0" * 32, sampled=False)
+
+
+def start_trace(name: str, traceparent: str | None = None) -> Span:
+    """
+    - Starts the root (SERVER) span of a request.
+    - Continues the caller's trace (and sampling decision) if given a valid
+      W3C `traceparent` header, otherwise starts a new trace sampled at
+      TRACE_SAMPLE_RATE.
+    """
+    parts = (traceparent or "").split("-")
+    if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+        return Span(
+            name,
+            trace_id=parts[1],
+            parent_id=parts[2],
+            kind="SERVER",
+            sampled=parts[3] == "01",
+        )
+    return Span(
+        name,
+        trace_id=secrets.token_hex(16),
+        kind="SERVER",
+        sampled=TRACE_SAMPLE_RATE > 0 and random.random() < TRACE_SAMPLE_RATE,
+    )
+
+
+def start_span(name: str, kind: str | None = None, remote: str | None = None) -> Span:
+    """
+    - Starts a child of the current span (without making it current).
+    - Returns NOOP_SPAN outside of a sampled trace, which is cheap enough to
+      call on every DB, S3 and Redis call.
+    """
+    parent = _current_span.get()
+    if parent is None or not parent.sampled:
+        return NOOP_SPAN
+    return Span(name, parent.trace_id, parent.span_id, kind, remote)
+
+
+def activate(span: Span) -> Token:
+    return _current_span.set(span)
+
+
+def deactivate(token: Token) -> None:
+    _current_span.reset(token)
+
+
+def is_sampled() -> bool:
+    """
+    - Whether spans started now are recorded, i.e. to skip building names
+      and tags for NOOP_SPAN.
+    """
+    current = _current_span.get()
+    return current is not None and current.sampled
+
+
+def current_trace_id() -> str | None:
+    current = _current_span.get()
+    return None if current is None else current.trace_id
+
+
+@contextmanager
+def span(
+    name: str, kind: str | None = None, remote: str | None = None
+) -> Iterator[Span]:
+    """
+    - Runs the enclosed block in a new child span of the current span.
+    """
+    child = start_span(name, kind, remote)
+    if child is NOOP_SPAN:
+        yield child
+        return
+    token = activate(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.finish(e)
+        raise
+    else:
+        child.finish()
+    finally:
+        deactivate(token)
+
+
+def traced(name: str | None = None) -> Callable:
+    """
+    - Decorator running a (sync or async) function in its own span, named
+      `<module>.<function>` by default (i.e. auth_service.get_user_by_token).
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+async def traced_stream(body_iterator: AsyncIterator, root: Span) -> AsyncIterator:
+    """
+    - Wraps a StreamingResponse body, producing each chunk in its own
+      `stream.chunk` span under the request's root span, which is only
+      finished once the stream is exhausted (or aborted).
+    - NOTE: Streaming happens after the route handler has returned, so the
+      root span has to be re-activated around every chunk.
+    """
+    error: BaseException | None = None
+    index = 0
+    try:
+        while True:
+            token = activate(root)
+            try:
+                with span("stream.chunk") as chunk_span:
+                    chunk_span.set_tag("stream.chunk_index", index)
+                    try:
+                        chunk = await body_iterator.__anext__()
+                    except StopAsyncIteration:
+                        chunk_span.set_tag("stream.end", True)
+                        break
+            finally:
+                deactivate(token)
+            index += 1
+            yield chunk
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        root.set_tag("stream.chunks", index)
+        root.finish(error)
+
+
+def instrument_engine(engine: Any) -> None:
+    """
+    - Records a CLIENT span per SQL statement executed by a (sync) Engine.
+    - NOTE: Spans are kept on the connection, as recommended for SQLAlchemy
+      cursor execute timing, since statements on one connection don't nest.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        spans = conn.info.setdefault("trace_spans", [])
+        if not is_sampled():
+            # NOTE: Still pushed, after_cursor_execute pops one per statement
+            spans.append(NOOP_SPAN)
+            return
+        verb = statement.split(None, 1)
+        statement_span = start_span(
+            f"db.{verb[0].lower() if verb else 'query'}",
+            kind="CLIENT",
+            remote="postgres",
+        )
+        statement_span.set_tag("db.statement", statement[:1000])
+        spans.append(statement_span)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        spans = conn.info.get("trace_spans")
+        if spans:
+            spans.pop().finish()
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        connection = exception_context.connection
+        spans = connection.info.get("trace_spans") if connection else None
+        if spans:
+            spans.pop().finish(exception_context.original_exception)